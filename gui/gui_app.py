@@ -22,7 +22,7 @@ from datetime import datetime
 
 # Add the src directory to the path to import our main module
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
-from smartfilesort import FileOrganizer
+from smartfilesort import FileOrganizer, load_settings
 
 
 class SmartFileSortGUI:
@@ -40,6 +40,7 @@ class SmartFileSortGUI:
         self.target_dir = tk.StringVar(value=os.path.expanduser("~/Documents/OrganizedFiles"))
         self.dry_run = tk.BooleanVar(value=True)
         self.is_running = False
+        self.organizer = None
         
         self.setup_ui()
         self.load_last_settings()
@@ -104,6 +105,12 @@ class SmartFileSortGUI:
                                    command=self.run_organizer, style="Accent.TButton")
         self.run_button.pack(side=tk.LEFT, padx=(0, 10))
         
+        self.pause_button = ttk.Button(button_frame, text="Pause", command=self.toggle_pause, state='disabled')
+        self.pause_button.pack(side=tk.LEFT, padx=(0, 10))
+        
+        self.stop_button = ttk.Button(button_frame, text="Stop", command=self.stop_organizer, state='disabled')
+        self.stop_button.pack(side=tk.LEFT, padx=(0, 10))
+        
         ttk.Button(button_frame, text="Preview Classification", 
                   command=self.preview_classification).pack(side=tk.LEFT, padx=(0, 10))
         
@@ -275,20 +282,29 @@ Perfect for organizing Downloads folders, shared drives, and any cluttered direc
             self.status_label.config(text="Organizing files...")
             
             # Create organizer
-            organizer = FileOrganizer(self.source_dir.get(), self.target_dir.get())
+            organizer = FileOrganizer(self.source_dir.get(), self.target_dir.get(), settings=load_settings())
+            organizer.progress_callback = self.report_transfer_progress
+            self.organizer = organizer
+            self.pause_button.config(state='normal', text="Pause")
+            self.stop_button.config(state='normal')
             
             # Run organization
             success_count, fail_count = organizer.organize_files(dry_run=self.dry_run.get())
             
             # Update UI
-            if self.dry_run.get():
+            if organizer.control.cancelled:
+                self.log_message(f"Stopped. Success: {success_count}, Failed: {fail_count}. "
+                                 f"Run again to continue where it stopped.")
+                self.status_label.config(text="Organization stopped")
+            elif self.dry_run.get():
                 self.log_message(f"DRY RUN completed. Found {success_count + fail_count} files to organize.")
             else:
                 self.log_message(f"Organization completed! Success: {success_count}, Failed: {fail_count}")
             
-            self.status_label.config(text="Organization completed successfully!")
+            if not organizer.control.cancelled:
+                self.status_label.config(text="Organization completed successfully!")
             
-            if not self.dry_run.get():
+            if not self.dry_run.get() and not organizer.control.cancelled:
                 messagebox.showinfo("Complete", 
                                   f"File organization completed!\n\nSuccessfully processed: {success_count} files\nFailed: {fail_count} files")
         
@@ -299,8 +315,48 @@ Perfect for organizing Downloads folders, shared drives, and any cluttered direc
         
         finally:
             self.is_running = False
+            self.organizer = None
             self.run_button.config(state='normal')
+            self.pause_button.config(state='disabled', text="Pause")
+            self.stop_button.config(state='disabled')
+            self.progress.stop()
+    
+    def toggle_pause(self):
+        """Pause or resume the running organization."""
+        organizer = self.organizer
+        if organizer is None:
+            return
+        
+        if organizer.control.paused:
+            organizer.control.resume()
+            self.pause_button.config(text="Pause")
+            self.status_label.config(text="Organizing files...")
+            self.progress.start()
+            self.log_message("Resumed")
+        else:
+            organizer.control.pause()
+            self.pause_button.config(text="Resume")
+            self.status_label.config(text="Paused")
             self.progress.stop()
+            self.log_message("Paused after the current file")
+    
+    def stop_organizer(self):
+        """Stop the running organization after the current file."""
+        organizer = self.organizer
+        if organizer is None:
+            return
+        
+        organizer.control.cancel()
+        self.stop_button.config(state='disabled')
+        self.pause_button.config(state='disabled')
+        self.status_label.config(text="Stopping after the current file...")
+        self.log_message("Stop requested")
+    
+    def report_transfer_progress(self, source_path, copied, total):
+        """Show progress of a large transfer (called from the worker thread)."""
+        percent = copied * 100 // total if total else 100
+        text = f"Copying {source_path.name}: {percent}% ({copied // (1024 * 1024)}/{total // (1024 * 1024)} MB)"
+        self.root.after(0, lambda: self.status_label.config(text=text))
     
     def preview_classification(self):
         """Preview how files would be classified."""
@@ -311,8 +367,8 @@ Perfect for organizing Downloads folders, shared drives, and any cluttered direc
             return
         
         try:
-            from smartfilesort import FileClassifier
-            classifier = FileClassifier()
+            from smartfilesort import get_shared_classifier
+            rules = get_shared_classifier().current_rules(force=True)
             
             self.output_text.delete(1.0, tk.END)
             self.log_message("Previewing file classification...")
@@ -328,7 +384,7 @@ Perfect for organizing Downloads folders, shared drives, and any cluttered direc
             # Group files by category
             categories = {}
             for file_path in files_found:
-                category = classifier.classify_file(str(file_path))
+                category = rules.classify(file_path.name)
                 if category not in categories:
                     categories[category] = []
                 categories[category].append(file_path.name)
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Async Engine
+==========================
+
+An asyncio execution mode for FileOrganizer, aimed at sources and targets
+on high-latency mounts (SMB/NFS) where every stat and rename costs
+milliseconds. Scanning, classification and moves run as stages connected
+by bounded queues, so hundreds of operations can be in flight without
+holding the whole directory in memory. Blocking filesystem calls run in a
+thread pool, with separate concurrency limits for metadata operations
+(stat, rename within a device) and data copies (cross-device moves).
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+
+from smartfilesort import FileFilter
+
+
+# Marks the end of a queue for its consumers
+_DONE = object()
+
+
+class AsyncPipeline:
+    """Runs one organize pass of a FileOrganizer as an asyncio pipeline."""
+    
+    def __init__(self, organizer, performance: Dict = None):
+        """
+        Initialize the pipeline.
+        
+        Args:
+            organizer: FileOrganizer whose rules, cache and move logic are used
+            performance: The "performance" settings section
+        """
+        performance = performance or {}
+        self.organizer = organizer
+        self.metadata_concurrency = max(1, int(performance.get("metadata_concurrency", 32)))
+        self.data_concurrency = max(1, int(performance.get("data_concurrency", 4)))
+        self.queue_size = max(1, int(performance.get("queue_size", 256)))
+        self.scanned = 0
+        
+    def run(self, dry_run: bool = False):
+        """
+        Run the pipeline to completion.
+        
+        Args:
+            dry_run: If True, only log what would be done without moving files
+        """
+        asyncio.run(self._run(dry_run))
+        self.organizer.logger.info(f"Processed {self.scanned} files with the async engine")
+        
+    async def _run(self, dry_run: bool):
+        """Wire up the stages and wait for them to drain."""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.metadata_concurrency + self.data_concurrency + 1)
+        
+        scan_queue = asyncio.Queue(self.queue_size)
+        move_queue = asyncio.Queue(self.queue_size)
+        self.metadata_limit = asyncio.Semaphore(self.metadata_concurrency)
+        self.data_limit = asyncio.Semaphore(self.data_concurrency)
+        
+        # Classification only needs a thread when it may touch the disk
+        self.classify_in_thread = self.organizer.cache is not None or self.organizer.sniffer is not None
+        
+        try:
+            self.target_device = await loop.run_in_executor(executor, self.organizer._target_device)
+            
+            file_filter = FileFilter(self.organizer.settings)
+            scanner = loop.run_in_executor(executor, self._scan, loop, file_filter, scan_queue)
+            classifiers = [asyncio.ensure_future(self._classify_worker(loop, executor, scan_queue, move_queue))
+                           for _ in range(self.metadata_concurrency)]
+            movers = [asyncio.ensure_future(self._move_worker(loop, executor, move_queue, dry_run))
+                      for _ in range(self.metadata_concurrency + self.data_concurrency)]
+            
+            try:
+                await scanner
+            finally:
+                for _ in classifiers:
+                    await scan_queue.put(_DONE)
+            await asyncio.gather(*classifiers)
+            
+            for _ in movers:
+                await move_queue.put(_DONE)
+            await asyncio.gather(*movers)
+            
+            self.organizer._report_skips(file_filter)
+        finally:
+            executor.shutdown(wait=True)
+    
+    def _scan(self, loop, file_filter: FileFilter, scan_queue: asyncio.Queue):
+        """Scan the source directory in a worker thread, feeding the queue."""
+        for entry in self.organizer._iter_source(file_filter):
+            if not self.organizer._proceed():
+                break
+            # Blocks while the queue is full, which is the backpressure
+            asyncio.run_coroutine_threadsafe(scan_queue.put(entry), loop).result()
+            self.scanned += 1
+    
+    async def _classify_worker(self, loop, executor, scan_queue: asyncio.Queue, move_queue: asyncio.Queue):
+        """Classify entries from the scan queue."""
+        while True:
+            entry = await scan_queue.get()
+            if entry is _DONE:
+                return
+                
+            try:
+                if self.classify_in_thread:
+                    async with self.metadata_limit:
+                        category = await loop.run_in_executor(executor, self.organizer._classify_entry, entry)
+                else:
+                    category = self.organizer._classify_entry(entry)
+                # Streamed entries reach the learned model one at a time
+                if category == "Others" and self.organizer.name_model is not None:
+                    category = self.organizer._apply_learned([entry], [category])[0]
+            except Exception as e:
+                self.organizer._record_failure(entry.path, "", e)
+                continue
+                
+            await move_queue.put((entry, category))
+    
+    async def _move_worker(self, loop, executor, move_queue: asyncio.Queue, dry_run: bool):
+        """Move classified entries, limiting metadata and data operations separately."""
+        while True:
+            item = await move_queue.get()
+            if item is _DONE:
+                return
+                
+            entry, category = item
+            # Waiting out a pause blocks, so it happens in a thread
+            if self.organizer.control.paused:
+                await loop.run_in_executor(executor, self.organizer._proceed)
+            if self.organizer.control.cancelled:
+                continue
+                
+            try:
+                async with self.metadata_limit:
+                    st = await loop.run_in_executor(executor, entry.stat)
+                    # Directory entries on Windows report st_dev 0; a full stat has it
+                    if not st.st_dev and self.target_device:
+                        st = await loop.run_in_executor(executor, self.organizer.fs.stat, entry.path)
+                    
+                # Renames within a device are metadata operations; anything
+                # else is a data copy and goes through the narrower limit
+                same_device = self.target_device is not None and st.st_dev == self.target_device
+                limit = self.metadata_limit if dry_run or same_device else self.data_limit
+                
+                async with limit:
+                    await loop.run_in_executor(executor, self.organizer._process_entry, entry, category, dry_run)
+            except Exception as e:
+                self.organizer._record_failure(entry.path, category, e)
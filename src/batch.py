@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Batch Runner
+==========================
+
+Runs many source-to-target jobs from a manifest in one process for
+``smartfilesort.py batch``. Jobs are limited per physical device (grouped
+by ``st_dev``): jobs on different disks run in parallel, while jobs that
+share a disk are serialized so they do not fight over one spindle. The
+whole batch writes a single operation log and summary.
+"""
+
+import os
+import sys
+import json
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from smartfilesort import FileOrganizer, load_settings, save_operation_log
+
+
+class BatchJob:
+    """One source-to-target pair of a batch and its results."""
+    
+    def __init__(self, source: str, target: str, config: str = None, name: str = None):
+        """
+        Initialize the job.
+        
+        Args:
+            source: Directory to organize files from
+            target: Base directory to organize files into
+            config: Optional rules file for this job
+            name: Label used in the summary (defaults to the source path)
+        """
+        self.source = os.path.expandvars(source)
+        self.target = os.path.expandvars(target)
+        self.config = config
+        self.name = name or self.source
+        self.devices = ()
+        self.organizer = None
+        self.successful = 0
+        self.failed = 0
+        self.error = None
+
+
+def load_manifest(manifest_path: str) -> List[BatchJob]:
+    """
+    Read a batch manifest.
+    
+    The manifest is a JSON list of jobs, or an object with a "jobs" list;
+    each job has "source" and "target" and optionally "config" and "name".
+    
+    Args:
+        manifest_path: Path to the manifest file
+        
+    Returns:
+        List of jobs in manifest order
+    """
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+        
+    entries = manifest.get("jobs", []) if isinstance(manifest, dict) else manifest
+    jobs = []
+    for entry in entries:
+        if not entry.get("source") or not entry.get("target"):
+            raise ValueError(f"Manifest job needs a source and a target: {entry}")
+        jobs.append(BatchJob(entry["source"], entry["target"], entry.get("config"), entry.get("name")))
+    return jobs
+
+
+def device_of(path: Path) -> Optional[int]:
+    """Device id of a path, or of its nearest existing parent."""
+    path = Path(path).absolute()
+    while True:
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            if path.parent == path:
+                return None
+            path = path.parent
+
+
+class BatchRunner:
+    """Runs batch jobs concurrently with a per-device concurrency limit."""
+    
+    def __init__(self, jobs: List[BatchJob], settings: Dict = None, dry_run: bool = False):
+        """
+        Initialize the runner.
+        
+        Args:
+            jobs: Jobs to run
+            settings: Settings dictionary as loaded by load_settings()
+            dry_run: If True, only log what would be done without moving files
+        """
+        performance = (settings or {}).get("performance", {})
+        self.jobs = jobs
+        self.settings = settings or {}
+        self.dry_run = dry_run
+        self.workers = max(1, int(performance.get("batch_workers", 8)))
+        self.device_concurrency = max(1, int(performance.get("device_concurrency", 1)))
+        
+        self._condition = threading.Condition()
+        self._pending = []
+        self._in_use = Counter()
+        
+    def _job_devices(self, job: BatchJob) -> Tuple[int, ...]:
+        """Devices a job reads from or writes to."""
+        devices = {device_of(job.source), device_of(job.target)}
+        devices.discard(None)
+        return tuple(sorted(devices))
+        
+    def _next_job(self) -> Optional[BatchJob]:
+        """Take the first pending job whose devices all have a free slot."""
+        with self._condition:
+            while self._pending:
+                for index, job in enumerate(self._pending):
+                    if all(self._in_use[device] < self.device_concurrency for device in job.devices):
+                        del self._pending[index]
+                        self._in_use.update(job.devices)
+                        return job
+                self._condition.wait()
+            return None
+    
+    def _finish(self, job: BatchJob):
+        """Release a job's device slots."""
+        with self._condition:
+            self._in_use.subtract(job.devices)
+            self._condition.notify_all()
+    
+    def _run_job(self, job: BatchJob):
+        """Organize one job, keeping its results for the aggregate log."""
+        try:
+            job.successful, job.failed = job.organizer.organize_files(dry_run=self.dry_run, save_log=False)
+        except Exception as e:
+            job.error = e
+            job.organizer.logger.error(f"Batch job {job.name} failed: {e}")
+    
+    def _worker(self):
+        """Run jobs until none are pending."""
+        while True:
+            job = self._next_job()
+            if job is None:
+                return
+            try:
+                self._run_job(job)
+            finally:
+                self._finish(job)
+    
+    def run(self) -> Tuple[int, int]:
+        """
+        Run every job.
+        
+        Returns:
+            Tuple of (successful_moves, failed_moves) over the whole batch
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        shared_caches = {}
+        shared_governor = None
+        for job in self.jobs:
+            job.organizer = FileOrganizer(job.source, job.target, job.config, self.settings)
+            job.devices = self._job_devices(job)
+            
+            # Throttle limits apply to the batch as a whole, and jobs with the
+            # same rules file share one instance of its classification cache
+            shared_governor = shared_governor or job.organizer.governor
+            job.organizer.governor = shared_governor
+            cache = job.organizer.cache
+            if cache is not None:
+                job.organizer.cache = shared_caches.setdefault(cache.cache_path, cache)
+        
+        self._pending = list(self.jobs)
+        with ThreadPoolExecutor(min(self.workers, len(self.jobs)) or 1) as executor:
+            futures = [executor.submit(self._worker) for _ in range(min(self.workers, len(self.jobs)))]
+            for future in futures:
+                future.result()
+        
+        return sum(job.successful for job in self.jobs), sum(job.failed for job in self.jobs)
+        
+    def operations(self) -> List[Dict]:
+        """Operation records of every job, in manifest order."""
+        records = []
+        for job in self.jobs:
+            if job.organizer is not None:
+                records.extend(job.organizer.moved_files + job.organizer.failed_files)
+        return records
+        
+    def summary(self) -> str:
+        """Render a per-job and total summary."""
+        lines = []
+        for job in self.jobs:
+            status = f"error: {job.error}" if job.error else f"{job.successful} moved, {job.failed} failed"
+            lines.append(f"  {job.name}: {status}")
+        lines.append(f"Total: {sum(job.successful for job in self.jobs)} moved, "
+                     f"{sum(job.failed for job in self.jobs)} failed across {len(self.jobs)} jobs")
+        return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    """Entry point for ``smartfilesort.py batch``."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="smartfilesort batch",
+                                     description="Organize many source/target pairs from a manifest")
+    parser.add_argument("manifest", help="JSON manifest of jobs")
+    parser.add_argument("--dry-run", action="store_true", help="Preview actions without moving files")
+    parser.add_argument("--settings", help="Path to settings file")
+    parser.add_argument("--device-concurrency", type=int,
+                        help="Jobs allowed per device at once (overrides performance.device_concurrency)")
+    
+    args = parser.parse_args(argv)
+    
+    settings = load_settings(args.settings)
+    if args.device_concurrency:
+        settings.setdefault("performance", {})["device_concurrency"] = args.device_concurrency
+        
+    try:
+        jobs = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        print(f"Could not read manifest: {e}")
+        return 2
+        
+    runner = BatchRunner(jobs, settings, args.dry_run)
+    runner.run()
+    
+    print(f"\n=== SmartFileSort Batch Complete ===")
+    print(runner.summary())
+    
+    if not args.dry_run:
+        log_file = save_operation_log(runner.operations(), prefix="operations_batch")
+        if log_file:
+            print(f"Operation log saved to: {log_file}")
+    
+    return 1 if any(job.error for job in jobs) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Benchmarks
+========================
+
+Repeatable throughput comparisons of organizer settings. Every scenario
+builds the same synthetic inbox on a simulated filesystem
+(memoryfs.MemoryFileSystem) for each variant, so results reflect the
+settings under test rather than the machine's disks or page cache:
+
+- ``engines``: execution modes against a share with slow metadata calls
+- ``locality``: listing order against inode and on-disk order when every
+  file is copied off a disk that pays for each seek
+- ``durability``: the fsync modes for copies to another drive, with each
+  fsync costing as much as a disk cache flush
+- ``hashing``: FileHasher algorithms and thread counts against reading
+  4 KiB chunks into fresh objects
+  
+    python src/smartfilesort.py benchmark locality --files 500
+"""
+
+import sys
+import time
+import random
+import logging
+import tempfile
+from typing import Callable, Dict, List
+
+from smartfilesort import FileHasher, FileOrganizer
+from memoryfs import MemoryFileSystem
+
+
+SOURCE_DIR = "/bench/inbox"
+TARGET_DIR = "/bench/sorted"
+
+
+def build_inbox(fs: MemoryFileSystem, files: int, file_size: int, seed: int = 0, downloads: int = 8):
+    """
+    Fill the simulated inbox with files whose names, inodes and on-disk order disagree.
+    
+    Files are created (taking inode numbers) in a random order, while scans
+    list them by name - as with a real inbox filled over time. Their data
+    lands on disk as each of several concurrent downloads finishes, so the
+    layout only roughly follows inode order.
+    """
+    rng = random.Random(seed)
+    extensions = [".pdf", ".jpg", ".mp4", ".mp3", ".zip", ".txt"]
+    names = [f"file_{index:06d}{extensions[index % len(extensions)]}" for index in range(files)]
+    rng.shuffle(names)
+    payload = bytes(rng.getrandbits(8) for _ in range(min(file_size, 4096)))
+    data = (payload * (file_size // len(payload) + 1))[:file_size]
+    for name in names:
+        fs.add_file(f"{SOURCE_DIR}/{name}")
+    
+    finished = sorted(range(files), key=lambda created: created + rng.random() * downloads)
+    for created in finished:
+        with fs.open(f"{SOURCE_DIR}/{names[created]}", 'wb') as f:
+            f.write(data)
+    fs.counts.clear()
+
+
+def run_variant(label: str, fs: MemoryFileSystem, settings: Dict) -> Dict:
+    """
+    Organize the simulated inbox once and measure it.
+    
+    Returns:
+        Result row with the label, file counts, elapsed time, rate and
+        the filesystem's operation counts
+    """
+    with tempfile.TemporaryDirectory() as cache_dir:
+        settings = {**settings, "performance": {"cache_directory": cache_dir, **settings.get("performance", {})}}
+        organizer = FileOrganizer(SOURCE_DIR, TARGET_DIR, settings=settings, filesystem=fs)
+        organizer.logger.setLevel(logging.WARNING)
+        
+        start = time.perf_counter()
+        moved, failed = organizer.organize_files(save_log=False)
+        elapsed = time.perf_counter() - start
+        
+    return {
+        "label": label,
+        "files": moved,
+        "failed": failed,
+        "seconds": elapsed,
+        "files_per_second": moved / elapsed if elapsed else 0.0,
+        "counts": dict(fs.counts),
+    }
+
+
+def engines(files: int, file_size: int, seek_ms: float) -> List[Dict]:
+    """Execution modes against 5 ms metadata operations."""
+    results = []
+    for mode in ("sequential", "lanes", "async"):
+        fs = MemoryFileSystem(latency={"stat": 0.005, "exists": 0.005, "rename": 0.005})
+        build_inbox(fs, files, file_size)
+        results.append(run_variant(mode, fs, {"performance": {"execution_mode": mode}}))
+    return results
+
+
+def locality(files: int, file_size: int, seek_ms: float) -> List[Dict]:
+    """
+    Listing order against on-disk order for cross-device copies off a seeking disk.
+    
+    The simulated disk lays data out independently of inode numbers, so
+    "inode" measures how well that heuristic tracks the layout. "extent"
+    reads the simulator's exact offsets, making it a synthetic upper bound
+    rather than a prediction for real FIEMAP results.
+    """
+    results = []
+    for order in ("none", "inode", "extent"):
+        fs = MemoryFileSystem(seek_seconds=seek_ms / 1000)
+        fs.mount(TARGET_DIR, 2)
+        build_inbox(fs, files, file_size)
+        label = "order=extent (bound)" if order == "extent" else f"order={order}"
+        results.append(run_variant(label, fs, {"performance": {"locality_order": order}}))
+    return results
+
+
+def durability(files: int, file_size: int, seek_ms: float) -> List[Dict]:
+    """The durability modes for cross-device copies with 10 ms fsyncs."""
+    results = []
+    for mode in ("none", "batched", "strict"):
+        fs = MemoryFileSystem(latency={"fsync": 0.01})
+        fs.mount(TARGET_DIR, 2)
+        build_inbox(fs, files, file_size)
+        settings = {"behavior": {"durability": mode, "durability_batch_files": 50}}
+        results.append(run_variant(f"durability={mode}", fs, settings))
+    return results
+
+
+def hashing(files: int, file_size: int, seek_ms: float) -> List[Dict]:
+    """Whole-file hashing throughput with each algorithm, one thread and several."""
+    import hashlib
+    
+    fs = MemoryFileSystem()
+    build_inbox(fs, files, file_size)
+    paths = [f"{SOURCE_DIR}/{name}" for name in fs.listdir(SOURCE_DIR)]
+    
+    def measure(label: str, run) -> Dict:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+        return {"label": label, "files": len(paths), "failed": 0, "seconds": elapsed,
+                "files_per_second": len(paths) / elapsed if elapsed else 0.0,
+                "bytes": len(paths) * file_size, "counts": {}}
+    
+    def small_reads():
+        for path in paths:
+            digest = hashlib.md5()
+            with fs.open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(4096), b""):
+                    digest.update(chunk)
+    
+    results = [measure("md5 4KiB reads", small_reads)]
+    for algorithm in FileHasher.ALGORITHMS:
+        for workers in (1, 4):
+            hasher = FileHasher(algorithm, workers, filesystem=fs)
+            results.append(measure(f"{algorithm} x{workers}", lambda: hasher.hash_files(paths)))
+    return results
+
+
+SCENARIOS: Dict[str, Callable[[int, int, float], List[Dict]]] = {
+    "engines": engines,
+    "locality": locality,
+    "durability": durability,
+    "hashing": hashing,
+}
+
+
+def format_results(name: str, results: List[Dict]) -> str:
+    """Render one scenario's results as a table, relative to its first variant."""
+    baseline = results[0]["seconds"] if results else 0
+    lines = [f"{name}:",
+             f"  {'variant':<20} {'files':>7} {'seconds':>9} {'files/s':>10} {'MB/s':>8} {'speedup':>8} "
+             f"{'seeks':>7} {'fsyncs':>7}"]
+    for row in results:
+        speedup = baseline / row["seconds"] if row["seconds"] else 0.0
+        rate = row.get("bytes", 0) / row["seconds"] / 1e6 if row["seconds"] else 0.0
+        lines.append(f"  {row['label']:<20} {row['files']:>7} {row['seconds']:>9.3f} "
+                     f"{row['files_per_second']:>10.1f} {rate:>8.1f} {speedup:>7.2f}x "
+                     f"{row['counts'].get('seek', 0):>7} {row['counts'].get('fsync', 0):>7}")
+    return "\n".join(lines)
+
+
+def main(argv: List[str] = None) -> int:
+    """Entry point for ``smartfilesort.py benchmark``."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="smartfilesort benchmark",
+                                     description="Compare organizer settings on a simulated filesystem")
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"Scenarios to run: {', '.join(sorted(SCENARIOS))} (default: all)")
+    parser.add_argument("--files", type=int, default=200, help="Files in the simulated inbox")
+    parser.add_argument("--file-size", type=int, default=64 * 1024, help="Size of each file in bytes")
+    parser.add_argument("--seek-ms", type=float, default=8.0, help="Simulated seek time of the source disk")
+    
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(unknown)}")
+        
+    for name in args.scenarios or sorted(SCENARIOS):
+        print(format_results(name, SCENARIOS[name](args.files, args.file_size, args.seek_ms)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Duplicate Sweep
+=============================
+
+Finds byte-identical files in an organized target tree - typically the
+``name(1).ext`` copies left by duplicate handling - and optionally
+replaces them with hardlinks to one kept copy or deletes them.
+
+Candidates are narrowed in stages so only the bytes needed to tell files
+apart are read: files are grouped by size, same-size files by a hash of
+their first and last blocks, and only files that still collide are hashed
+in full (with FileHasher). Hashing runs on a thread pool.
+"""
+
+import os
+import re
+import sys
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
+
+from smartfilesort import FileHasher, load_settings, save_operation_log
+
+
+PARTIAL_BYTES = 64 * 1024
+COPY_SUFFIX = re.compile(r"\(\d+\)$")
+
+
+class DuplicateGroup:
+    """Identical files, with the copy to keep first."""
+    
+    def __init__(self, size: int, paths: List[Path], mtimes: Dict[Path, int] = None):
+        """
+        Args:
+            size: Size of each file in bytes
+            paths: Paths of the identical files, in keep order
+            mtimes: Modification times (ns) seen when the files were hashed
+        """
+        self.size = size
+        self.paths = paths
+        self.mtimes = mtimes or {}
+        
+    @property
+    def keeper(self) -> Path:
+        """The copy that is kept."""
+        return self.paths[0]
+        
+    @property
+    def duplicates(self) -> List[Path]:
+        """The redundant copies."""
+        return self.paths[1:]
+        
+    @property
+    def wasted_bytes(self) -> int:
+        """Space taken by the redundant copies."""
+        return self.size * len(self.duplicates)
+
+
+def _keep_order(item: Tuple[Path, os.stat_result]) -> tuple:
+    """Prefer the original name over ``(n)`` copies, then the oldest file."""
+    path, st = item
+    return bool(COPY_SUFFIX.search(path.stem)), st.st_mtime_ns, len(str(path)), str(path)
+
+
+class DuplicateFinder:
+    """Staged duplicate search over a directory tree."""
+    
+    def __init__(self, workers: int = 4, partial_bytes: int = PARTIAL_BYTES, min_size: int = 1,
+                 algorithm: str = "blake2b"):
+        """
+        Args:
+            workers: Hashing threads
+            partial_bytes: Bytes read from each end of a file in the partial stage
+            min_size: Ignore files smaller than this
+            algorithm: Digest for the full-hash stage (see FileHasher.ALGORITHMS)
+        """
+        self.workers = max(1, workers)
+        self.partial_bytes = max(1, partial_bytes)
+        self.min_size = max(1, min_size)
+        self.hasher = FileHasher(algorithm, self.workers)
+        self.files_scanned = 0
+        self.bytes_scanned = 0
+        self.stats = {}
+        self._partial_read = 0
+        self._read_lock = threading.Lock()
+        
+    @property
+    def bytes_read(self) -> int:
+        """Bytes read by both hashing stages."""
+        return self._partial_read + self.hasher.bytes_read
+    
+    def scan(self, root: str) -> Dict[int, List[Tuple[Path, os.stat_result]]]:
+        """
+        Group the regular files under a directory by size.
+        
+        Hidden files and folders are skipped, and every physical file is
+        counted once even if it is already hardlinked under several names.
+        """
+        by_size = {}
+        seen_inodes = set()
+        pending = [root]
+        while pending:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.name.startswith("."):
+                        continue
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                        continue
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                        
+                    st = entry.stat(follow_symlinks=False)
+                    if st.st_size < self.min_size:
+                        continue
+                    if st.st_nlink != 1:
+                        # DirEntry.stat() reports st_ino and st_nlink as 0 on
+                        # Windows; os.stat fills them in
+                        st = os.stat(entry.path, follow_symlinks=False)
+                        if st.st_ino:
+                            if (st.st_dev, st.st_ino) in seen_inodes:
+                                continue
+                            seen_inodes.add((st.st_dev, st.st_ino))
+                    by_size.setdefault(st.st_size, []).append((Path(entry.path), st))
+                    self.files_scanned += 1
+                    self.bytes_scanned += st.st_size
+        return by_size
+        
+    def _partial_digest(self, path: Path, size: int) -> bytes:
+        """Hash the first and last block (the whole file if it is small)."""
+        digest = hashlib.blake2b(size.to_bytes(8, 'little'))
+        with open(path, 'rb') as f:
+            if size <= 2 * self.partial_bytes:
+                data = f.read()
+            else:
+                data = f.read(self.partial_bytes)
+                f.seek(-self.partial_bytes, os.SEEK_END)
+                data += f.read(self.partial_bytes)
+        with self._read_lock:
+            self._partial_read += len(data)
+        digest.update(data)
+        return digest.digest()
+        
+    def _full_digest(self, path: Path, size: int) -> str:
+        """Hash a whole file."""
+        return self.hasher.hash_file(path)
+        
+    def _refine(self, pool: ThreadPoolExecutor, groups: List[List[Tuple[Path, os.stat_result]]],
+                digest_of) -> List[List[Tuple[Path, os.stat_result]]]:
+        """Split each candidate group by a digest, keeping groups of two or more."""
+        items = [item for group in groups for item in group]
+        digests = pool.map(lambda item: self._safe_digest(digest_of, item), items)
+        
+        buckets = {}
+        for item, digest in zip(items, digests):
+            if digest is not None:
+                buckets.setdefault((item[1].st_size, digest), []).append(item)
+        return [group for group in buckets.values() if len(group) > 1]
+        
+    def _safe_digest(self, digest_of, item: Tuple[Path, os.stat_result]):
+        """Digest a file, treating unreadable files as unique."""
+        path, st = item
+        try:
+            return digest_of(path, st.st_size)
+        except OSError:
+            return None
+    
+    def find(self, root: str) -> List[DuplicateGroup]:
+        """
+        Find groups of identical files under a directory.
+        
+        Returns:
+            Duplicate groups, largest waste first
+        """
+        candidates = [group for group in self.scan(root).values() if len(group) > 1]
+        self.stats["size_candidates"] = sum(len(group) for group in candidates)
+        
+        with ThreadPoolExecutor(self.workers) as pool:
+            candidates = self._refine(pool, candidates, self._partial_digest)
+            self.stats["partial_candidates"] = sum(len(group) for group in candidates)
+            
+            # Small files were read whole by the partial stage
+            settled = [group for group in candidates if group[0][1].st_size <= 2 * self.partial_bytes]
+            large = [group for group in candidates if group[0][1].st_size > 2 * self.partial_bytes]
+            self.stats["full_candidates"] = sum(len(group) for group in large)
+            settled += self._refine(pool, large, self._full_digest)
+            
+        groups = [DuplicateGroup(group[0][1].st_size, [path for path, _ in sorted(group, key=_keep_order)],
+                                 {path: st.st_mtime_ns for path, st in group})
+                  for group in settled]
+        groups.sort(key=lambda group: group.wasted_bytes, reverse=True)
+        return groups
+
+
+def resolve_duplicates(groups: Iterable[DuplicateGroup], action: str) -> List[Dict]:
+    """
+    Replace redundant copies with hardlinks to the kept file, or delete them.
+    
+    A copy is skipped if it changed since it was hashed. Hardlinks are
+    swapped in atomically, so a failure never loses the copy.
+    
+    Args:
+        groups: Duplicate groups from DuplicateFinder.find()
+        action: "hardlink" or "delete"
+        
+    Returns:
+        Operation log rows, one per redundant copy
+    """
+    operations = []
+    for group in groups:
+        keeper = group.keeper
+        for duplicate in group.duplicates:
+            status = "Success"
+            try:
+                st = os.stat(duplicate)
+                keeper_st = os.stat(keeper)
+                for path, current in ((duplicate, st), (keeper, keeper_st)):
+                    if current.st_size != group.size or current.st_mtime_ns != group.mtimes.get(path, current.st_mtime_ns):
+                        raise OSError("file changed since it was scanned")
+                
+                if action == "hardlink":
+                    if st.st_dev != keeper_st.st_dev:
+                        raise OSError("kept copy is on another device")
+                    temp_path = duplicate.with_name(f".{duplicate.name}.dedupe-tmp")
+                    os.link(keeper, temp_path)
+                    try:
+                        os.replace(temp_path, duplicate)
+                    except OSError:
+                        os.unlink(temp_path)
+                        raise
+                else:
+                    os.unlink(duplicate)
+            except OSError as e:
+                status = f"Failed: {e}"
+                
+            operations.append({
+                'timestamp': datetime.now().isoformat(),
+                'source': str(duplicate),
+                'target': str(keeper),
+                'category': action,
+                'status': status,
+                'attempts': 1,
+            })
+    return operations
+
+
+def _format_size(size: float) -> str:
+    """Human-readable byte count."""
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TiB"
+
+
+def main(argv: List[str] = None) -> int:
+    """Entry point for ``smartfilesort.py dedupe``."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="smartfilesort dedupe",
+                                     description="Find identical files in a target directory")
+    parser.add_argument("target", help="Directory to sweep")
+    parser.add_argument("--settings", help="Path to settings file")
+    action = parser.add_mutually_exclusive_group()
+    action.add_argument("--hardlink", action="store_true", help="Replace copies with hardlinks to the kept file")
+    action.add_argument("--delete", action="store_true", help="Delete copies, keeping one file per group")
+    parser.add_argument("--workers", type=int, help="Hashing threads (overrides performance.hash_workers)")
+    parser.add_argument("--algorithm", choices=FileHasher.ALGORITHMS,
+                        help="Full-file digest (overrides performance.hash_algorithm)")
+    parser.add_argument("--min-size", type=int, default=1, help="Ignore files smaller than this many bytes")
+    parser.add_argument("--top", type=int, default=20, help="Number of groups to list")
+    parser.add_argument("--logs-dir", help="Directory for the action log (default: logs/)")
+    
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.target):
+        print(f"Not a directory: {args.target}")
+        return 2
+        
+    performance = load_settings(args.settings).get("performance", {})
+    finder = DuplicateFinder(args.workers or int(performance.get("hash_workers", 4)), min_size=args.min_size,
+                             algorithm=args.algorithm or performance.get("hash_algorithm", "blake2b"))
+    groups = finder.find(args.target)
+    
+    wasted = sum(group.wasted_bytes for group in groups)
+    print(f"Scanned {finder.files_scanned} files ({_format_size(finder.bytes_scanned)}), "
+          f"read {_format_size(finder.bytes_read)}")
+    print(f"Candidates: {finder.stats['size_candidates']} by size, {finder.stats['partial_candidates']} "
+          f"by partial hash, {finder.stats['full_candidates']} hashed in full")
+    print(f"Found {len(groups)} duplicate groups, {_format_size(wasted)} reclaimable")
+    for group in groups[:args.top]:
+        print(f"\n{_format_size(group.size)} x {len(group.paths)}")
+        print(f"  keep    {group.keeper}")
+        for duplicate in group.duplicates:
+            print(f"  copy    {duplicate}")
+    
+    if not (args.hardlink or args.delete):
+        return 0
+        
+    operations = resolve_duplicates(groups, "hardlink" if args.hardlink else "delete")
+    failed = sum(1 for operation in operations if operation['status'] != 'Success')
+    log_file = save_operation_log(operations, args.logs_dir, prefix="dedupe")
+    print(f"\n{'Hardlinked' if args.hardlink else 'Deleted'} {len(operations) - failed} copies, {failed} failed")
+    if log_file:
+        print(f"Actions logged to: {log_file}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
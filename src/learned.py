@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Learned Classifier
+================================
+
+A naive Bayes filename classifier trained on where files ended up: the
+category folders of the target tree (including files moved there by hand)
+and the successful moves in the ``operations_*.csv`` logs. It runs as a
+fallback for files the rules leave in "Others", scoring a whole batch of
+names at once.
+
+Features are word tokens, digit-run lengths, the extension and character
+trigrams, hashed into a fixed number of buckets. With NumPy installed a
+batch is scored in one vectorized call; without it the same model is
+evaluated in plain Python.
+"""
+
+import os
+import re
+import sys
+import json
+import glob
+import math
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional
+    np = None
+
+
+DIMENSIONS = 1 << 16
+
+# Names scored per vectorized pass; bounds the (features x categories) gather
+PREDICT_CHUNK = 4096
+TOKEN_PATTERN = re.compile(r"[a-z]+|\d+")
+
+
+def name_features(name: str) -> List[int]:
+    """
+    Hashed features of a filename.
+    
+    Args:
+        name: Bare filename
+        
+    Returns:
+        Feature bucket indices (with repeats)
+    """
+    stem, ext = os.path.splitext(name.lower())
+    features = [f"e:{ext}"]
+    for token in TOKEN_PATTERN.findall(stem):
+        features.append(f"d:{len(token)}" if token.isdigit() else f"t:{token}")
+        
+    padded = f"^{stem[:64]}$"
+    features.extend(f"c:{padded[i:i + 3]}" for i in range(len(padded) - 2))
+    return [zlib.crc32(feature.encode('utf-8', 'surrogateescape')) & (DIMENSIONS - 1) for feature in features]
+
+
+class NameModel:
+    """Multinomial naive Bayes over hashed filename features."""
+    
+    def __init__(self, labels: List[str], label_counts: List[int], feature_counts: List[Dict[int, int]],
+                 alpha: float = 0.5):
+        """
+        Build a model from training counts.
+        
+        Args:
+            labels: Category names
+            label_counts: Training samples per category
+            feature_counts: Per category, {feature bucket: occurrences}
+            alpha: Additive smoothing
+        """
+        self.labels = labels
+        self.label_counts = label_counts
+        self.feature_counts = feature_counts
+        self.alpha = alpha
+        
+        total = sum(label_counts)
+        self.log_prior = [math.log(count / total) for count in label_counts]
+        self.feature_totals = [sum(counts.values()) for counts in feature_counts]
+        self.log_unseen = [-math.log(feature_total + alpha * DIMENSIONS) for feature_total in self.feature_totals]
+        
+        self._log_likelihood = None
+        if np is not None:
+            # Dense (categories x buckets) table for vectorized scoring
+            table = np.empty((len(labels), DIMENSIONS), dtype=np.float32)
+            for index, counts in enumerate(feature_counts):
+                table[index].fill(alpha)
+                if counts:
+                    buckets = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                    table[index, buckets] += np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+            self._log_likelihood = np.log(table) + np.array(self.log_unseen, dtype=np.float32)[:, None]
+    
+    @classmethod
+    def train(cls, samples: Iterable[Tuple[str, str]], alpha: float = 0.5) -> "NameModel":
+        """
+        Count features of labeled filenames.
+        
+        Args:
+            samples: (filename, category) pairs
+            alpha: Additive smoothing
+        """
+        index = {}
+        labels, label_counts, feature_counts = [], [], []
+        for name, label in samples:
+            if label not in index:
+                index[label] = len(labels)
+                labels.append(label)
+                label_counts.append(0)
+                feature_counts.append({})
+                
+            position = index[label]
+            label_counts[position] += 1
+            counts = feature_counts[position]
+            for feature in name_features(name):
+                counts[feature] = counts.get(feature, 0) + 1
+        
+        if not labels:
+            raise ValueError("No labeled files to train on")
+        return cls(labels, label_counts, feature_counts, alpha)
+        
+    def predict(self, names: List[str]) -> List[Tuple[str, float]]:
+        """
+        Classify a batch of filenames.
+        
+        Args:
+            names: Bare filenames
+            
+        Returns:
+            (category, posterior probability) per name
+        """
+        if not names:
+            return []
+        if self._log_likelihood is not None:
+            results = []
+            for start in range(0, len(names), PREDICT_CHUNK):
+                results.extend(self._predict_vectorized(names[start:start + PREDICT_CHUNK]))
+            return results
+        return [self._predict_one(name) for name in names]
+        
+    def _predict_vectorized(self, names: List[str]) -> List[Tuple[str, float]]:
+        """Score a chunk of names in one pass over a flat feature array."""
+        features = [name_features(name) for name in names]
+        rows = np.repeat(np.arange(len(names)), [len(row) for row in features])
+        columns = np.fromiter((bucket for row in features for bucket in row), dtype=np.int64, count=len(rows))
+        
+        scores = np.tile(np.array(self.log_prior, dtype=np.float64), (len(names), 1))
+        np.add.at(scores, rows, self._log_likelihood[:, columns].T)
+        
+        scores -= scores.max(axis=1, keepdims=True)
+        probabilities = np.exp(scores)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[label], float(probabilities[row, label])) for row, label in enumerate(best)]
+        
+    def _predict_one(self, name: str) -> Tuple[str, float]:
+        """Score one name in plain Python."""
+        features = name_features(name)
+        scores = []
+        for index, counts in enumerate(self.feature_counts):
+            score = self.log_prior[index]
+            for feature in features:
+                score += math.log(counts.get(feature, 0) + self.alpha) + self.log_unseen[index]
+            scores.append(score)
+            
+        top = max(scores)
+        weights = [math.exp(score - top) for score in scores]
+        best = weights.index(1.0)
+        return self.labels[best], weights[best] / sum(weights)
+        
+    def save(self, path: Path):
+        """Write the training counts as JSON."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "dimensions": DIMENSIONS,
+            "alpha": self.alpha,
+            "labels": self.labels,
+            "label_counts": self.label_counts,
+            "feature_counts": [sorted(counts.items()) for counts in self.feature_counts],
+        }
+        temp_path = path.with_suffix(".tmp")
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(temp_path, path)
+        
+    @classmethod
+    def load(cls, path: Path) -> Optional["NameModel"]:
+        """Load a saved model, or return None if it is missing or incompatible."""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("dimensions") != DIMENSIONS:
+            return None
+            
+        feature_counts = [{bucket: count for bucket, count in counts} for counts in data["feature_counts"]]
+        return cls(data["labels"], data["label_counts"], feature_counts, data.get("alpha", 0.5))
+
+
+def default_model_path(settings: Dict = None) -> Path:
+    """
+    Where the model is kept unless learning.model_path says otherwise.
+    
+    Args:
+        settings: Settings dictionary; the model goes in performance.cache_directory
+            (defaults to the cache folder next to src)
+    """
+    cache_dir = (settings or {}).get("performance", {}).get("cache_directory")
+    return Path(cache_dir or Path(__file__).parent.parent / "cache") / "learned_model.json"
+
+
+def collect_samples(target_dirs: List[str], logs_dir: str = None) -> List[Tuple[str, str]]:
+    """
+    Gather (filename, category) training pairs.
+    
+    Args:
+        target_dirs: Organized trees whose top-level folders are categories;
+            "Others" is skipped because its files are unlabeled
+        logs_dir: Directory holding operations_*.csv logs (None to skip logs)
+        
+    Returns:
+        Labeled filenames
+    """
+    samples = []
+    for target_dir in target_dirs:
+        with os.scandir(target_dir) as categories:
+            for category in categories:
+                if not category.is_dir() or category.name == "Others" or category.name.startswith("."):
+                    continue
+                for _, _, files in os.walk(category.path):
+                    samples.extend((name, category.name) for name in files if not name.startswith("."))
+    
+    if logs_dir:
+        import csv
+        
+        for log_file in sorted(glob.glob(os.path.join(logs_dir, "operations_*.csv"))):
+            with open(log_file, 'r', newline='', encoding='utf-8') as f:
+                for row in csv.DictReader(f):
+                    if row.get("status") == "Success" and row.get("category") not in (None, "", "Others"):
+                        samples.append((os.path.basename(row["source"].replace("\\", "/")), row["category"]))
+    return samples
+
+
+def main(argv: List[str] = None) -> int:
+    """Entry point for ``smartfilesort.py learn``."""
+    import argparse
+    import time
+    
+    parser = argparse.ArgumentParser(prog="smartfilesort learn",
+                                     description="Train the fallback filename classifier")
+    parser.add_argument("targets", nargs="+", help="Organized target directories to learn from")
+    parser.add_argument("--logs-dir", default=str(Path(__file__).parent.parent / "logs"),
+                        help="Directory holding operations_*.csv logs")
+    parser.add_argument("--no-logs", action="store_true", help="Learn from the target trees only")
+    parser.add_argument("--model", help="Model file (default: learning.model_path, or learned_model.json "
+                                        "in the cache directory)")
+    parser.add_argument("--settings", help="Path to settings file")
+    
+    args = parser.parse_args(argv)
+    
+    from smartfilesort import load_settings
+    settings = load_settings(args.settings)
+    model_path = args.model or settings.get("learning", {}).get("model_path") or default_model_path(settings)
+    
+    for target in args.targets:
+        if not os.path.isdir(target):
+            print(f"Not a directory: {target}")
+            return 2
+            
+    start = time.perf_counter()
+    try:
+        samples = collect_samples(args.targets, None if args.no_logs else args.logs_dir)
+    except OSError as e:
+        print(f"Could not read training data: {e}")
+        return 2
+    if not samples:
+        print("No labeled files found")
+        return 1
+        
+    # Every tenth sample is held out to report accuracy, once there are
+    # enough samples for both halves
+    held_out = samples[::10] if len(samples) >= 10 else []
+    correct = 0
+    if held_out:
+        model = NameModel.train(sample for index, sample in enumerate(samples) if index % 10)
+        predictions = model.predict([name for name, _ in held_out])
+        correct = sum(predicted == label for (predicted, _), (_, label) in zip(predictions, held_out))
+    
+    try:
+        model = NameModel.train(samples)
+        model.save(model_path)
+    except (OSError, ValueError) as e:
+        print(f"Could not train the model: {e}")
+        return 2
+    
+    print(f"Trained on {len(samples)} files in {len(model.labels)} categories "
+          f"({time.perf_counter() - start:.2f}s, {'NumPy' if np is not None else 'pure Python'})")
+    if held_out:
+        print(f"Held-out accuracy: {correct / len(held_out):.1%} on {len(held_out)} files")
+    print(f"Model saved to: {model_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
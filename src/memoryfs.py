@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort In-Memory Filesystem
+==================================
+
+A filesystem backend for FileOrganizer that keeps everything in memory and
+can misbehave on purpose: per-operation latency (a 20 ms stat on a slow
+network share), injected errors (locked files, a full disk), a throughput
+cap on reads and writes, and a seek penalty for reads that jump around
+like a spinning disk's head. Tests and benchmarks use it to model hostile
+storage on any machine and to compare the execution modes.
+
+    fs = MemoryFileSystem(latency={"stat": 0.02, "rename": 0.02})
+    fs.add_file("/inbox/report.pdf", b"...")
+    fs.inject("rename", "*/locked.pdf", PermissionError(errno.EACCES, "locked"), times=2)
+    FileOrganizer("/inbox", "/sorted", filesystem=fs).organize_files()
+"""
+
+import os
+import io
+import stat
+import time
+import errno
+import fnmatch
+import itertools
+import threading
+from collections import Counter
+from typing import Dict, List
+
+
+class _Node:
+    """A file or directory."""
+    
+    __slots__ = ("is_dir", "data", "mtime_ns", "ino", "dev", "offset", "extent")
+    
+    def __init__(self, is_dir: bool, ino: int, dev: int, data: bytes = b"", mtime_ns: int = None):
+        self.is_dir = is_dir
+        self.ino = ino
+        self.dev = dev
+        self.data = data
+        self.mtime_ns = mtime_ns if mtime_ns is not None else time.time_ns()
+        # Where the data lies on the device; assigned when it is written
+        self.offset = None
+        self.extent = 0
+
+
+class _Fault:
+    """An error raised by matching operations, optionally a limited number of times."""
+    
+    def __init__(self, op: str, pattern: str, error: Exception, times: int = None):
+        self.op = op
+        self.pattern = pattern
+        self.error = error
+        self.remaining = times
+
+
+class MemoryDirEntry:
+    """os.DirEntry look-alike; like the real one, it caches its stat result."""
+    
+    def __init__(self, fs: "MemoryFileSystem", directory: str, name: str, is_dir: bool):
+        self.name = name
+        self.path = os.path.join(directory, name)
+        self._fs = fs
+        self._is_dir = is_dir
+        self._stat = None
+        
+    def is_file(self) -> bool:
+        return not self._is_dir
+        
+    def is_dir(self) -> bool:
+        return self._is_dir
+        
+    def stat(self) -> os.stat_result:
+        if self._stat is None:
+            self._stat = self._fs.stat(self.path)
+        return self._stat
+        
+    def inode(self) -> int:
+        return self.stat().st_ino
+        
+    def __fspath__(self) -> str:
+        return self.path
+
+
+class _DirIterator:
+    """Context manager returned by scandir()."""
+    
+    def __init__(self, entries: List[MemoryDirEntry]):
+        self._entries = entries
+        
+    def __iter__(self):
+        return iter(self._entries)
+        
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+
+
+class MemoryFile(io.RawIOBase):
+    """Binary file handle; written data becomes visible when it is flushed or closed."""
+    
+    def __init__(self, fs: "MemoryFileSystem", path: str, data: bytes, writable: bool, position: int = 0):
+        super().__init__()
+        self._fs = fs
+        self._path = path
+        self._buffer = io.BytesIO(data)
+        self._buffer.seek(position)
+        self._writable = writable
+        self._dirty = False
+        
+    def readable(self) -> bool:
+        return True
+        
+    def writable(self) -> bool:
+        return self._writable
+        
+    def seekable(self) -> bool:
+        return True
+        
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        return self._buffer.seek(offset, whence)
+        
+    def tell(self) -> int:
+        return self._buffer.tell()
+        
+    def readinto(self, buffer) -> int:
+        self._fs._charge("read", self._path)
+        position = self._buffer.tell()
+        count = self._buffer.readinto(buffer)
+        self._fs._seek_to(self._path, position, count)
+        self._fs._throttle(self._path, count)
+        return count
+        
+    def read(self, size: int = -1) -> bytes:
+        self._fs._charge("read", self._path)
+        position = self._buffer.tell()
+        data = self._buffer.read(size)
+        self._fs._seek_to(self._path, position, len(data))
+        self._fs._throttle(self._path, len(data))
+        return data
+        
+    def write(self, data) -> int:
+        if not self._writable:
+            raise io.UnsupportedOperation("not writable")
+        self._fs._charge("write", self._path)
+        count = self._buffer.write(data)
+        self._fs._throttle(self._path, count)
+        self._dirty = True
+        return count
+        
+    def flush(self):
+        if self._dirty and not self.closed:
+            self._fs._store(self._path, self._buffer.getvalue())
+            self._dirty = False
+    
+    def close(self):
+        if not self.closed:
+            self.flush()
+        super().close()
+
+
+class MemoryFileSystem:
+    """In-memory backend with injectable latency, errors and throughput caps."""
+    
+    def __init__(self, latency: Dict[str, float] = None, bytes_per_second: float = None, sleep=time.sleep,
+                 seek_seconds: float = 0.0, clock=time.monotonic):
+        """
+        Initialize an empty filesystem.
+        
+        Args:
+            latency: Seconds added to each operation, keyed by operation name
+                (scandir, stat, exists, makedirs, rmdir, rename, replace, unlink,
+                open, read, write, copystat, fsync) or "*" for all of them
+            bytes_per_second: Cap on the data rate of reads and writes, shared
+                by every caller on the same device
+            sleep: Sleep function used for latency and throttling
+            seek_seconds: Penalty for a read that does not continue where the
+                previous read on its device left off; file data is laid out
+                on each device in the order it is written, independently of
+                inode numbers
+            clock: Monotonic clock function used for the data rate budget
+        """
+        self.latency = dict(latency or {})
+        self.bytes_per_second = bytes_per_second
+        self.sleep = sleep
+        self.clock = clock
+        self.seek_seconds = seek_seconds
+        
+        # Device -> byte offset of its read head / of its next free byte
+        self._heads = {}
+        self._allocated = {}
+        
+        # Device -> time at which its transfers queued so far are done
+        self._busy_until = {}
+        self.counts = Counter()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        
+        self._lock = threading.RLock()
+        self._nodes = {}
+        self._children = {}
+        self._mounts = {}
+        self._faults = []
+        self._inodes = itertools.count(1)
+        
+    # Setup and inspection helpers
+    
+    def mount(self, path, device: int):
+        """Put a directory tree on its own device, so renames out of it fail with EXDEV."""
+        self._mounts[self._norm(path)] = device
+        
+    def add_file(self, path, data: bytes = b"", mtime: float = None):
+        """Create a file (and its parent directories)."""
+        path = self._norm(path)
+        with self._lock:
+            self._makedirs(os.path.dirname(path))
+            mtime_ns = int(mtime * 1e9) if mtime is not None else None
+            node = _Node(False, next(self._inodes), self._device(path), bytes(data), mtime_ns)
+            self._allocate(node)
+            self._link(path, node)
+    
+    def read_file(self, path) -> bytes:
+        """Contents of a file."""
+        node = self._nodes.get(self._norm(path))
+        if node is None or node.is_dir:
+            raise FileNotFoundError(errno.ENOENT, "No such file", str(path))
+        return node.data
+        
+    def listdir(self, path) -> List[str]:
+        """Sorted names in a directory."""
+        return sorted(self._children.get(self._norm(path), ()))
+        
+    def inject(self, op: str, pattern: str = "*", error: Exception = None, times: int = None):
+        """
+        Make matching operations fail.
+        
+        Args:
+            op: Operation name, or "*" for every operation
+            pattern: fnmatch pattern for the path
+            error: Exception to raise (defaults to EIO)
+            times: Number of failures before the operation succeeds again
+                (None fails forever)
+        """
+        error = error if error is not None else OSError(errno.EIO, "Injected I/O error")
+        with self._lock:
+            self._faults.append(_Fault(op, pattern, error, times))
+    
+    # Backend interface used by FileOrganizer
+    
+    def scandir(self, path) -> _DirIterator:
+        path = self._norm(path)
+        self._charge("scandir", path)
+        with self._lock:
+            node = self._nodes.get(path)
+            if node is None:
+                raise FileNotFoundError(errno.ENOENT, "No such directory", path)
+            if not node.is_dir:
+                raise NotADirectoryError(errno.ENOTDIR, "Not a directory", path)
+            entries = [MemoryDirEntry(self, path, name, self._nodes[os.path.join(path, name)].is_dir)
+                       for name in sorted(self._children.get(path, ()))]
+        return _DirIterator(entries)
+        
+    def stat(self, path) -> os.stat_result:
+        path = self._norm(path)
+        self._charge("stat", path)
+        with self._lock:
+            node = self._nodes.get(path)
+            if node is None:
+                raise FileNotFoundError(errno.ENOENT, "No such file", path)
+            mode = (stat.S_IFDIR | 0o755) if node.is_dir else (stat.S_IFREG | 0o644)
+            seconds = node.mtime_ns / 1e9
+            return os.stat_result(
+                (mode, node.ino, node.dev, 1, 0, 0, len(node.data), int(seconds), int(seconds), int(seconds)),
+                {"st_atime": seconds, "st_mtime": seconds, "st_ctime": seconds,
+                 "st_atime_ns": node.mtime_ns, "st_mtime_ns": node.mtime_ns, "st_ctime_ns": node.mtime_ns},
+            )
+    
+    def exists(self, path) -> bool:
+        path = self._norm(path)
+        self._charge("exists", path)
+        return path in self._nodes
+        
+    def makedirs(self, path):
+        path = self._norm(path)
+        self._charge("makedirs", path)
+        with self._lock:
+            self._makedirs(path)
+    
+    def rmdir(self, path):
+        path = self._norm(path)
+        self._charge("rmdir", path)
+        with self._lock:
+            node = self._nodes.get(path)
+            if node is None:
+                raise FileNotFoundError(errno.ENOENT, "No such directory", path)
+            if not node.is_dir:
+                raise NotADirectoryError(errno.ENOTDIR, "Not a directory", path)
+            if self._children.get(path):
+                raise OSError(errno.ENOTEMPTY, "Directory not empty", path)
+            self._unlink(path)
+            self._children.pop(path, None)
+    
+    def rename(self, source, target):
+        self._move("rename", source, target)
+        
+    def replace(self, source, target):
+        self._move("replace", source, target)
+        
+    def unlink(self, path):
+        path = self._norm(path)
+        self._charge("unlink", path)
+        with self._lock:
+            node = self._nodes.get(path)
+            if node is None or node.is_dir:
+                raise FileNotFoundError(errno.ENOENT, "No such file", path)
+            self._unlink(path)
+    
+    def open(self, path, mode: str = 'rb') -> MemoryFile:
+        path = self._norm(path)
+        self._charge("open", path)
+        kind = mode.replace('b', '')
+        with self._lock:
+            node = self._nodes.get(path)
+            if node is not None and node.is_dir:
+                raise IsADirectoryError(errno.EISDIR, "Is a directory", path)
+                
+            if kind in ('r', 'r+'):
+                if node is None:
+                    raise FileNotFoundError(errno.ENOENT, "No such file", path)
+                return MemoryFile(self, path, node.data, kind == 'r+')
+                
+            if kind == 'x' and node is not None:
+                raise FileExistsError(errno.EEXIST, "File exists", path)
+            if kind not in ('w', 'x', 'a'):
+                raise ValueError(f"Unsupported mode: {mode}")
+            if os.path.dirname(path) not in self._nodes:
+                raise FileNotFoundError(errno.ENOENT, "No such directory", path)
+                
+            data = node.data if kind == 'a' and node is not None else b""
+            self._store(path, data)
+            return MemoryFile(self, path, data, True, len(data))
+    
+    def copystat(self, source, target):
+        source, target = self._norm(source), self._norm(target)
+        self._charge("copystat", target)
+        with self._lock:
+            self._nodes[target].mtime_ns = self._nodes[source].mtime_ns
+    
+    def fsync(self, path):
+        path = self._norm(path)
+        self._charge("fsync", path)
+        if path not in self._nodes:
+            raise FileNotFoundError(errno.ENOENT, "No such file", path)
+            
+    def fsync_directory(self, path):
+        self.fsync(path)
+        
+    def sync_filesystem(self, path) -> bool:
+        """One fsync-priced operation for the whole simulated filesystem."""
+        self.fsync(path)
+        return True
+        
+    def physical_offset(self, path):
+        """Position of a file's data on the simulated disk (None for empty files)."""
+        node = self._nodes.get(self._norm(path))
+        if node is None or node.is_dir or not node.data:
+            return None
+        return node.offset
+        
+    # Internals
+    
+    def _norm(self, path) -> str:
+        return os.path.normpath(os.path.abspath(os.fspath(path)))
+        
+    def _device(self, path: str) -> int:
+        best, device = "", 0
+        for prefix, dev in self._mounts.items():
+            if (path == prefix or path.startswith(prefix.rstrip(os.sep) + os.sep)) and len(prefix) > len(best):
+                best, device = prefix, dev
+        return device
+        
+    def _charge(self, op: str, path: str):
+        """Count an operation, raise any injected fault and apply its latency."""
+        with self._lock:
+            self.counts[op] += 1
+            for fault in self._faults:
+                if fault.op in (op, "*") and fault.remaining != 0 and fnmatch.fnmatch(path, fault.pattern):
+                    if fault.remaining is not None:
+                        fault.remaining -= 1
+                    raise fault.error
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            
+        try:
+            delay = self.latency.get(op, self.latency.get("*", 0))
+            if delay:
+                self.sleep(delay)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+    
+    def _seek_to(self, path: str, position: int, count: int):
+        """Move the device's read head past a read, charging a seek unless the read is sequential."""
+        with self._lock:
+            node = self._nodes.get(path)
+            if node is None or node.offset is None:
+                return
+            start = node.offset + position
+            sequential = self._heads.get(node.dev) == start
+            self._heads[node.dev] = start + count
+            if sequential:
+                return
+            self.counts["seek"] += 1
+        if self.seek_seconds:
+            self.sleep(self.seek_seconds)
+    
+    def _throttle(self, path: str, count: int):
+        """Queue a transfer on the path's device and wait until the device has carried it."""
+        if not self.bytes_per_second or not count:
+            return
+        with self._lock:
+            now = self.clock()
+            device = self._device(path)
+            done = max(now, self._busy_until.get(device, now)) + count / self.bytes_per_second
+            self._busy_until[device] = done
+        self.sleep(done - now)
+    
+    def _link(self, path: str, node: _Node):
+        self._nodes[path] = node
+        parent = os.path.dirname(path)
+        if parent != path:
+            self._children.setdefault(parent, set()).add(os.path.basename(path))
+    
+    def _unlink(self, path: str):
+        del self._nodes[path]
+        self._children.get(os.path.dirname(path), set()).discard(os.path.basename(path))
+        
+    def _makedirs(self, path: str):
+        missing = []
+        while path not in self._nodes:
+            missing.append(path)
+            parent = os.path.dirname(path)
+            if parent == path:
+                break
+            path = parent
+        for directory in reversed(missing):
+            self._link(directory, _Node(True, next(self._inodes), self._device(directory)))
+    
+    def _store(self, path: str, data: bytes):
+        with self._lock:
+            node = self._nodes.get(path)
+            if node is None:
+                node = _Node(False, next(self._inodes), self._device(path), data)
+                self._link(path, node)
+            else:
+                node.data = data
+                node.mtime_ns = time.time_ns()
+            self._allocate(node)
+    
+    def _allocate(self, node: _Node):
+        """Give a file's data room at the end of its device when it outgrows its extent."""
+        if len(node.data) > node.extent:
+            node.offset = self._allocated.get(node.dev, 0)
+            node.extent = len(node.data)
+            self._allocated[node.dev] = node.offset + node.extent
+    
+    def _move(self, op: str, source, target):
+        source, target = self._norm(source), self._norm(target)
+        self._charge(op, source)
+        with self._lock:
+            node = self._nodes.get(source)
+            if node is None:
+                raise FileNotFoundError(errno.ENOENT, "No such file", source)
+            if os.path.dirname(target) not in self._nodes:
+                raise FileNotFoundError(errno.ENOENT, "No such directory", target)
+            if self._device(source) != self._device(target):
+                raise OSError(errno.EXDEV, "Invalid cross-device link", source)
+                
+            existing = self._nodes.get(target)
+            if existing is not None:
+                if existing.is_dir:
+                    raise IsADirectoryError(errno.EISDIR, "Is a directory", target)
+                self._unlink(target)
+            self._unlink(source)
+            self._link(target, node)
@@ -0,0 +1,533 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Rule Tools
+========================
+
+Maintenance commands for the classification rules in ``config/rules.json``:
+replaying a corpus of filenames through the compiled rules to see which
+rules fire, which are dead or shadowed and what each pattern costs,
+linting patterns for catastrophic-backtracking risk, and simulating how
+a changed rules file would reclassify past files.
+"""
+
+import os
+import re
+import sys
+import glob
+import json
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple
+
+try:
+    from re import _parser as sre_parse, _constants as sre_constants
+except ImportError:  # Python < 3.11
+    import sre_parse
+    import sre_constants
+
+from smartfilesort import CompiledRules, FileClassifier, load_settings
+
+
+REPEAT_OPS = {sre_constants.MAX_REPEAT, sre_constants.MIN_REPEAT}
+if hasattr(sre_constants, "POSSESSIVE_REPEAT"):
+    REPEAT_OPS.add(sre_constants.POSSESSIVE_REPEAT)
+
+SEVERITY_ORDER = {"high": 0, "medium": 1, "low": 2}
+
+
+def _char_set(subpattern) -> object:
+    """
+    Approximate the characters a single-item subpattern can start with.
+    
+    Returns:
+        A set of code points, or None when the item can match "anything"
+        (``.``, character classes such as ``\\w``, or anything complex)
+    """
+    items = list(subpattern)
+    if not items:
+        return set()
+        
+    op, av = items[0]
+    if op is sre_constants.LITERAL:
+        return {av}
+    if op is sre_constants.IN:
+        chars = set()
+        for item_op, item_av in av:
+            if item_op is sre_constants.LITERAL:
+                chars.add(item_av)
+            elif item_op is sre_constants.RANGE:
+                chars.update(range(item_av[0], item_av[1] + 1))
+            else:
+                return None
+        return chars
+    return None
+
+
+def _overlaps(first, second) -> bool:
+    """Check whether two repeated bodies can match a common character."""
+    first_chars = _char_set(first)
+    second_chars = _char_set(second)
+    if first_chars is None or second_chars is None:
+        return True
+    return bool(first_chars & second_chars)
+
+
+def _walk(subpattern, inside_repeat: bool, findings: List[Tuple[str, str]]):
+    """Recursively look for backtracking-prone constructs."""
+    previous_unbounded = None
+    
+    for op, av in subpattern:
+        if op in REPEAT_OPS:
+            low, high, body = av
+            unbounded = high == sre_constants.MAXREPEAT
+            
+            if unbounded and inside_repeat:
+                findings.append(("high", "nested unbounded quantifier (exponential backtracking)"))
+            if unbounded and previous_unbounded is not None and _overlaps(previous_unbounded, body):
+                findings.append(("medium", "adjacent overlapping quantifiers (polynomial backtracking)"))
+                
+            _walk(body, inside_repeat or unbounded, findings)
+            previous_unbounded = body if unbounded else None
+        elif op is sre_constants.SUBPATTERN:
+            _walk(av[-1], inside_repeat, findings)
+            previous_unbounded = None
+        elif op is sre_constants.BRANCH:
+            for branch in av[1]:
+                _walk(branch, inside_repeat, findings)
+            previous_unbounded = None
+        else:
+            previous_unbounded = None
+
+
+def lint_pattern(pattern: str) -> List[Tuple[str, str]]:
+    """
+    Statically check a rule pattern for backtracking risk.
+    
+    Args:
+        pattern: Regular expression as written in rules.json
+        
+    Returns:
+        List of (severity, message) findings, most severe first
+    """
+    try:
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+    except re.error as e:
+        return [("high", f"invalid regex: {e}")]
+        
+    findings = []
+    _walk(parsed, False, findings)
+    
+    items = list(parsed)
+    if items and items[0][0] in REPEAT_OPS:
+        low, high, body = items[0][1]
+        if low == 0 and high == sre_constants.MAXREPEAT and _char_set(body) is None:
+            findings.append(("low", "leading unbounded quantifier is redundant: patterns are searched unanchored"))
+            
+    # De-duplicate while keeping the most severe first
+    unique = sorted(set(findings), key=lambda finding: SEVERITY_ORDER[finding[0]])
+    return unique
+
+
+class RuleProfile:
+    """Hit counts, timings and lint findings for one rule set and corpus."""
+    
+    def __init__(self, rules: CompiledRules):
+        """Initialize empty counters for every rule."""
+        self.rules = rules
+        self.total_names = 0
+        self.category_hits = {category: 0 for category, _, _ in rules.categories}
+        self.category_hits["Others"] = 0
+        self.extension_hits = {category: 0 for category, _, _ in rules.categories}
+        
+        # Keyed by (category, pattern)
+        self.pattern_hits = {}
+        self.pattern_matches = {}
+        self.pattern_time_ns = {}
+        self.lint = {}
+        
+        # Patterns that do not compile; they are left out of the replay
+        self.invalid = set()
+        
+        for category, _, patterns in rules.categories:
+            for pattern in patterns:
+                key = (category, pattern)
+                self.pattern_hits[key] = 0
+                self.pattern_matches[key] = 0
+                self.pattern_time_ns[key] = 0
+                self.lint[key] = lint_pattern(pattern)
+                
+    def dead_patterns(self) -> List[Tuple[str, str]]:
+        """Patterns that matched no name in the corpus."""
+        return [key for key, count in self.pattern_matches.items() if count == 0 and key not in self.invalid]
+        
+    def shadowed_patterns(self) -> List[Tuple[str, str]]:
+        """Patterns that matched names but never decided a category."""
+        return [key for key, count in self.pattern_matches.items()
+                if count and not self.pattern_hits[key]]
+                
+    def shadowed_extensions(self) -> List[Tuple[str, str, str]]:
+        """Extensions listed by a category but claimed by an earlier one."""
+        shadowed = []
+        for index, (category, extensions, _) in enumerate(self.rules.categories):
+            for ext in sorted(extensions):
+                owner = self.rules.extension_index[ext]
+                if owner != index:
+                    shadowed.append((category, ext, self.rules.categories[owner][0]))
+        return shadowed
+        
+    def risky_patterns(self, severity: str = "medium") -> List[Tuple[Tuple[str, str], List]]:
+        """Patterns with lint findings at or above a severity."""
+        limit = SEVERITY_ORDER[severity]
+        return [(key, findings) for key, findings in self.lint.items()
+                if any(SEVERITY_ORDER[level] <= limit for level, _ in findings)]
+
+
+def profile_rules(rules: CompiledRules, names: Iterable[str]) -> RuleProfile:
+    """
+    Replay filenames through a compiled rule set.
+    
+    Every pattern is timed against every name so costs are comparable;
+    the deciding rule follows the same order as CompiledRules.classify().
+    Patterns that do not compile are skipped and reported as high-severity
+    lint findings.
+    
+    Args:
+        rules: Compiled rules to profile
+        names: Filenames to classify
+        
+    Returns:
+        Populated RuleProfile
+    """
+    profile = RuleProfile(rules)
+    compiled = []
+    for category, _, patterns in rules.categories:
+        regexes = []
+        for pattern in patterns:
+            try:
+                regexes.append((pattern, re.compile(pattern, re.IGNORECASE)))
+            except re.error as e:
+                key = (category, pattern)
+                profile.invalid.add(key)
+                if not any(message.startswith("invalid regex") for _, message in profile.lint[key]):
+                    profile.lint[key].insert(0, ("high", f"invalid regex: {e}"))
+        compiled.append(regexes)
+    clock = time.perf_counter_ns
+    
+    for name in names:
+        filename = name.lower()
+        stop = rules.extension_index.get(os.path.splitext(filename)[1], len(rules.categories))
+        decided = None
+        
+        for index, (category, _, _) in enumerate(rules.categories):
+            for pattern, regex in compiled[index]:
+                key = (category, pattern)
+                start = clock()
+                matched = regex.search(filename) is not None
+                profile.pattern_time_ns[key] += clock() - start
+                
+                if matched:
+                    profile.pattern_matches[key] += 1
+                    if decided is None and index < stop:
+                        decided = category
+                        profile.pattern_hits[key] += 1
+                        
+        if decided is None and stop < len(rules.categories):
+            decided = rules.categories[stop][0]
+            profile.extension_hits[decided] += 1
+            
+        profile.category_hits[decided or "Others"] += 1
+        profile.total_names += 1
+        
+    return profile
+
+
+def format_profile(profile: RuleProfile, top: int = 10) -> str:
+    """Render a profile as a plain-text report."""
+    lines = [f"Profiled {profile.total_names} names against {len(profile.rules.categories)} categories", ""]
+    
+    lines.append("Category hits (extension / total):")
+    for category, hits in profile.category_hits.items():
+        extension_hits = profile.extension_hits.get(category, 0)
+        lines.append(f"  {category:<15} {extension_hits:>8} / {hits:<8}")
+        
+    lines.append("")
+    lines.append(f"Most expensive patterns (top {top}):")
+    by_cost = sorted(profile.pattern_time_ns.items(), key=lambda item: item[1], reverse=True)
+    for (category, pattern), elapsed in by_cost[:top]:
+        per_name = elapsed / profile.total_names if profile.total_names else 0
+        lines.append(f"  {elapsed / 1e6:>9.2f} ms  {per_name:>8.0f} ns/name  "
+                     f"hits={profile.pattern_hits[(category, pattern)]:<6} {category}: {pattern}")
+                     
+    sections = [
+        ("Dead patterns (never matched)", [f"{c}: {p}" for c, p in profile.dead_patterns()]),
+        ("Shadowed patterns (matched, but another rule always decided first)",
+         [f"{c}: {p}" for c, p in profile.shadowed_patterns()]),
+        ("Shadowed extensions", [f"{c}: {ext} (claimed by {owner})"
+                                 for c, ext, owner in profile.shadowed_extensions()]),
+        ("Pattern lint", [f"[{level}] {c}: {p} - {message}"
+                          for (c, p), findings in profile.lint.items() for level, message in findings]),
+    ]
+    for title, entries in sections:
+        lines.append("")
+        lines.append(f"{title}: {len(entries)}")
+        lines.extend(f"  {entry}" for entry in entries)
+        
+    return "\n".join(lines)
+
+
+def _combine_patterns(patterns: Tuple[str, ...]) -> Optional[List]:
+    """
+    Compile a category's patterns for fast searching.
+    
+    Patterns are joined into one alternation so each name costs a single
+    search per category. Patterns that cannot be joined safely (those with
+    backreferences or inline flags) stay separate.
+    
+    Returns:
+        Compiled regexes to try in order, or None if there are none
+    """
+    if not patterns:
+        return None
+    
+    joinable = [pattern for pattern in patterns if not re.search(r"\\\d|\(\?P=|\(\?[aiLmsux]+\)", pattern)]
+    separate = [re.compile(pattern, re.IGNORECASE) for pattern in patterns if pattern not in joinable]
+    if joinable:
+        try:
+            separate.insert(0, re.compile("|".join(f"(?:{pattern})" for pattern in joinable), re.IGNORECASE))
+        except re.error:
+            separate = [re.compile(pattern, re.IGNORECASE) for pattern in patterns]
+    return separate
+
+
+class BatchClassifier:
+    """Classifies like CompiledRules.classify(), tuned for large batches of names."""
+    
+    def __init__(self, rules: CompiledRules):
+        """Compile one combined regex per category."""
+        self.rules = rules
+        self.combined = [_combine_patterns(patterns) for _, _, patterns in rules.categories]
+        
+    def classify(self, filename: str) -> str:
+        """Classify a lower-cased bare filename."""
+        rules = self.rules
+        stop = rules.extension_index.get(os.path.splitext(filename)[1], len(rules.categories))
+        
+        for index in range(stop):
+            regexes = self.combined[index]
+            if regexes is not None:
+                for regex in regexes:
+                    if regex.search(filename):
+                        return rules.categories[index][0]
+                        
+        if stop < len(rules.categories):
+            return rules.categories[stop][0]
+        return "Others"
+
+
+class Simulation:
+    """Category transitions between two rule sets over one corpus."""
+    
+    def __init__(self, old: CompiledRules, new: CompiledRules):
+        """Initialize empty counters."""
+        self.old = old
+        self.new = new
+        self.total_names = 0
+        self.unique_names = 0
+        self.transitions = Counter()
+        self.samples = {}
+        
+    @property
+    def changed(self) -> int:
+        """Names whose category differs between the rule sets."""
+        return sum(count for (before, after), count in self.transitions.items() if before != after)
+        
+    def categories(self) -> List[str]:
+        """Every category of either rule set, old order first, Others last."""
+        ordered = [category for category, _, _ in self.old.categories]
+        ordered += [category for category, _, _ in self.new.categories if category not in ordered]
+        return ordered + ["Others"]
+
+
+def simulate_rules(old: CompiledRules, new: CompiledRules, names: Iterable[str], samples: int = 5) -> Simulation:
+    """
+    Replay filenames through two rule sets and count category transitions.
+    
+    Names are classified case-insensitively, so each distinct lower-cased
+    name is classified once per rule set however often it occurs.
+    
+    Args:
+        old: Rules currently deployed
+        new: Proposed rules
+        names: Filenames to replay
+        samples: Example names to keep per changed transition
+        
+    Returns:
+        Populated Simulation
+    """
+    simulation = Simulation(old, new)
+    counts = Counter(name.lower() for name in names)
+    old_classifier = BatchClassifier(old)
+    new_classifier = BatchClassifier(new)
+    
+    for name, count in counts.items():
+        before = old_classifier.classify(name)
+        after = new_classifier.classify(name)
+        simulation.transitions[(before, after)] += count
+        if before != after:
+            examples = simulation.samples.setdefault((before, after), [])
+            if len(examples) < samples:
+                examples.append(name)
+                
+    simulation.total_names = sum(counts.values())
+    simulation.unique_names = len(counts)
+    return simulation
+
+
+def format_simulation(simulation: Simulation) -> str:
+    """Render a simulation as a transition matrix and sample diffs."""
+    total = simulation.total_names
+    changed = simulation.changed
+    share = changed / total if total else 0.0
+    lines = [f"Replayed {total} names ({simulation.unique_names} distinct): "
+             f"{changed} would change category ({share:.2%})", ""]
+    
+    categories = [category for category in simulation.categories()
+                  if any(category in pair for pair in simulation.transitions)]
+    width = max([len(category) for category in categories] + [8]) + 2
+    lines.append("Transition matrix (rows: current rules, columns: new rules):")
+    lines.append(" " * width + "".join(f"{category:>{width}}" for category in categories))
+    for before in categories:
+        cells = "".join(f"{simulation.transitions.get((before, after), 0):>{width}}" for after in categories)
+        lines.append(f"{before:<{width}}{cells}")
+        
+    changes = sorted(((pair, count) for pair, count in simulation.transitions.items() if pair[0] != pair[1]),
+                     key=lambda item: item[1], reverse=True)
+    lines.append("")
+    lines.append(f"Changes: {len(changes)}")
+    for (before, after), count in changes:
+        lines.append(f"  {before} -> {after}: {count}")
+        lines.extend(f"    {name}" for name in simulation.samples.get((before, after), []))
+        
+    return "\n".join(lines)
+
+
+def load_rules_file(path: str) -> CompiledRules:
+    """
+    Compile a rules file without falling back to defaults.
+    
+    Raises:
+        OSError, ValueError: If the file cannot be read or parsed
+    """
+    import hashlib
+    
+    with open(path, 'rb') as f:
+        data = f.read()
+    rules = json.loads(data)
+    if not isinstance(rules, dict):
+        raise ValueError("rules file must contain a JSON object")
+    compiled = CompiledRules(rules, hashlib.sha1(data).hexdigest())
+    for index in range(len(compiled.categories)):
+        compiled.category_patterns(index)
+    return compiled
+
+
+def load_corpus(corpus: str = None, logs_dir: str = None) -> List[str]:
+    """
+    Collect filenames to replay.
+    
+    Args:
+        corpus: Directory to walk, or text file with one filename per line;
+            when omitted, names are taken from the operation logs
+        logs_dir: Directory holding operations_*.csv logs
+        
+    Returns:
+        List of bare filenames
+    """
+    if corpus:
+        if os.path.isdir(corpus):
+            names = []
+            for _, _, files in os.walk(corpus):
+                names.extend(files)
+            return names
+        with open(corpus, 'r', encoding='utf-8') as f:
+            return [os.path.basename(line.strip()) for line in f if line.strip()]
+            
+    import csv
+    
+    logs_dir = logs_dir or str(Path(__file__).parent.parent / "logs")
+    names = []
+    for log_file in sorted(glob.glob(os.path.join(logs_dir, "operations_*.csv"))):
+        with open(log_file, 'r', newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                source = row.get("source")
+                if source:
+                    names.append(os.path.basename(source.replace("\\", "/")))
+    return names
+
+
+def main(argv: List[str] = None) -> int:
+    """Entry point for ``smartfilesort.py rules ...``."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="smartfilesort rules", description="Classification rule tools")
+    subparsers = parser.add_subparsers(dest="command")
+    
+    profile_parser = subparsers.add_parser("profile", help="Replay names through the rules and report hits and costs")
+    profile_parser.add_argument("--config", help="Path to rules file")
+    profile_parser.add_argument("--settings", help="Path to settings file (for the cache directory)")
+    profile_parser.add_argument("--corpus", help="Directory or text file of filenames (default: operation logs)")
+    profile_parser.add_argument("--logs-dir", help="Directory holding operations_*.csv logs")
+    profile_parser.add_argument("--top", type=int, default=10, help="Number of expensive patterns to list")
+    profile_parser.add_argument("--strict", action="store_true",
+                                help="Exit with status 1 if any pattern has medium or high backtracking risk "
+                                     "(invalid patterns always do)")
+                                
+    simulate_parser = subparsers.add_parser("simulate",
+                                            help="Show how a changed rules file would reclassify past files")
+    simulate_parser.add_argument("new_rules", help="Proposed rules file")
+    simulate_parser.add_argument("--config", help="Current rules file (default: config/rules.json)")
+    simulate_parser.add_argument("--settings", help="Path to settings file (for the cache directory)")
+    simulate_parser.add_argument("--corpus", help="Directory (e.g. the target tree) or text file of filenames "
+                                                  "(default: operation logs)")
+    simulate_parser.add_argument("--logs-dir", help="Directory holding operations_*.csv logs")
+    simulate_parser.add_argument("--samples", type=int, default=5, help="Example names to show per change")
+    simulate_parser.add_argument("--max-changed", type=float, metavar="PERCENT",
+                                 help="Exit with status 1 if more than this share of names would change")
+                                
+    args = parser.parse_args(argv)
+    if args.command is None:
+        parser.print_help()
+        return 2
+        
+    # The rules snapshot lives with the other caches
+    snapshot_dir = load_settings(args.settings).get("performance", {}).get("cache_directory") or None
+    current_rules = FileClassifier(args.config, snapshot_dir).current_rules()
+        
+    if args.command == "simulate":
+        try:
+            new_rules = load_rules_file(args.new_rules)
+        except (OSError, ValueError, re.error) as e:
+            print(f"Cannot load {args.new_rules}: {e}")
+            return 2
+            
+        start = time.perf_counter()
+        simulation = simulate_rules(current_rules, new_rules,
+                                    load_corpus(args.corpus, args.logs_dir), args.samples)
+        print(format_simulation(simulation))
+        print(f"\nSimulated in {time.perf_counter() - start:.2f}s")
+        
+        if args.max_changed is not None and simulation.changed > simulation.total_names * args.max_changed / 100:
+            return 1
+        return 0
+        
+    profile = profile_rules(current_rules, load_corpus(args.corpus, args.logs_dir))
+    print(format_profile(profile, args.top))
+    
+    if profile.invalid or (args.strict and profile.risky_patterns()):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
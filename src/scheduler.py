@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Scheduler
+=======================
+
+In-process scheduler for ``smartfilesort.py serve``. Instead of launching a
+fresh interpreter for every interval (scripts/run_organizer.bat), one
+process keeps a FileOrganizer alive and runs it every
+``scheduling.auto_run_interval_minutes``, so compiled rules, caches and
+indexes stay warm between runs. Runs are skipped during quiet hours, and
+a lock file keeps two scheduler processes from overlapping.
+"""
+
+import os
+import sys
+import time
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List
+
+from smartfilesort import FileOrganizer, load_settings, parse_clock_time, minutes_left_in_window, _GracefulStop
+
+
+class ProcessLock:
+    """Exclusive, non-blocking lock file released automatically if the process dies."""
+    
+    def __init__(self, lock_path: str):
+        """
+        Initialize the lock.
+        
+        Args:
+            lock_path: Path of the lock file
+        """
+        self.lock_path = Path(lock_path)
+        self._file = None
+        
+    def acquire(self) -> bool:
+        """
+        Try to take the lock.
+        
+        Returns:
+            True if the lock was taken, False if another process holds it
+        """
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        lock_file = open(self.lock_path, 'a+')
+        
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+            
+        lock_file.seek(0)
+        lock_file.truncate()
+        lock_file.write(str(os.getpid()))
+        lock_file.flush()
+        self._file = lock_file
+        return True
+        
+    def release(self):
+        """Release the lock if held."""
+        if self._file is None:
+            return
+            
+        try:
+            if os.name == 'nt':
+                import msvcrt
+                self._file.seek(0)
+                msvcrt.locking(self._file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_UN)
+        finally:
+            self._file.close()
+            self._file = None
+    
+    def __enter__(self):
+        return self
+        
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+
+
+class Scheduler:
+    """Runs an organizer at a fixed interval inside one process."""
+    
+    def __init__(self, organizer: FileOrganizer, settings: Dict = None, dry_run: bool = False,
+                 clock=time.monotonic, sleep=time.sleep, now=datetime.now):
+        """
+        Initialize the scheduler.
+        
+        Args:
+            organizer: Organizer reused for every run
+            settings: Settings dictionary as loaded by load_settings()
+            dry_run: If True, runs only log what would be done
+            clock: Monotonic clock function
+            sleep: Sleep function
+            now: Wall-clock function used for quiet hours
+        """
+        scheduling = (settings or {}).get("scheduling", {})
+        self.organizer = organizer
+        self.dry_run = dry_run
+        self.interval = max(1.0, float(scheduling.get("auto_run_interval_minutes", 60)) * 60)
+        self.clock = clock
+        self.sleep = sleep
+        self.now = now
+        self.logger = logging.getLogger("SmartFileSort")
+        
+        self.quiet_hours = None
+        if scheduling.get("quiet_hours_start") and scheduling.get("quiet_hours_end"):
+            self.quiet_hours = (parse_clock_time(scheduling["quiet_hours_start"]),
+                                parse_clock_time(scheduling["quiet_hours_end"]))
+        
+        self.runs = 0
+        self.skipped = 0
+        self.stopped = False
+        
+    def in_quiet_hours(self) -> bool:
+        """Check whether the current wall-clock time is in quiet hours."""
+        if self.quiet_hours is None:
+            return False
+        current = self.now()
+        return minutes_left_in_window(current.hour * 60 + current.minute, *self.quiet_hours) is not None
+        
+    def run_once(self) -> bool:
+        """
+        Run one organization unless quiet hours are active.
+        
+        Returns:
+            True if a run happened, False if it was skipped
+        """
+        if self.in_quiet_hours():
+            self.skipped += 1
+            self.logger.info("Quiet hours: skipping scheduled run")
+            return False
+            
+        try:
+            self.organizer.organize_files(dry_run=self.dry_run)
+        except Exception as e:
+            self.logger.error(f"Scheduled run failed: {e}")
+            
+        self.runs += 1
+        return True
+        
+    def serve(self, max_iterations: int = None):
+        """
+        Run on the configured interval until stopped or the organizer's
+        control is cancelled (which also ends the run in progress).
+        
+        Args:
+            max_iterations: Stop after this many scheduled slots (for tests)
+        """
+        next_run = self.clock()
+        iterations = 0
+        
+        control = self.organizer.control
+        while not self.stopped and not control.cancelled and (max_iterations is None or iterations < max_iterations):
+            wait = next_run - self.clock()
+            if wait > 0:
+                self.sleep(wait)
+            if control.cancelled:
+                break
+                
+            self.run_once()
+            iterations += 1
+            
+            # Slots missed by a long run are skipped rather than run back to back
+            next_run += self.interval
+            if next_run < self.clock():
+                next_run = self.clock() + self.interval
+    
+    def stop(self):
+        """Ask the loop to stop after the current run."""
+        self.stopped = True
+
+
+def main(argv: List[str] = None) -> int:
+    """Entry point for ``smartfilesort.py serve``."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="smartfilesort serve",
+                                     description="Run SmartFileSort on a schedule in one long-lived process")
+    parser.add_argument("source", nargs="?", help="Source directory (default: general.source_directory)")
+    parser.add_argument("target", nargs="?", help="Target directory (default: general.target_directory)")
+    parser.add_argument("--dry-run", action="store_true", help="Preview actions without moving files")
+    parser.add_argument("--config", help="Path to configuration file")
+    parser.add_argument("--settings", help="Path to settings file")
+    parser.add_argument("--lock-file", help="Lock file (default: serve.lock in the cache directory)")
+    
+    args = parser.parse_args(argv)
+    settings = load_settings(args.settings)
+    general = settings.get("general", {})
+    
+    source = args.source or os.path.expandvars(general.get("source_directory", ""))
+    target = args.target or os.path.expandvars(general.get("target_directory", ""))
+    if not source or not target:
+        parser.error("source and target are required when settings do not define them")
+        
+    # One scheduler per cache directory, so separate deployments do not block each other
+    cache_dir = settings.get("performance", {}).get("cache_directory") or Path(__file__).parent.parent / "cache"
+    lock = ProcessLock(args.lock_file or Path(cache_dir) / "serve.lock")
+    if not lock.acquire():
+        print(f"Another SmartFileSort scheduler is already running (lock: {lock.lock_path})")
+        return 1
+        
+    with lock:
+        organizer = FileOrganizer(source, target, args.config, settings)
+        # Sleeping on the run's cancel token lets a stop signal end the wait
+        scheduler = Scheduler(organizer, settings, dry_run=args.dry_run, sleep=organizer.control.wait)
+        organizer.logger.info(f"Serving: organizing every {scheduler.interval / 60:g} minutes")
+        
+        # SIGINT/SIGTERM finish the file in progress, then end the loop
+        try:
+            with _GracefulStop(organizer.control):
+                scheduler.serve()
+        except KeyboardInterrupt:
+            pass
+        organizer.logger.info("Scheduler stopped")
+    
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
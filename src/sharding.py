@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Folder Sharding
+=============================
+
+Keeps category folders small. Once a folder passes ``sharding.max_entries``
+entries it is split into balanced subfolders, chosen by a hash of the
+filename (``Images/3f/photo.jpg``) or by the file's date
+(``Images/2025-09/photo.jpg``). A marker file records the layout, so later
+runs place new files straight into the right subfolder and every
+directory lookup and listing stays small. ``smartfilesort.py reshard``
+migrates existing folders in place. Listings, markers and moves go through
+the organizer's filesystem backend.
+"""
+
+import os
+import re
+import sys
+import json
+import zlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from smartfilesort import DateExtractor, FileClassifier, OSFileSystem, load_settings
+
+
+MARKER_FILE = ".smartfilesort-shards.json"
+
+# Names of the year/month/day folders create_date_folders adds under a category
+DATE_FOLDER_PATTERN = re.compile(r"^\d+(?:[-_.]\d+)*$")
+
+
+class ShardPolicy:
+    """Decides which subfolder of a sharded folder a file belongs in."""
+    
+    def __init__(self, settings: Dict = None, date_extractor: DateExtractor = None, filesystem=None):
+        """
+        Initialize the policy from the "sharding" settings.
+        
+        Args:
+            settings: Settings dictionary as loaded by load_settings()
+            date_extractor: Extractor to reuse for date placement
+            filesystem: Backend holding the sharded folders (defaults to the OS)
+        """
+        sharding = (settings or {}).get("sharding", {})
+        self.max_entries = max(1, int(sharding.get("max_entries", 5000)))
+        self.method = sharding.get("method", "hash")
+        if self.method not in ("hash", "date"):
+            raise ValueError(f"Unknown sharding method: {self.method}")
+        self.hash_width = min(8, max(1, int(sharding.get("hash_width", 2))))
+        self.fs = filesystem or OSFileSystem()
+        self.date_extractor = date_extractor or DateExtractor(filesystem=self.fs)
+        self.logger = logging.getLogger("SmartFileSort")
+        
+        # Folder -> layout ({"method", "hash_width"}) or None, per run
+        self._layouts = {}
+        self._lock = threading.Lock()
+        self.dry_run = False
+    
+    def reset(self, dry_run: bool = False):
+        """
+        Forget folder layouts seen in the previous run.
+        
+        Args:
+            dry_run: If True, oversized folders are reported as sharded
+                without moving anything
+        """
+        with self._lock:
+            self._layouts.clear()
+            self.dry_run = dry_run
+    
+    def bucket(self, path: Path, file_stat: os.stat_result = None, layout: Dict = None) -> str:
+        """
+        Subfolder name for a file.
+        
+        Args:
+            path: Path to the file (only the name is used for hash placement)
+            file_stat: Stat result already known for the file, if any
+            layout: Layout to place by (defaults to this policy's)
+        """
+        layout = layout or self.layout()
+        if layout["method"] == "date":
+            return self.date_extractor.date_of(path, file_stat).strftime("%Y-%m")
+            
+        width = layout["hash_width"]
+        digest = zlib.crc32(path.name.lower().encode('utf-8', 'surrogateescape'))
+        return f"{digest:08x}"[:width]
+        
+    def layout(self) -> Dict:
+        """The layout this policy creates."""
+        return {"method": self.method, "hash_width": self.hash_width}
+        
+    def folder_layout(self, folder: Path) -> Optional[Dict]:
+        """
+        Return the layout of a folder, sharding it first if it grew too large.
+        
+        The result is remembered for the rest of the run, so each folder
+        costs one marker read (and at most one listing) per run.
+        """
+        with self._lock:
+            if folder in self._layouts:
+                return self._layouts[folder]
+                
+            layout = read_layout(folder, self.fs)
+            if layout is None and count_entries(folder, self.fs) >= self.max_entries:
+                self.logger.info(f"{folder} passed {self.max_entries} entries; sharding it")
+                reshard_folder(folder, self, self.dry_run)
+                layout = self.layout()
+                
+            self._layouts[folder] = layout
+            return layout
+    
+    def place(self, folder: Path, source_path: Path, file_stat: os.stat_result = None) -> Path:
+        """Folder a file should go to inside a (possibly sharded) category folder."""
+        layout = self.folder_layout(folder)
+        if layout is None:
+            return folder
+        return folder / self.bucket(source_path, file_stat, layout)
+
+
+def read_layout(folder: Path, filesystem=None) -> Optional[Dict]:
+    """Layout recorded in a folder's marker file, or None if it is not sharded."""
+    filesystem = filesystem or OSFileSystem()
+    try:
+        with filesystem.open(Path(folder) / MARKER_FILE, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def count_entries(folder: Path, filesystem=None) -> int:
+    """Number of entries directly in a folder (0 if it does not exist)."""
+    filesystem = filesystem or OSFileSystem()
+    try:
+        with filesystem.scandir(folder) as entries:
+            return sum(1 for _ in entries)
+    except OSError:
+        return 0
+
+
+def _free_path(path: Path, filesystem) -> Path:
+    """A non-existing variant of path, adding (n) before the suffix if needed."""
+    counter = 1
+    candidate = path
+    while filesystem.exists(candidate):
+        candidate = path.with_name(f"{path.stem}({counter}){path.suffix}")
+        counter += 1
+    return candidate
+
+
+def reshard_folder(folder: Path, policy: ShardPolicy, dry_run: bool = False) -> int:
+    """
+    Move a folder's files into the policy's subfolders, in place.
+    
+    Files directly in the folder are moved; if the folder was already
+    sharded, files in its old subfolders are re-placed too and emptied
+    subfolders are removed. The marker is written first, so files added
+    while this runs already go to their subfolders.
+    
+    Args:
+        folder: Folder to shard
+        policy: Policy deciding the layout
+        dry_run: If True, only count the files that would move
+        
+    Returns:
+        Number of files moved (or that would be moved)
+    """
+    folder = Path(folder)
+    fs = policy.fs
+    old_layout = read_layout(folder, fs)
+    
+    sources = []
+    old_buckets = []
+    with fs.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name == MARKER_FILE:
+                continue
+            if entry.is_file():
+                sources.append(Path(entry.path))
+            elif entry.is_dir() and old_layout is not None:
+                old_buckets.append(Path(entry.path))
+    
+    for bucket_dir in old_buckets:
+        with fs.scandir(bucket_dir) as entries:
+            sources.extend(Path(entry.path) for entry in entries if entry.is_file())
+    
+    if not dry_run:
+        with fs.open(folder / MARKER_FILE, 'wb') as f:
+            f.write(json.dumps(policy.layout()).encode('utf-8'))
+    
+    moved = 0
+    created = set()
+    for source in sources:
+        bucket_dir = folder / policy.bucket(source)
+        if source.parent == bucket_dir:
+            continue
+            
+        moved += 1
+        if dry_run:
+            continue
+            
+        if bucket_dir not in created:
+            fs.makedirs(bucket_dir)
+            created.add(bucket_dir)
+        fs.rename(source, _free_path(bucket_dir / source.name, fs))
+        
+    if not dry_run:
+        for bucket_dir in old_buckets:
+            try:
+                fs.rmdir(bucket_dir)
+            except OSError:  # Still holds files of the new layout
+                pass
+    
+    return moved
+
+
+def category_folders(target: Path, categories: List[str]):
+    """
+    Walk the folders the organizer files into, which are the ones that can be sharded.
+    
+    Only the category folders directly under the target and the date folders
+    inside them are visited; the target root and any other folder are left
+    alone, since that may be where unsorted files live.
+    
+    Args:
+        target: Target directory
+        categories: Category folder names
+        
+    Yields:
+        (folder, files, subfolders) like os.walk; trimming subfolders prunes the walk
+    """
+    for category in categories:
+        root = Path(target) / category
+        if not root.is_dir():
+            continue
+        for folder, dirs, files in os.walk(root):
+            dirs[:] = [name for name in dirs if DATE_FOLDER_PATTERN.match(name)]
+            yield Path(folder), files, dirs
+
+
+def main(argv: List[str] = None) -> int:
+    """Entry point for ``smartfilesort.py reshard``."""
+    import argparse
+    
+    parser = argparse.ArgumentParser(prog="smartfilesort reshard",
+                                     description="Split oversized folders under a target directory into subfolders")
+    parser.add_argument("target", help="Target directory (as passed to smartfilesort.py)")
+    parser.add_argument("--config", help="Path to rules file (its categories are the folders resharded)")
+    parser.add_argument("--settings", help="Path to settings file")
+    parser.add_argument("--method", choices=["hash", "date"], help="Placement (overrides sharding.method)")
+    parser.add_argument("--max-entries", type=int,
+                        help="Shard folders with at least this many entries (overrides sharding.max_entries)")
+    parser.add_argument("--dry-run", action="store_true", help="Report what would move without moving files")
+    
+    args = parser.parse_args(argv)
+    
+    settings = load_settings(args.settings)
+    sharding = settings.setdefault("sharding", {})
+    if args.method:
+        sharding["method"] = args.method
+    if args.max_entries:
+        sharding["max_entries"] = args.max_entries
+    policy = ShardPolicy(settings)
+    
+    snapshot_dir = settings.get("performance", {}).get("cache_directory") or None
+    categories = list(FileClassifier(args.config, snapshot_dir).rules)
+    if "Others" not in categories:
+        categories.append("Others")
+    
+    total = 0
+    for folder, files, dirs in category_folders(Path(args.target), categories):
+        layout = read_layout(folder)
+        
+        if layout is not None:
+            # Bucket folders are handled with their parent
+            dirs[:] = []
+            if layout == policy.layout():
+                continue
+        elif len(files) + len(dirs) < policy.max_entries:
+            continue
+            
+        moved = reshard_folder(folder, policy, args.dry_run)
+        total += moved
+        print(f"{folder}: {'would move' if args.dry_run else 'moved'} {moved} files")
+        
+    print(f"Resharding complete: {total} files {'would be ' if args.dry_run else ''}moved")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
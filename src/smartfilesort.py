@@ -13,136 +13,2125 @@ Version: 1.0.0
 """
 
 import os
-import shutil
 import re
+import errno
+import heapq
+import itertools
 import logging
-import csv
 import json
-from datetime import datetime
+import fnmatch
+import marshal
+import stat
+import struct
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional
-import hashlib
+from typing import Callable, Dict, List, Tuple, Optional
+
+# shutil, csv and hashlib are imported by the stages that need them, which
+# keeps startup cheap for scheduled runs that only handle a few files.
+
+
+DEFAULT_RULES = {
+    "Documents": {
+        "extensions": [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt", ".xls", ".xlsx", ".ppt", ".pptx"],
+        "patterns": [
+            r"invoice.*\.(pdf|doc|docx)",
+            r"resume.*\.(pdf|doc|docx)",
+            r"report.*\.(pdf|doc|docx|txt)"
+        ]
+    },
+    "Images": {
+        "extensions": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".svg", ".webp", ".ico"],
+        "patterns": [
+            r"screenshot.*\.(jpg|jpeg|png)",
+            r"photo.*\.(jpg|jpeg|png)",
+            r"image.*\.(jpg|jpeg|png|gif)"
+        ]
+    },
+    "Videos": {
+        "extensions": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
+        "patterns": [
+            r"lecture.*\.(mp4|avi|mkv)",
+            r"tutorial.*\.(mp4|avi|mkv)",
+            r"meeting.*\.(mp4|avi|mkv)"
+        ]
+    },
+    "Audio": {
+        "extensions": [".mp3", ".wav", ".flac", ".aac", ".ogg", ".wma", ".m4a"],
+        "patterns": [
+            r"music.*\.(mp3|wav|flac)",
+            r"audio.*\.(mp3|wav|flac)",
+            r"podcast.*\.(mp3|wav)"
+        ]
+    },
+    "Code": {
+        "extensions": [".py", ".js", ".html", ".css", ".java", ".cpp", ".c", ".cs", ".php", ".rb", ".go", ".rs"],
+        "patterns": [
+            r"project.*\.(py|js|java|cpp)",
+            r"script.*\.(py|js|sh|bat)",
+            r".*_code\.(py|js|java|cpp)"
+        ]
+    },
+    "Archives": {
+        "extensions": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2", ".xz"],
+        "patterns": [
+            r"backup.*\.(zip|rar|tar|gz)",
+            r"archive.*\.(zip|rar|tar|gz)"
+        ]
+    },
+    "Executables": {
+        "extensions": [".exe", ".msi", ".dmg", ".deb", ".rpm", ".pkg"],
+        "patterns": [
+            r"setup.*\.(exe|msi)",
+            r"installer.*\.(exe|msi|dmg)"
+        ]
+    }
+}
+
+
+class CompiledRules:
+    """Immutable, precompiled view of a classification rule set."""
+    
+    def __init__(self, rules: Dict, fingerprint: str):
+        """
+        Precompute lookup structures for a rule set.
+        
+        Args:
+            rules: Classification rules as loaded from rules.json
+            fingerprint: Fingerprint identifying this rule set
+        """
+        self.rules = rules
+        self.fingerprint = fingerprint
+        self.categories = [
+            (category, frozenset(ext.lower() for ext in spec.get("extensions", [])),
+             tuple(spec.get("patterns", [])))
+            for category, spec in rules.items()
+        ]
+        
+        # First category claiming each extension; categories before it can
+        # still win through their naming patterns
+        self.extension_index = {}
+        for index, (_, extensions, _) in enumerate(self.categories):
+            for ext in extensions:
+                self.extension_index.setdefault(ext, index)
+        
+        self._patterns = [None] * len(self.categories)
+    
+    def category_patterns(self, index: int) -> list:
+        """Return the compiled patterns of a category, compiling on first use."""
+        patterns = self._patterns[index]
+        if patterns is None:
+            patterns = [re.compile(pattern, re.IGNORECASE) for pattern in self.categories[index][2]]
+            self._patterns[index] = patterns
+        return patterns
+    
+    def classify(self, filename: str) -> str:
+        """
+        Classify a bare filename.
+        
+        Args:
+            filename: Name of the file to classify
+            
+        Returns:
+            Category name or 'Others' if no match found
+        """
+        filename = filename.lower()
+        file_ext = os.path.splitext(filename)[1]
+        stop = self.extension_index.get(file_ext, len(self.categories))
+        
+        for index in range(stop):
+            for pattern in self.category_patterns(index):
+                if pattern.search(filename):
+                    return self.categories[index][0]
+        
+        if stop < len(self.categories):
+            return self.categories[stop][0]
+        return "Others"
 
 
 class FileClassifier:
     """Handles file type detection and classification logic."""
     
-    def __init__(self, config_path: str = None):
-        """Initialize the classifier with configuration."""
-        self.config_path = config_path or os.path.join(os.path.dirname(__file__), '..', 'config', 'rules.json')
-        self.rules = self._load_classification_rules()
-        
-    def _load_classification_rules(self) -> Dict:
-        """Load file classification rules from configuration."""
-        default_rules = {
-            "Documents": {
-                "extensions": [".pdf", ".doc", ".docx", ".txt", ".rtf", ".odt", ".xls", ".xlsx", ".ppt", ".pptx"],
-                "patterns": [
-                    r"invoice.*\.(pdf|doc|docx)",
-                    r"resume.*\.(pdf|doc|docx)",
-                    r"report.*\.(pdf|doc|docx|txt)"
-                ]
-            },
-            "Images": {
-                "extensions": [".jpg", ".jpeg", ".png", ".gif", ".bmp", ".tiff", ".svg", ".webp", ".ico"],
-                "patterns": [
-                    r"screenshot.*\.(jpg|jpeg|png)",
-                    r"photo.*\.(jpg|jpeg|png)",
-                    r"image.*\.(jpg|jpeg|png|gif)"
-                ]
-            },
-            "Videos": {
-                "extensions": [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm", ".m4v"],
-                "patterns": [
-                    r"lecture.*\.(mp4|avi|mkv)",
-                    r"tutorial.*\.(mp4|avi|mkv)",
-                    r"meeting.*\.(mp4|avi|mkv)"
-                ]
-            },
-            "Audio": {
-                "extensions": [".mp3", ".wav", ".flac", ".aac", ".ogg", ".wma", ".m4a"],
-                "patterns": [
-                    r"music.*\.(mp3|wav|flac)",
-                    r"audio.*\.(mp3|wav|flac)",
-                    r"podcast.*\.(mp3|wav)"
-                ]
-            },
-            "Code": {
-                "extensions": [".py", ".js", ".html", ".css", ".java", ".cpp", ".c", ".cs", ".php", ".rb", ".go", ".rs"],
-                "patterns": [
-                    r"project.*\.(py|js|java|cpp)",
-                    r"script.*\.(py|js|sh|bat)",
-                    r".*_code\.(py|js|java|cpp)"
-                ]
-            },
-            "Archives": {
-                "extensions": [".zip", ".rar", ".7z", ".tar", ".gz", ".bz2", ".xz"],
-                "patterns": [
-                    r"backup.*\.(zip|rar|tar|gz)",
-                    r"archive.*\.(zip|rar|tar|gz)"
-                ]
-            },
-            "Executables": {
-                "extensions": [".exe", ".msi", ".dmg", ".deb", ".rpm", ".pkg"],
-                "patterns": [
-                    r"setup.*\.(exe|msi)",
-                    r"installer.*\.(exe|msi|dmg)"
-                ]
-            }
-        }
+    SNAPSHOT_VERSION = 1
+    
+    def __init__(self, config_path: str = None, snapshot_dir: str = None):
+        """
+        Initialize the classifier with configuration.
+        
+        Args:
+            config_path: Path to the rules file (defaults to config/rules.json)
+            snapshot_dir: Directory for the compiled rules snapshot
+        """
+        self.config_path = config_path or os.path.join(os.path.dirname(__file__), '..', 'config', 'rules.json')
+        self.snapshot_dir = Path(snapshot_dir) if snapshot_dir else Path(__file__).parent.parent / "cache"
+        self.check_interval = 1.0
+        self._reload_lock = threading.Lock()
+        self._config_stamp = self._stat_config()
+        self._last_check = time.monotonic()
+        self.compiled = self._load_classification_rules()
+    
+    @property
+    def rules(self) -> Dict:
+        """Currently loaded classification rules."""
+        return self.compiled.rules
+    
+    @property
+    def fingerprint(self) -> str:
+        """Fingerprint of the currently loaded rules."""
+        return self.compiled.fingerprint
+    
+    def _stat_config(self) -> Optional[Tuple[int, int]]:
+        """Return the (mtime_ns, size) stamp of the rules file."""
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+    
+    def current_rules(self, force: bool = False) -> CompiledRules:
+        """
+        Return the current rules, reloading them if the file changed.
+        
+        The rules file is stat'ed at most once per check_interval seconds.
+        A changed file is recompiled and swapped in as a whole, so callers
+        holding the previous CompiledRules keep a consistent view.
+        
+        Args:
+            force: Check the rules file regardless of check_interval
+            
+        Returns:
+            The compiled rules to use for the next batch
+        """
+        now = time.monotonic()
+        if not force and now - self._last_check < self.check_interval:
+            return self.compiled
+        
+        with self._reload_lock:
+            self._last_check = now
+            stamp = self._stat_config()
+            if stamp != self._config_stamp:
+                self.compiled = self._load_classification_rules()
+                self._config_stamp = stamp
+                logging.info(f"Reloaded classification rules from {self.config_path}")
+        
+        return self.compiled
+    
+    def _snapshot_path(self) -> Path:
+        """Snapshot file for this rules file."""
+        key = zlib.crc32(os.path.abspath(self.config_path).encode('utf-8'))
+        return self.snapshot_dir / f"rules_{key:08x}.snapshot"
+    
+    def _load_classification_rules(self) -> CompiledRules:
+        """
+        Load file classification rules from configuration.
+        
+        A snapshot of the parsed rules is kept next to the other caches and
+        reused while the rules file's mtime and size are unchanged; if they
+        changed, the file is hashed and only reparsed when its content did.
+        """
+        try:
+            st = os.stat(self.config_path)
+        except OSError:
+            logging.info(f"Rules config not found: {self.config_path}. Using defaults.")
+            return self._default_rules()
+        
+        snapshot_path = self._snapshot_path()
+        snapshot = None
+        try:
+            with open(snapshot_path, 'rb') as f:
+                snapshot = marshal.load(f)
+            if snapshot.get("version") != self.SNAPSHOT_VERSION or snapshot.get("path") != os.path.abspath(self.config_path):
+                snapshot = None
+        except (OSError, EOFError, ValueError, TypeError, AttributeError):
+            snapshot = None
+        
+        if snapshot and snapshot["mtime_ns"] == st.st_mtime_ns and snapshot["size"] == st.st_size:
+            return CompiledRules(snapshot["rules"], snapshot["sha1"])
+        
+        import hashlib
+        
+        try:
+            with open(self.config_path, 'rb') as f:
+                data = f.read()
+            digest = hashlib.sha1(data).hexdigest()
+            rules = snapshot["rules"] if snapshot and snapshot["sha1"] == digest else json.loads(data)
+        except Exception as e:
+            logging.warning(f"Could not load rules config: {e}. Using defaults.")
+            return self._default_rules()
+        
+        snapshot = {
+            "version": self.SNAPSHOT_VERSION,
+            "path": os.path.abspath(self.config_path),
+            "mtime_ns": st.st_mtime_ns,
+            "size": st.st_size,
+            "sha1": digest,
+            "rules": rules,
+        }
+        try:
+            self.snapshot_dir.mkdir(parents=True, exist_ok=True)
+            temp_path = snapshot_path.with_suffix(".tmp")
+            with open(temp_path, 'wb') as f:
+                marshal.dump(snapshot, f)
+            os.replace(temp_path, snapshot_path)
+        except (OSError, ValueError) as e:
+            logging.debug(f"Could not write rules snapshot: {e}")
+        self._prune_snapshots()
+        
+        return CompiledRules(rules, digest)
+    
+    def _prune_snapshots(self):
+        """Delete snapshots of rules files that no longer exist (e.g. temporary configs)."""
+        try:
+            snapshot_paths = list(self.snapshot_dir.glob("rules_*.snapshot"))
+        except OSError:
+            return
+        
+        for snapshot_path in snapshot_paths:
+            try:
+                with open(snapshot_path, 'rb') as f:
+                    config_path = marshal.load(f).get("path")
+            except (OSError, EOFError, ValueError, TypeError, AttributeError):
+                config_path = None
+            if config_path is None or not os.path.exists(config_path):
+                try:
+                    snapshot_path.unlink()
+                except OSError:
+                    pass
+    
+    @staticmethod
+    def _default_rules() -> CompiledRules:
+        """Compile the built-in default rules."""
+        import hashlib
+        
+        fingerprint = hashlib.sha1(json.dumps(DEFAULT_RULES, sort_keys=True).encode()).hexdigest()
+        return CompiledRules(DEFAULT_RULES, fingerprint)
+    
+    def classify_file(self, filepath: str) -> str:
+        """
+        Classify a file based on extension and naming patterns.
+        
+        Args:
+            filepath: Path to the file to classify
+            
+        Returns:
+            Category name or 'Others' if no match found
+        """
+        return self.compiled.classify(os.path.basename(filepath))
+
+
+_shared_classifiers = {}
+_shared_classifiers_lock = threading.Lock()
+
+
+def get_shared_classifier(config_path: str = None, snapshot_dir: str = None) -> FileClassifier:
+    """
+    Return the process-wide classifier for a rules file.
+    
+    Long-lived processes (the GUI, scheduled loops) share one classifier per
+    rules file instead of reparsing it for every organizer they create; the
+    classifier picks up edits through FileClassifier.current_rules().
+    
+    Args:
+        config_path: Path to the rules file (defaults to config/rules.json)
+        snapshot_dir: Directory for the compiled rules snapshot (defaults to cache/)
+        
+    Returns:
+        Shared FileClassifier instance
+    """
+    config_path = config_path or os.path.join(os.path.dirname(__file__), '..', 'config', 'rules.json')
+    key = (os.path.abspath(config_path), os.path.abspath(snapshot_dir) if snapshot_dir else None)
+    
+    with _shared_classifiers_lock:
+        classifier = _shared_classifiers.get(key)
+        if classifier is None:
+            classifier = _shared_classifiers[key] = FileClassifier(config_path, snapshot_dir)
+        return classifier
+
+
+class ContentSniffer:
+    """Classifies files by their leading magic bytes when name rules fail."""
+    
+    # Largest header ever read; covers the tar magic at offset 257
+    HEADER_SIZE = 320
+    
+    # (label, anchored byte pattern, category)
+    SIGNATURES = [
+        ("pdf", rb"%PDF-", "Documents"),
+        ("ole", rb"\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1", "Documents"),
+        ("rtf", rb"\{\\rtf", "Documents"),
+        ("png", rb"\x89PNG\r\n\x1a\n", "Images"),
+        ("jpeg", rb"\xff\xd8\xff", "Images"),
+        ("gif", rb"GIF8[79]a", "Images"),
+        ("bmp", rb"BM.{4}\x00\x00\x00\x00", "Images"),
+        ("tiff", rb"(?:II\*\x00|MM\x00\*)", "Images"),
+        ("webp", rb"RIFF.{4}WEBP", "Images"),
+        ("wav", rb"RIFF.{4}WAVE", "Audio"),
+        ("avi", rb"RIFF.{4}AVI ", "Videos"),
+        ("m4a", rb".{4}ftypM4[AB] ", "Audio"),
+        ("mp4", rb".{4}ftyp", "Videos"),
+        ("matroska", rb"\x1aE\xdf\xa3", "Videos"),
+        ("mp3", rb"(?:ID3|\xff[\xfb\xf3\xf2])", "Audio"),
+        ("flac", rb"fLaC", "Audio"),
+        ("ogg", rb"OggS", "Audio"),
+        ("epub", rb"PK\x03\x04.{26}mimetypeapplication/epub\+zip", "Books"),
+        ("zip", rb"PK\x03\x04", "Archives"),
+        ("gzip", rb"\x1f\x8b", "Archives"),
+        ("bzip2", rb"BZh[1-9]", "Archives"),
+        ("xz", rb"\xfd7zXZ\x00", "Archives"),
+        ("sevenzip", rb"7z\xbc\xaf\x27\x1c", "Archives"),
+        ("rar", rb"Rar!\x1a\x07", "Archives"),
+        ("tar", rb".{257}ustar", "Archives"),
+        ("elf", rb"\x7fELF", "Executables"),
+        ("pe", rb"MZ", "Executables"),
+        ("macho", rb"(?:\xcf\xfa\xed\xfe|\xce\xfa\xed\xfe|\xca\xfe\xba\xbe)", "Executables"),
+    ]
+    
+    # ZIP containers whose first member identifies an office document
+    OFFICE_MEMBERS = (b"[Content_Types].xml", b"mimetypeapplication/vnd.oasis.opendocument")
+    
+    def __init__(self, categories=None, filesystem=None):
+        """
+        Compile the signature table into a single anchored regex.
+        
+        Args:
+            categories: Category names known to the classifier; sniffed
+                categories outside this set are ignored
+            filesystem: Backend used to read headers (defaults to the OS)
+        """
+        self.fs = filesystem or OSFileSystem()
+        # Alternatives are tried in table order, so specific signatures come first
+        self.pattern = re.compile(
+            b"|".join(b"(?P<%s>%s)" % (label.encode(), regex) for label, regex, _ in self.SIGNATURES),
+            re.DOTALL,
+        )
+        self.label_categories = {label: category for label, _, category in self.SIGNATURES}
+        self.categories = set(categories) if categories is not None else None
+        self.cache = {}
+    
+    def _match_header(self, header: bytes) -> Optional[str]:
+        """Return the signature category of a file header, if any."""
+        match = self.pattern.match(header)
+        if match is None:
+            return None
+        
+        label = match.lastgroup
+        if label == "zip" and header[30:30 + 64].startswith(self.OFFICE_MEMBERS):
+            return "Documents"
+        return self.label_categories[label]
+    
+    def _known(self, category: Optional[str]) -> Optional[str]:
+        """Drop categories the current rules do not define."""
+        if category is not None and self.categories is not None and category not in self.categories:
+            return None
+        return category
+    
+    def sniff_header(self, header: bytes) -> Optional[str]:
+        """Return the category matching a file header, if any."""
+        return self._known(self._match_header(header))
+    
+    def sniff(self, filepath: str, file_stat: os.stat_result = None) -> Optional[str]:
+        """
+        Classify a file from its first few hundred bytes.
+        
+        Args:
+            filepath: Path to the file to inspect
+            file_stat: Stat result already known for the file, if any
+            
+        Returns:
+            Category name, or None if no signature matched
+        """
+        try:
+            st = file_stat or self.fs.stat(filepath)
+            # Directory entries report st_ino 0 on Windows, so the path is
+            # part of the key
+            key = (str(filepath), st.st_ino, st.st_size, st.st_mtime_ns)
+            if key in self.cache:
+                return self._known(self.cache[key])
+            
+            with self.fs.open(filepath, 'rb') as f:
+                header = f.read(self.HEADER_SIZE)
+        except OSError as e:
+            logging.debug(f"Could not sniff {filepath}: {e}")
+            return None
+        
+        # The unfiltered result is cached so rule changes don't invalidate it
+        category = self._match_header(header)
+        self.cache[key] = category
+        return self._known(category)
+
+
+class DateExtractor:
+    """
+    Finds the best available date of a file for date folders.
+    
+    Embedded dates are read with a handful of small seeks and reads: EXIF
+    DateTimeOriginal for JPEG and TIFF, the ``mvhd`` creation time for
+    MP4/MOV, and CreationDate for PDF. Anything else, or a file without a
+    usable embedded date, falls back to its modification time.
+    """
+    
+    # Bytes searched for a PDF CreationDate at each end of the file
+    PDF_WINDOW = 64 * 1024
+    
+    # Bytes of JPEG header segments searched for the EXIF segment
+    JPEG_WINDOW = 64 * 1024
+    
+    # Safety limits for walking segment, box and IFD lists
+    MAX_SEGMENTS = 32
+    MAX_BOXES = 64
+    MAX_IFD_ENTRIES = 512
+    
+    EXIF_POINTER = 0x8769
+    EXIF_DATE_TAGS = (0x9003, 0x9004)  # DateTimeOriginal, DateTimeDigitized
+    IFD0_DATE_TAG = 0x0132  # DateTime
+    
+    PDF_DATES = (
+        re.compile(rb"/CreationDate\s*\(\s*D:(\d{4})(\d{2})?(\d{2})?"),
+        re.compile(rb"<xmp:CreateDate>(\d{4})-(\d{2})-(\d{2})"),
+    )
+    
+    # Seconds between the QuickTime epoch (1904) and the Unix epoch
+    QUICKTIME_EPOCH_OFFSET = 2082844800
+    
+    def __init__(self, folder_format: str = "%Y/%m", filesystem=None):
+        """
+        Initialize the extractor.
+        
+        Args:
+            folder_format: strftime format of the date folders; "/" separates levels
+            filesystem: Backend used to read files (defaults to the OS)
+        """
+        self.folder_format = folder_format
+        self.fs = filesystem or OSFileSystem()
+        self.cache = {}
+    
+    def date_of(self, filepath: str, file_stat: os.stat_result = None) -> datetime:
+        """
+        Return the date a file should be filed under.
+        
+        Args:
+            filepath: Path to the file
+            file_stat: Stat result already known for the file, if any
+            
+        Returns:
+            Embedded creation date, or the modification time
+        """
+        st = file_stat or self.fs.stat(filepath)
+        # Keyed by path as well: st_ino is 0 in Windows directory entries
+        key = (str(filepath), st.st_ino, st.st_size, st.st_mtime_ns)
+        date = self.cache.get(key)
+        if date is not None:
+            return date
+        
+        try:
+            with self.fs.open(filepath, 'rb') as f:
+                date = self.embedded_date(f, st.st_size)
+        except (OSError, ValueError, struct.error, OverflowError) as e:
+            logging.debug(f"Could not read a date from {filepath}: {e}")
+            date = None
+        
+        if date is None or not 1970 <= date.year <= datetime.now().year + 1:
+            date = datetime.fromtimestamp(st.st_mtime)
+        
+        self.cache[key] = date
+        return date
+    
+    def folder(self, filepath: str, file_stat: os.stat_result = None) -> Path:
+        """Relative date folder for a file, e.g. Path("2025/09")."""
+        return Path(*self.date_of(filepath, file_stat).strftime(self.folder_format).split("/"))
+    
+    def embedded_date(self, f, size: int) -> Optional[datetime]:
+        """
+        Read the embedded date of an open binary file.
+        
+        Args:
+            f: File object opened for binary reading
+            size: File size in bytes
+            
+        Returns:
+            The embedded date, or None if the format is unknown or has none
+        """
+        def read_at(offset: int, count: int) -> bytes:
+            # A negative count would read the rest of the file
+            if count <= 0:
+                return b""
+            f.seek(offset)
+            return f.read(count)
+        
+        header = read_at(0, 16)
+        if header.startswith(b"\xff\xd8"):
+            return self._jpeg_date(read_at)
+        if header[:4] in (b"II*\x00", b"MM\x00*"):
+            return self._tiff_date(read_at)
+        if header[4:8] in (b"ftyp", b"moov", b"mdat", b"wide", b"free"):
+            return self._mp4_date(read_at, size)
+        if header.startswith(b"%PDF-"):
+            return self._pdf_date(read_at, size)
+        return None
+    
+    def _jpeg_date(self, read_at) -> Optional[datetime]:
+        """Find the EXIF segment among the JPEG header segments."""
+        offset = 2
+        for _ in range(self.MAX_SEGMENTS):
+            if offset >= self.JPEG_WINDOW:
+                return None
+            header = read_at(offset, 4)
+            if len(header) < 4 or header[0] != 0xFF:
+                return None
+            
+            marker = header[1]
+            if marker in (0xDA, 0xD9):  # Image data starts: no metadata after this
+                return None
+            
+            # The length counts its own two bytes; anything shorter is corrupt
+            length = struct.unpack(">H", header[2:4])[0]
+            if length < 2:
+                return None
+            if marker == 0xE1:
+                body = read_at(offset + 4, min(length - 2, self.JPEG_WINDOW - offset - 4))
+                if body.startswith(b"Exif\x00\x00"):
+                    tiff = body[6:]
+                    return self._tiff_date(lambda at, count: tiff[at:at + count])
+            offset += 2 + length
+        return None
+    
+    def _tiff_date(self, read_at) -> Optional[datetime]:
+        """Read DateTimeOriginal (or a fallback date tag) from a TIFF structure."""
+        header = read_at(0, 8)
+        if header[:2] == b"II":
+            order = "<"
+        elif header[:2] == b"MM":
+            order = ">"
+        else:
+            return None
+        
+        ifd0 = self._read_ifd(read_at, struct.unpack(order + "I", header[4:8])[0], order)
+        candidates = []
+        if self.EXIF_POINTER in ifd0:
+            exif_offset = struct.unpack(order + "I", ifd0[self.EXIF_POINTER][2])[0]
+            exif = self._read_ifd(read_at, exif_offset, order)
+            candidates.extend(exif.get(tag) for tag in self.EXIF_DATE_TAGS)
+        candidates.append(ifd0.get(self.IFD0_DATE_TAG))
+        
+        for entry in candidates:
+            if entry is None:
+                continue
+            _, count, raw = entry
+            value = raw[:count] if count <= 4 else read_at(struct.unpack(order + "I", raw)[0], count)
+            try:
+                return datetime.strptime(value[:19].decode("ascii"), "%Y:%m:%d %H:%M:%S")
+            except (UnicodeDecodeError, ValueError):
+                continue
+        return None
+    
+    def _read_ifd(self, read_at, offset: int, order: str) -> Dict[int, Tuple[int, int, bytes]]:
+        """Read one IFD as {tag: (type, count, raw 4-byte value)}."""
+        count_bytes = read_at(offset, 2)
+        if len(count_bytes) < 2:
+            return {}
+        
+        count = min(struct.unpack(order + "H", count_bytes)[0], self.MAX_IFD_ENTRIES)
+        data = read_at(offset + 2, count * 12)
+        entries = {}
+        for index in range(len(data) // 12):
+            tag, kind, value_count = struct.unpack(order + "HHI", data[index * 12:index * 12 + 8])
+            entries[tag] = (kind, value_count, data[index * 12 + 8:index * 12 + 12])
+        return entries
+    
+    def _find_box(self, read_at, start: int, end: int, kind: bytes) -> Optional[Tuple[int, int]]:
+        """
+        Find a child box by seeking over box headers.
+        
+        Returns:
+            (payload_start, box_end) of the first box of that type, or None
+        """
+        offset = start
+        for _ in range(self.MAX_BOXES):
+            if offset + 8 > end:
+                return None
+            
+            header = read_at(offset, 16)
+            if len(header) < 8:
+                return None
+            
+            box_size, box_type = struct.unpack(">I4s", header[:8])
+            header_size = 8
+            if box_size == 1 and len(header) == 16:
+                box_size = struct.unpack(">Q", header[8:16])[0]
+                header_size = 16
+            elif box_size == 0:
+                box_size = end - offset
+            if box_size < header_size:
+                return None
+            
+            if box_type == kind:
+                return offset + header_size, offset + box_size
+            offset += box_size
+        return None
+    
+    def _mp4_date(self, read_at, size: int) -> Optional[datetime]:
+        """Read the movie header creation time of an MP4/MOV file."""
+        moov = self._find_box(read_at, 0, size, b"moov")
+        if moov is None:
+            return None
+        mvhd = self._find_box(read_at, moov[0], moov[1], b"mvhd")
+        if mvhd is None:
+            return None
+        
+        data = read_at(mvhd[0], 12)
+        if len(data) < 8:
+            return None
+        if data[0] == 1:
+            seconds = struct.unpack(">Q", data[4:12])[0] if len(data) == 12 else 0
+        else:
+            seconds = struct.unpack(">I", data[4:8])[0]
+        if not seconds:
+            return None
+        return datetime(1970, 1, 1) + timedelta(seconds=seconds - self.QUICKTIME_EPOCH_OFFSET)
+    
+    def _pdf_date(self, read_at, size: int) -> Optional[datetime]:
+        """Search the start and end of a PDF for its creation date."""
+        windows = [read_at(0, self.PDF_WINDOW)]
+        if size > self.PDF_WINDOW:
+            windows.append(read_at(max(self.PDF_WINDOW, size - self.PDF_WINDOW), self.PDF_WINDOW))
+        
+        # The trailer's Info dictionary (at the end) is the current one
+        for window in reversed(windows):
+            for pattern in self.PDF_DATES:
+                match = pattern.search(window)
+                if match:
+                    year, month, day = (int(group) if group else 1 for group in match.groups())
+                    try:
+                        return datetime(year, month, day)
+                    except ValueError:
+                        continue
+        return None
+
+
+class ClassificationCache:
+    """LRU-bounded classification results persisted between runs."""
+    
+    def __init__(self, cache_path: Path, fingerprint: str, max_entries: int = 10000):
+        """
+        Load the cache, discarding it if the rules fingerprint changed.
+        
+        Args:
+            cache_path: JSON file the cache is persisted to
+            fingerprint: Fingerprint of the rules the results were computed with
+            max_entries: Maximum number of results to keep
+        """
+        self.cache_path = Path(cache_path)
+        self.fingerprint = fingerprint
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        
+        try:
+            with open(self.cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get("fingerprint") == fingerprint:
+                for name, size, mtime_ns, category in data.get("entries", []):
+                    self.entries[(name, size, mtime_ns)] = category
+        except (OSError, ValueError) as e:
+            logging.debug(f"Classification cache not loaded: {e}")
+    
+    def get(self, name: str, st: os.stat_result) -> Optional[str]:
+        """Return the cached category for a file, if any."""
+        key = (name, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            category = self.entries.get(key)
+            if category is None:
+                self.misses += 1
+                return None
+            
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return category
+    
+    def put(self, name: str, st: os.stat_result, category: str):
+        """Store a classification result, evicting the least recently used."""
+        key = (name, st.st_size, st.st_mtime_ns)
+        with self._lock:
+            self.entries[key] = category
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def save(self):
+        """Persist the cache atomically."""
+        import tempfile
+        
+        # Held for the whole write so organizers sharing the cache (batch
+        # jobs) never write at the same time; the temporary file is unique,
+        # so separate processes saving the same cache do not collide either
+        with self._lock:
+            data = {
+                "fingerprint": self.fingerprint,
+                "entries": [[name, size, mtime_ns, category]
+                            for (name, size, mtime_ns), category in self.entries.items()],
+            }
+            
+            temp_path = None
+            try:
+                self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+                fd, temp_path = tempfile.mkstemp(prefix=self.cache_path.stem, suffix=".tmp",
+                                                 dir=self.cache_path.parent)
+                with open(fd, 'w', encoding='utf-8') as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.cache_path)
+            except OSError as e:
+                logging.warning(f"Could not save classification cache: {e}")
+                if temp_path is not None:
+                    try:
+                        os.unlink(temp_path)
+                    except OSError:
+                        pass
+
+
+# errno values that usually clear up on their own (busy or locked files)
+TRANSIENT_ERRNOS = {errno.EBUSY, errno.EAGAIN, errno.ETXTBSY, errno.EACCES}
+
+# Windows sharing and lock violations
+TRANSIENT_WINERRORS = {32, 33}
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    Check whether a failed file operation is worth retrying.
+    
+    Args:
+        error: Exception raised by the operation
+        
+    Returns:
+        True for locked, busy or permission errors, False otherwise
+    """
+    if isinstance(error, (PermissionError, BlockingIOError, InterruptedError, TimeoutError)):
+        return True
+    if getattr(error, "winerror", None) in TRANSIENT_WINERRORS:
+        return True
+    return isinstance(error, OSError) and error.errno in TRANSIENT_ERRNOS
+
+
+class RetryQueue:
+    """Delayed retries with exponential backoff, ordered by due time."""
+    
+    def __init__(self, base_delay: float = 1.0, max_delay: float = 30.0,
+                 clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize an empty retry queue.
+        
+        Args:
+            base_delay: Delay in seconds before the first retry
+            max_delay: Upper bound for the backoff delay
+            clock: Monotonic clock function
+            sleep: Sleep function used while waiting for the next retry
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.clock = clock
+        self.sleep = sleep
+        self._heap = []
+        self._counter = 0
+        self._lock = threading.Lock()
+    
+    def __len__(self) -> int:
+        return len(self._heap)
+    
+    def clear(self):
+        """Drop every pending retry."""
+        with self._lock:
+            self._heap.clear()
+    
+    def schedule(self, item, attempt: int):
+        """
+        Schedule another attempt for an item.
+        
+        Args:
+            item: Work item to retry
+            attempt: Number of attempts already made
+        """
+        delay = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        with self._lock:
+            self._counter += 1
+            heapq.heappush(self._heap, (self.clock() + delay, self._counter, item, attempt))
+    
+    def pop(self):
+        """
+        Wait for the earliest retry to become due and return it.
+        
+        The wait uses the queue's sleep function, so a cancellable sleep
+        (such as RunControl.wait) can end it early.
+        
+        Returns:
+            Tuple of (item, attempts already made)
+        """
+        with self._lock:
+            due, _, item, attempt = heapq.heappop(self._heap)
+        
+        wait = due - self.clock()
+        if wait > 0:
+            self.sleep(wait)
+        return item, attempt
+
+
+class LaneScheduler:
+    """Runs small and large files in separate worker lanes."""
+    
+    def __init__(self, organizer, performance: Dict = None):
+        """
+        Initialize the lanes.
+        
+        Args:
+            organizer: FileOrganizer that classifies and moves the files
+            performance: The "performance" settings section
+        """
+        performance = performance or {}
+        self.organizer = organizer
+        self.threshold = int(float(performance.get("large_file_threshold_mb", 64)) * 1024 * 1024)
+        self.small_workers = max(1, int(performance.get("small_lane_workers", 8)))
+        self.large_workers = max(1, int(performance.get("large_lane_workers", 1)))
+    
+    def split(self, entries: List[os.DirEntry]) -> Tuple[List[os.DirEntry], List[os.DirEntry]]:
+        """
+        Sort entries into lanes by the size from their scan stat.
+        
+        Returns:
+            Tuple of (small_entries, large_entries)
+        """
+        small, large = [], []
+        for entry in entries:
+            (large if entry.stat().st_size >= self.threshold else small).append(entry)
+        return small, large
+    
+    def _run_one(self, entry: os.DirEntry, dry_run: bool, category: str = None):
+        """Classify (unless already classified) and move one file."""
+        if not self.organizer._proceed():
+            return
+        try:
+            self.organizer._process_entry(entry, category or self.organizer._classify_entry(entry), dry_run)
+        except Exception as e:
+            self.organizer._record_failure(entry.path, category or "", e)
+    
+    def run(self, entries: List[os.DirEntry], dry_run: bool = False, categories: List[str] = None):
+        """
+        Process entries with a wide small-file lane and a narrow large-file lane.
+        
+        Args:
+            entries: Scanned directory entries
+            dry_run: If True, only log what would be done without moving files
+            categories: Categories already chosen for the entries, in order
+                (None to classify each entry in its lane)
+        """
+        from concurrent.futures import ThreadPoolExecutor
+        
+        small, large = self.split(entries)
+        self.organizer.logger.info(f"Lanes: {len(small)} small files, {len(large)} large files")
+        chosen = dict(zip(map(id, entries), categories)) if categories is not None else {}
+        
+        with ThreadPoolExecutor(self.large_workers) as large_lane, \
+                ThreadPoolExecutor(self.small_workers) as small_lane:
+            # Large files are submitted first so their lane starts immediately
+            futures = [large_lane.submit(self._run_one, entry, dry_run, chosen.get(id(entry))) for entry in large]
+            futures += [small_lane.submit(self._run_one, entry, dry_run, chosen.get(id(entry))) for entry in small]
+            for future in futures:
+                future.result()
+
+
+# Rules compiled once per classification worker process
+_worker_rules = None
+
+
+def _init_classify_worker(rules: Dict, fingerprint: str):
+    """Compile the rules in a freshly started worker process."""
+    global _worker_rules
+    _worker_rules = CompiledRules(rules, fingerprint)
+
+
+def _classify_shard(names: str) -> bytes:
+    """
+    Classify one shard in a worker process.
+    
+    Args:
+        names: NUL-separated filenames
+        
+    Returns:
+        Category ids as the bytes of an unsigned-short array, where
+        len(categories) stands for 'Others'
+    """
+    from array import array
+    
+    rules = _worker_rules
+    ids = {category: index for index, (category, _, _) in enumerate(rules.categories)}
+    others = len(rules.categories)
+    return array('H', [ids.get(rules.classify(name), others) for name in names.split('\0')]).tobytes()
+
+
+class ShardedClassifier:
+    """Classifies very large scans in a process pool, sharded by name hash."""
+    
+    def __init__(self, organizer, performance: Dict = None):
+        """
+        Initialize the classifier.
+        
+        Args:
+            organizer: FileOrganizer whose rules, cache and sniffer are used
+            performance: The "performance" settings section
+        """
+        performance = performance or {}
+        self.organizer = organizer
+        self.workers = max(1, int(performance.get("process_workers", 0) or os.cpu_count() or 1))
+        self.min_files = int(performance.get("process_min_files", 20000))
+    
+    def classify_names(self, names: List[str]) -> List[str]:
+        """
+        Classify bare filenames with the organizer's pinned rules.
+        
+        Below min_files names the pool's startup cost outweighs the gain,
+        so small batches are classified in-process.
+        
+        Returns:
+            Category names in the order of names
+        """
+        rules = self.organizer.rules
+        if self.workers == 1 or len(names) < max(1, self.min_files):
+            return [rules.classify(name) for name in names]
+        
+        from array import array
+        from concurrent.futures import ProcessPoolExecutor
+        
+        # Several shards per worker so a slow shard does not hold up the pool
+        shard_count = self.workers * 4
+        shards = [[] for _ in range(shard_count)]
+        for position, name in enumerate(names):
+            shards[zlib.crc32(name.encode('utf-8', 'surrogateescape')) % shard_count].append(position)
+        shards = [shard for shard in shards if shard]
+        
+        labels = [category for category, _, _ in rules.categories] + ["Others"]
+        categories = [None] * len(names)
+        
+        with ProcessPoolExecutor(self.workers, initializer=_init_classify_worker,
+                                 initargs=(rules.rules, rules.fingerprint)) as pool:
+            payloads = ["\0".join(names[position] for position in shard) for shard in shards]
+            for shard, data in zip(shards, pool.map(_classify_shard, payloads)):
+                ids = array('H')
+                ids.frombytes(data)
+                for position, category_id in zip(shard, ids):
+                    categories[position] = labels[category_id]
+        
+        return categories
+    
+    def classify(self, entries: List[os.DirEntry]) -> List[str]:
+        """
+        Classify scanned entries, consulting the cache and sniffer in this process.
+        
+        Returns:
+            Category names in the order of entries
+        """
+        organizer = self.organizer
+        categories = [None] * len(entries)
+        pending = []
+        for position, entry in enumerate(entries):
+            if organizer.cache is not None:
+                categories[position] = organizer.cache.get(entry.name, entry.stat())
+            if categories[position] is None:
+                pending.append(position)
+        
+        results = self.classify_names([entries[position].name for position in pending])
+        
+        for position, category in zip(pending, results):
+            entry = entries[position]
+            if category == "Others" and organizer.sniffer is not None:
+                category = organizer.sniffer.sniff(entry.path, entry.stat()) or category
+            if organizer.cache is not None:
+                organizer.cache.put(entry.name, entry.stat(), category)
+            categories[position] = category
+        
+        return categories
+
+
+class TokenBucket:
+    """Thread-safe token bucket; callers reserve tokens and sleep off any debt."""
+    
+    def __init__(self, rate: float, burst: float = None, clock=time.monotonic, sleep=time.sleep):
+        """
+        Initialize a full bucket.
+        
+        Args:
+            rate: Tokens added per second (0 or less means unlimited)
+            burst: Bucket capacity (defaults to one second worth of tokens)
+            clock: Monotonic clock function
+            sleep: Sleep function
+        """
+        self.clock = clock
+        self.sleep = sleep
+        self._lock = threading.Lock()
+        self.rate = 0.0
+        self.set_rate(rate, burst)
+    
+    def set_rate(self, rate: float, burst: float = None):
+        """Change the refill rate, e.g. when a new time window starts."""
+        with self._lock:
+            was_unlimited = self.rate <= 0
+            self.rate = float(rate or 0)
+            self.burst = float(burst if burst is not None else max(self.rate, 1.0))
+            
+            # Coming out of unlimited mode starts with a full bucket
+            if was_unlimited:
+                self._tokens = self.burst
+                self._updated = self.clock()
+    
+    def acquire(self, amount: float = 1.0):
+        """Take tokens, blocking until the bucket has paid them back."""
+        if self.rate <= 0:
+            return
+        
+        with self._lock:
+            now = self.clock()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0
+        
+        if wait > 0:
+            self.sleep(wait)
+
+
+def parse_clock_time(value: str) -> int:
+    """Convert 'HH:MM' to minutes after midnight."""
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def minutes_left_in_window(minute: int, start: int, end: int) -> Optional[int]:
+    """
+    Check whether a minute of the day falls in a window (which may wrap
+    around midnight).
+    
+    Returns:
+        Minutes until the window ends, or None if outside the window
+    """
+    if start == end:
+        return None
+    if start < end:
+        return end - minute if start <= minute < end else None
+    if minute >= start:
+        return end + 24 * 60 - minute
+    return end - minute if minute < end else None
+
+
+class IOGovernor:
+    """Limits bytes and file operations per second on a time-of-day schedule."""
+    
+    # How long a schedule lookup stays valid before the clock is read again
+    RECHECK_SECONDS = 1.0
+    
+    def __init__(self, settings: Dict = None, clock=time.monotonic, sleep=time.sleep, now=datetime.now,
+                 control: "RunControl" = None):
+        """
+        Build the governor from the "throttle" and "scheduling" settings.
+        
+        Args:
+            settings: Settings dictionary as loaded by load_settings()
+            clock: Monotonic clock function
+            sleep: Sleep function
+            now: Wall-clock function used for the schedule
+            control: Run control whose cancellation ends a quiet-hours pause
+        """
+        settings = settings or {}
+        throttle = settings.get("throttle", {})
+        scheduling = settings.get("scheduling", {})
+        self.clock = clock
+        self.sleep = sleep
+        self.now = now
+        self.control = control
+        
+        self.default_limits = (throttle.get("max_bytes_per_second", 0) or 0,
+                               throttle.get("max_file_ops_per_second", 0) or 0)
+        self.windows = [
+            (parse_clock_time(window["start"]), parse_clock_time(window["end"]),
+             (window.get("max_bytes_per_second", 0) or 0, window.get("max_file_ops_per_second", 0) or 0))
+            for window in throttle.get("schedule", [])
+        ]
+        
+        self.quiet_hours = None
+        if scheduling.get("pause_during_quiet_hours") and scheduling.get("quiet_hours_start"):
+            self.quiet_hours = (parse_clock_time(scheduling["quiet_hours_start"]),
+                                parse_clock_time(scheduling["quiet_hours_end"]))
+        
+        self.enabled = bool(self.quiet_hours or self.windows or any(self.default_limits))
+        self.byte_bucket = TokenBucket(0, clock=clock, sleep=sleep)
+        self.op_bucket = TokenBucket(0, clock=clock, sleep=sleep)
+        self.paused_seconds = 0.0
+        self._next_check = None
+        self._limits = None
+    
+    def _minute_of_day(self) -> int:
+        current = self.now()
+        return current.hour * 60 + current.minute
+    
+    def quiet_minutes_left(self) -> Optional[int]:
+        """Minutes until quiet hours end, or None outside quiet hours."""
+        if self.quiet_hours is None:
+            return None
+        return minutes_left_in_window(self._minute_of_day(), *self.quiet_hours)
+    
+    def _refresh(self):
+        """Pause through quiet hours and apply the limits of the current window."""
+        if self._next_check is not None and self.clock() < self._next_check:
+            return
+        
+        minutes_left = self.quiet_minutes_left()
+        if minutes_left is not None:
+            logging.getLogger("SmartFileSort").info(f"Quiet hours: pausing for {minutes_left} minutes")
+            while minutes_left is not None:
+                if self.control is not None and self.control.cancelled:
+                    return
+                # Sleep in short steps so clock changes are noticed
+                pause = min(minutes_left * 60, 60)
+                self.sleep(pause)
+                self.paused_seconds += pause
+                minutes_left = self.quiet_minutes_left()
+            logging.getLogger("SmartFileSort").info("Quiet hours over: resuming")
+        
+        minute = self._minute_of_day()
+        limits = self.default_limits
+        for start, end, window_limits in self.windows:
+            if minutes_left_in_window(minute, start, end) is not None:
+                limits = window_limits
+                break
+        
+        if limits != self._limits:
+            self._limits = limits
+            self.byte_bucket.set_rate(limits[0])
+            self.op_bucket.set_rate(limits[1])
+        
+        self._next_check = self.clock() + self.RECHECK_SECONDS
+    
+    def before_operation(self):
+        """Wait until one more file operation may start."""
+        if not self.enabled:
+            return
+        self._refresh()
+        self.op_bucket.acquire(1)
+    
+    def consume_bytes(self, count: int):
+        """Wait until count more bytes may be transferred."""
+        if not self.enabled:
+            return
+        self._refresh()
+        self.byte_bucket.acquire(count)
+
+
+def load_settings(settings_path: str = None) -> Dict:
+    """
+    Load application settings from configuration.
+    
+    Args:
+        settings_path: Path to settings file (defaults to config/settings.json)
+        
+    Returns:
+        Settings dictionary, or an empty dictionary if it cannot be read
+    """
+    settings_path = settings_path or os.path.join(os.path.dirname(__file__), '..', 'config', 'settings.json')
+    
+    try:
+        with open(settings_path, 'r') as f:
+            return json.load(f)
+    except Exception as e:
+        logging.warning(f"Could not load settings: {e}. Using defaults.")
+        return {}
+
+
+class FileFilter:
+    """Compiled filter stage applied to scanned directory entries."""
+    
+    FILTER_NAMES = (
+        "hidden", "excluded_pattern", "excluded_extension",
+        "not_included_extension", "too_small", "too_recent",
+    )
+    
+    def __init__(self, settings: Dict = None, now: float = None):
+        """
+        Compile the filter settings into fast lookups.
+        
+        Args:
+            settings: Settings dictionary as loaded by load_settings()
+            now: Reference timestamp for age checks (defaults to current time)
+        """
+        settings = settings or {}
+        general = settings.get("general", {})
+        behavior = settings.get("behavior", {})
+        filters = settings.get("filters", {})
+        
+        self.ignore_hidden = bool(general.get("ignore_hidden_files", False))
+        self.min_size = int(general.get("minimum_file_size_bytes", 0) or 0)
+        self.excluded_extensions = {ext.lower() for ext in filters.get("excluded_extensions", [])}
+        self.included_extensions = {ext.lower() for ext in filters.get("included_extensions", [])}
+        
+        # All glob patterns are folded into a single case-insensitive regex
+        patterns = filters.get("excluded_patterns", [])
+        self.excluded_pattern = (
+            re.compile("|".join(fnmatch.translate(p) for p in patterns), re.IGNORECASE)
+            if patterns else None
+        )
+        
+        min_age = max(
+            float(filters.get("min_file_age_minutes", 0) or 0) * 60,
+            float(behavior.get("skip_recent_files_hours", 0) or 0) * 3600,
+        )
+        self.newest_mtime = (now if now is not None else time.time()) - min_age if min_age > 0 else None
+        
+        # Hidden attributes only exist on Windows, where DirEntry.stat() is free
+        self.check_hidden_attribute = self.ignore_hidden and os.name == "nt"
+        self.needs_stat = bool(self.check_hidden_attribute or self.min_size or self.newest_mtime is not None)
+        
+        self.skip_counts = dict.fromkeys(self.FILTER_NAMES, 0)
+    
+    def _reject(self, entry: os.DirEntry) -> Optional[str]:
+        """Return the name of the first filter rejecting the entry, if any."""
+        name = entry.name
+        
+        # Name-only checks first, so excluded entries never need a stat
+        if self.ignore_hidden and name.startswith("."):
+            return "hidden"
+        
+        if self.excluded_pattern is not None and self.excluded_pattern.match(name):
+            return "excluded_pattern"
+        
+        ext = os.path.splitext(name)[1].lower()
+        if ext in self.excluded_extensions:
+            return "excluded_extension"
+        
+        if self.included_extensions and ext not in self.included_extensions:
+            return "not_included_extension"
+        
+        if not self.needs_stat:
+            return None
+        
+        # DirEntry caches this result, so later stages reuse it
+        st = entry.stat()
+        
+        if self.check_hidden_attribute and getattr(st, "st_file_attributes", 0) & stat.FILE_ATTRIBUTE_HIDDEN:
+            return "hidden"
+        
+        if st.st_size < self.min_size:
+            return "too_small"
+        
+        if self.newest_mtime is not None and st.st_mtime > self.newest_mtime:
+            return "too_recent"
+        
+        return None
+    
+    def accepts(self, entry: os.DirEntry) -> bool:
+        """
+        Check whether a scanned entry should be organized.
+        
+        Args:
+            entry: Directory entry produced by os.scandir()
+            
+        Returns:
+            True if the entry passes every filter, False otherwise
+        """
+        reason = self._reject(entry)
+        if reason is None:
+            return True
+        
+        self.skip_counts[reason] += 1
+        return False
+
+
+class RunControl:
+    """Cooperative cancel and pause tokens, checked between files."""
+    
+    def __init__(self):
+        """Create a control that is running and not cancelled."""
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+    
+    @property
+    def cancelled(self) -> bool:
+        """Whether the run was asked to stop."""
+        return self._cancelled.is_set()
+    
+    @property
+    def paused(self) -> bool:
+        """Whether the run is paused."""
+        return not self._running.is_set()
+    
+    def cancel(self):
+        """Stop after the file in progress (also ends a pause)."""
+        self._cancelled.set()
+        self._running.set()
+    
+    def pause(self):
+        """Hold the run before the next file."""
+        self._running.clear()
+    
+    def resume(self):
+        """Continue a paused run."""
+        self._running.set()
+    
+    def reset(self):
+        """Clear a cancel or pause left over from a previous run."""
+        self._cancelled.clear()
+        self._running.set()
+    
+    def wait(self, timeout: float) -> bool:
+        """
+        Sleep for up to timeout seconds, waking early on cancel.
+        
+        Returns:
+            True if the run was cancelled
+        """
+        return self._cancelled.wait(timeout)
+    
+    def proceed(self) -> bool:
+        """
+        Wait out a pause before the next file.
+        
+        Returns:
+            False once the run has been cancelled
+        """
+        self._running.wait()
+        return not self._cancelled.is_set()
+
+
+class RunCheckpoint:
+    """
+    Journal of a run's operations, flushed as the run goes.
+    
+    The journal is a JSON-lines file per source/target pair. It is removed
+    when a run completes; if it is still there when the next run starts,
+    that run resumes: earlier results are carried into its operation log
+    and files that already failed are not attempted again. The journal is
+    the organizer's own state and is kept on the local disk, not on the
+    filesystem backend.
+    """
+    
+    def __init__(self, path: Path, flush_every: int = 50):
+        """
+        Initialize the checkpoint.
+        
+        Args:
+            path: Journal file
+            flush_every: Number of operations between flushes
+        """
+        self.path = Path(path)
+        self.flush_every = max(1, flush_every)
+        self._lock = threading.Lock()
+        self._file = None
+        self._unflushed = 0
+    
+    def load(self) -> List[Dict]:
+        """Operations recorded by an interrupted run, if any."""
+        records = []
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:  # Torn last line of a killed run
+                        break
+        except OSError:
+            pass
+        return records
+    
+    def record(self, operation: Dict):
+        """Append one operation to the journal."""
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(operation) + "\n")
+            self._unflushed += 1
+            if self._unflushed >= self.flush_every:
+                self._file.flush()
+                self._unflushed = 0
+    
+    def flush(self):
+        """Write buffered operations to disk."""
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                self._unflushed = 0
+    
+    def close(self, completed: bool):
+        """
+        Close the journal.
+        
+        Args:
+            completed: If True the run finished and the journal is removed;
+                otherwise it is kept for the next run to resume from
+        """
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            if completed:
+                try:
+                    self.path.unlink()
+                except OSError:
+                    pass
+
+
+class SyncBatcher:
+    """
+    Makes moved files durable according to behavior.durability.
+    
+    - "none": nothing is fsynced; the OS writes data back when it likes
+    - "batched": copied files and the directories touched by moves are
+      fsynced together every batch_files files or batch_bytes bytes
+    - "strict": each move is fsynced before the next one starts
+    
+    The source of a cross-device copy is deleted only once the copy's
+    batch has been fsynced, so a power loss can leave a file in both
+    places but never in neither. The copy's settle callback then reports
+    whether the move completed, so it is only recorded once it has.
+    """
+    
+    MODES = ("none", "batched", "strict")
+    
+    def __init__(self, filesystem, mode: str = "none", batch_files: int = 100, batch_bytes: int = 256 * 1024 * 1024):
+        """
+        Initialize the batcher.
+        
+        Args:
+            filesystem: Backend providing fsync() and fsync_directory()
+            mode: One of MODES
+            batch_files: Files per batch in "batched" mode
+            batch_bytes: Copied bytes per batch in "batched" mode
+        """
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown durability mode: {mode}")
+        self.fs = filesystem
+        self.mode = mode
+        self.batch_files = max(1, batch_files)
+        self.batch_bytes = max(1, batch_bytes)
+        self.batches = 0
+        
+        self._lock = threading.Lock()
+        self._files = []
+        self._directories = set()
+        self._deferred = []
+        self._pending_bytes = 0
+        self._pending_count = 0
+        
+    def after_rename(self, source_path: Path, target_path: Path):
+        """Account for a file renamed within a device."""
+        if self.mode == "none":
+            return
+        self._add(None, {Path(source_path).parent, Path(target_path).parent}, None, 0)
+        
+    def after_copy(self, source_path: Path, target_path: Path, size: int, delete_source: Callable[[], None],
+                   settle: Callable[[Optional[Exception]], None] = None):
+        """
+        Account for a file copied across devices.
+        
+        Args:
+            source_path: Copied file, still in place
+            target_path: The new copy
+            size: Bytes copied
+            delete_source: Removes the source; called once the copy is durable
+            settle: Called with None once the source is deleted, or with the
+                error if the copy could not be made durable or the source
+                could not be deleted
+        """
+        settle = settle or (lambda error: None)
+        if self.mode == "none":
+            delete_source()
+            settle(None)
+            return
+        # The source's directory only changes after the batch is durable
+        self._add(target_path, {Path(target_path).parent}, (delete_source, settle), size)
+        
+    def _add(self, file_path, directories, callbacks, size: int):
+        """Queue work for the current batch, flushing when it is full."""
+        with self._lock:
+            if file_path is not None:
+                self._files.append((file_path, callbacks))
+            self._directories.update(directories)
+            self._pending_bytes += size
+            self._pending_count += 1
+            full = (self.mode == "strict" or self._pending_count >= self.batch_files
+                    or self._pending_bytes >= self.batch_bytes)
+        if full:
+            self.flush()
+            
+    def flush(self):
+        """
+        Make the pending batch durable, then delete the copied sources.
+        
+        A batch is flushed with one filesystem-wide sync per target
+        filesystem where the backend supports it (syncfs on Linux), and
+        otherwise by fsyncing each file and then each directory.
+        """
+        with self._lock:
+            files, self._files = self._files, []
+            directories, self._directories = self._directories, set()
+            self._pending_bytes = 0
+            self._pending_count = 0
+        if not files and not directories:
+            return
+        
+        logger = logging.getLogger("SmartFileSort")
+        if self.mode == "batched" and self._sync_filesystems(directories):
+            files, directories, durable = [], set(), files
+        else:
+            durable = []
+        
+        for file_path, callbacks in files:
+            try:
+                self.fs.fsync(file_path)
+                durable.append((file_path, callbacks))
+            except OSError as e:
+                # Keep the source: the copy may not have reached the disk
+                logger.error(f"Could not fsync {file_path}, keeping its source: {e}")
+                callbacks[1](e)
+        for directory in sorted(directories):
+            try:
+                self.fs.fsync_directory(directory)
+            except OSError as e:
+                logger.warning(f"Could not fsync directory {directory}: {e}")
+        
+        for file_path, (delete_source, settle) in durable:
+            try:
+                delete_source()
+            except OSError as e:
+                logger.warning(f"Could not remove the source of {file_path}: {e}")
+                settle(e)
+            else:
+                settle(None)
+        self.batches += 1
+    
+    def _sync_filesystems(self, directories) -> bool:
+        """Sync each filesystem holding the directories in one call; False if unsupported or failed."""
+        sync_filesystem = getattr(self.fs, "sync_filesystem", None)
+        if sync_filesystem is None:
+            return False
+        
+        by_device = {}
+        try:
+            for directory in directories:
+                by_device.setdefault(self.fs.stat(directory).st_dev, directory)
+            return all([sync_filesystem(directory) for directory in by_device.values()])
+        except OSError as e:
+            logging.getLogger("SmartFileSort").warning(f"Filesystem sync failed, syncing files one by one: {e}")
+            return False
+
+
+class WorkCoordinator:
+    """
+    Partitions a shared source directory between organizer processes.
+    
+    Each process (node) claims a file by renaming it into its own directory
+    under the claims directory; rename is atomic on local, NFS and SMB
+    filesystems, so exactly one node wins each file. Target names are
+    reserved by creating them exclusively, and each reservation is noted
+    in the node's directory until the move settles. A background thread
+    refreshes a lease file while the node runs; files held by a node whose
+    lease expired are put back into the source directory, and its
+    unfinished targets removed, by the next node to start. The claims
+    directory lives in the source directory, so all of this goes through
+    the organizer's filesystem backend.
+    """
+    
+    LEASE_FILE = ".lease"
+    RESERVATION_PREFIX = ".reserve-"
+    
+    def __init__(self, source_dir: Path, settings: Dict = None, node_id: str = None, filesystem=None):
+        """
+        Initialize the coordinator.
+        
+        Args:
+            source_dir: Shared source directory
+            settings: Settings dictionary as loaded by load_settings()
+            node_id: Unique name of this process (defaults to host and pid)
+            filesystem: Backend holding the source directory (defaults to the OS)
+        """
+        import socket
+        
+        coordination = (settings or {}).get("coordination", {})
+        self.source_dir = Path(source_dir)
+        self.claims_root = self.source_dir / coordination.get("claim_directory", ".smartfilesort-claims")
+        self.lease_seconds = float(coordination.get("lease_seconds", 300))
+        self.node_id = node_id or f"{socket.gethostname()}-{os.getpid()}"
+        self.node_dir = self.claims_root / self.node_id
+        self.fs = filesystem or OSFileSystem()
+        self._last_heartbeat = 0.0
+        self._reservations = {}
+        self._reservation_ids = itertools.count()
+        self._renewer = None
+        self._stop_renewal = threading.Event()
+        self.lost = 0
+    
+    def start(self):
+        """Register this node, start renewing its lease and recover files held by expired nodes."""
+        self.fs.makedirs(self.node_dir)
+        self.heartbeat(force=True)
+        
+        # Long copies, pauses and retry backoffs must not let the lease lapse
+        self._stop_renewal.clear()
+        self._renewer = threading.Thread(target=self._renew_lease, name="lease-renewal", daemon=True)
+        self._renewer.start()
+        self.recover_stale()
+    
+    def _renew_lease(self):
+        """Refresh the lease three times per lease period until stopped."""
+        while not self._stop_renewal.wait(self.lease_seconds / 3):
+            try:
+                self.heartbeat(force=True)
+            except OSError:
+                pass
+    
+    def heartbeat(self, force: bool = False):
+        """Refresh this node's lease, at most three times per lease period."""
+        now = time.time()
+        if force or now - self._last_heartbeat >= self.lease_seconds / 3:
+            # Rewriting the (empty) lease file refreshes its mtime
+            with self.fs.open(self.node_dir / self.LEASE_FILE, 'wb'):
+                pass
+            self._last_heartbeat = now
+    
+    def claim(self, source_path: Path) -> Optional[Path]:
+        """
+        Take ownership of a source file.
+        
+        Args:
+            source_path: File in the shared source directory
+            
+        Returns:
+            Path of the claimed file, or None if another node took it first
+        """
+        claimed = self.node_dir / source_path.name
+        if self.fs.exists(claimed):  # Claimed by an earlier attempt of this node
+            return claimed
+        
+        self.heartbeat()
+        try:
+            self.fs.rename(source_path, claimed)
+        except FileNotFoundError:
+            self.lost += 1
+            return None
+        return claimed
+    
+    def release(self, claimed_path: Path):
+        """Put a claimed file back into the source directory for a later run."""
+        try:
+            self.fs.rename(claimed_path, self.source_dir / claimed_path.name)
+        except OSError:
+            pass
+    
+    def reserve(self, target_path: Path, claimed_path: Path) -> bool:
+        """
+        Reserve a target name by creating it exclusively.
+        
+        Args:
+            target_path: Target name to reserve
+            claimed_path: The claimed file that will be moved there
+            
+        Returns:
+            True if this node now owns the name
+        """
+        try:
+            self.fs.open(target_path, 'xb').close()
+        except FileExistsError:
+            return False
+        
+        # Note the reservation so that, if this node dies, the node that
+        # recovers its claims can remove the placeholder or partial copy
+        marker = self.node_dir / f"{self.RESERVATION_PREFIX}{next(self._reservation_ids)}"
+        try:
+            with self.fs.open(marker, 'wb') as f:
+                f.write(json.dumps({"target": str(target_path), "claimed": claimed_path.name}).encode('utf-8'))
+            self._reservations[target_path] = marker
+        except OSError:
+            pass
+        return True
+    
+    def settle(self, target_path: Path):
+        """Forget a reservation once its move has finished or been undone."""
+        marker = self._reservations.pop(target_path, None)
+        if marker is not None:
+            try:
+                self.fs.unlink(marker)
+            except OSError:
+                pass
+    
+    def _clear_reservations(self, node: Path):
+        """
+        Remove the unfinished targets recorded in a node's directory.
+        
+        A reservation whose claimed file is still in the node's directory
+        never completed, so whatever is at the target (the placeholder, or
+        a partial or unsynced copy) belongs to that node and is removed;
+        the claimed file itself goes back to the source directory.
+        """
+        with self.fs.scandir(node) as entries:
+            names = [entry.name for entry in entries]
+        claimed = {name for name in names if not name.startswith(".")}
+        for name in names:
+            if not name.startswith(self.RESERVATION_PREFIX):
+                continue
+            marker = node / name
+            try:
+                with self.fs.open(marker, 'rb') as f:
+                    reservation = json.loads(f.read().decode('utf-8'))
+                target = Path(reservation["target"])
+                if reservation["claimed"] in claimed and self.fs.exists(target):
+                    self.fs.unlink(target)
+            except (OSError, ValueError, KeyError):
+                pass
+            try:
+                self.fs.unlink(marker)
+            except OSError:
+                pass
+    
+    def recover_stale(self):
+        """Return files held by nodes whose lease expired to the source directory."""
+        now = time.time()
+        try:
+            with self.fs.scandir(self.claims_root) as entries:
+                nodes = [Path(entry.path) for entry in entries if entry.is_dir()]
+        except OSError:
+            return
+        
+        for node in nodes:
+            if node == self.node_dir:
+                continue
+            try:
+                lease = node / self.LEASE_FILE
+                stamp = self.fs.stat(lease if self.fs.exists(lease) else node).st_mtime
+                if now - stamp <= self.lease_seconds:
+                    continue
+                self._clear_reservations(node)
+                self._release_all(node)
+                if self.fs.exists(lease):
+                    self.fs.unlink(lease)
+                self.fs.rmdir(node)
+            except OSError:
+                # Another node is recovering the same directory
+                continue
+    
+    def finish(self):
+        """Stop renewing the lease, release anything still claimed and retire this node."""
+        self._stop_renewal.set()
+        if self._renewer is not None:
+            self._renewer.join()
+            self._renewer = None
+        try:
+            self._clear_reservations(self.node_dir)
+            self._reservations.clear()
+            self._release_all(self.node_dir)
+            self.fs.unlink(self.node_dir / self.LEASE_FILE)
+            self.fs.rmdir(self.node_dir)
+        except OSError:
+            pass
+    
+    def _release_all(self, node: Path):
+        """Put every file a node's directory still holds back into the source directory."""
+        with self.fs.scandir(node) as entries:
+            names = [entry.name for entry in entries if entry.name != self.LEASE_FILE]
+        for name in names:
+            self.release(node / name)
+
+
+class OSFileSystem:
+    """
+    Filesystem operations used by scanning, hashing and moving.
+    
+    FileOrganizer goes through this interface rather than calling os and
+    shutil directly, so another backend (such as memoryfs.MemoryFileSystem,
+    which can simulate slow or failing shares) can be swapped in.
+    """
+    
+    def scandir(self, path):
+        """Iterate a directory as os.DirEntry-like objects (context manager)."""
+        return os.scandir(path)
+    
+    def stat(self, path) -> os.stat_result:
+        """Stat a path, following symlinks."""
+        return os.stat(path)
+    
+    def exists(self, path) -> bool:
+        """Check whether a path exists."""
+        return os.path.exists(path)
+    
+    def makedirs(self, path):
+        """Create a directory and its parents if missing."""
+        os.makedirs(path, exist_ok=True)
+    
+    def rmdir(self, path):
+        """Remove an empty directory."""
+        os.rmdir(path)
+    
+    def rename(self, source, target):
+        """Rename within a device (errno EXDEV across devices)."""
+        os.rename(source, target)
+    
+    def replace(self, source, target):
+        """Rename, overwriting an existing target."""
+        os.replace(source, target)
+    
+    def unlink(self, path):
+        """Delete a file."""
+        os.unlink(path)
+    
+    def open(self, path, mode: str = 'rb'):
+        """Open a file in a binary mode."""
+        return open(path, mode)
+    
+    def copystat(self, source, target):
+        """Copy timestamps and permission bits."""
+        import shutil
+        shutil.copystat(source, target)
+    
+    def fsync(self, path):
+        """Flush a file's data and metadata to disk."""
+        if os.name != 'nt':
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+            return
         
+        # Windows only flushes handles opened for writing, which a read-only
+        # file (copystat carries the attribute over) refuses until it is cleared
+        mode = os.stat(path).st_mode
+        if not mode & stat.S_IWRITE:
+            os.chmod(path, mode | stat.S_IWRITE)
         try:
-            if os.path.exists(self.config_path):
-                with open(self.config_path, 'r') as f:
-                    return json.load(f)
-            else:
-                # Create default config file
-                os.makedirs(os.path.dirname(self.config_path), exist_ok=True)
-                with open(self.config_path, 'w') as f:
-                    json.dump(default_rules, f, indent=4)
-                return default_rules
-        except Exception as e:
-            logging.warning(f"Could not load rules config: {e}. Using defaults.")
-            return default_rules
+            fd = os.open(path, os.O_RDWR)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+        finally:
+            if not mode & stat.S_IWRITE:
+                os.chmod(path, mode)
     
-    def classify_file(self, filepath: str) -> str:
+    def fsync_directory(self, path):
+        """Flush a directory's entries to disk (no-op on Windows, which cannot open directories)."""
+        if os.name == 'nt':
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+    
+    _syncfs = None
+    
+    def sync_filesystem(self, path) -> bool:
         """
-        Classify a file based on extension and naming patterns.
+        Flush all pending writes of the filesystem holding path in one call.
+        
+        Returns:
+            True if done, False where unsupported (only Linux has syncfs)
+        """
+        if OSFileSystem._syncfs is None:
+            OSFileSystem._syncfs = False
+            if sys.platform.startswith("linux"):
+                try:
+                    import ctypes
+                    OSFileSystem._syncfs = ctypes.CDLL(None, use_errno=True).syncfs
+                except (OSError, AttributeError):
+                    pass
+        if not OSFileSystem._syncfs:
+            return False
+        
+        import ctypes
+        
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            if OSFileSystem._syncfs(fd) != 0:
+                error = ctypes.get_errno()
+                raise OSError(error, os.strerror(error), str(path))
+        finally:
+            os.close(fd)
+        return True
+    
+    def drop_cache(self, path):
+        """
+        Flush a file and evict it from the page cache, so the next read
+        comes from the disk. Best effort: a no-op where posix_fadvise is
+        unavailable.
+        """
+        if not hasattr(os, "posix_fadvise"):
+            return
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            # Dirty pages cannot be evicted until they are written
+            os.fsync(fd)
+            os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+        finally:
+            os.close(fd)
+    
+    # struct fiemap with room for one struct fiemap_extent (linux/fiemap.h)
+    FIEMAP_IOCTL = 0xC020660B
+    FIEMAP_REQUEST = struct.pack("=QQIIII", 0, 0xFFFFFFFFFFFFFFFF, 0, 0, 1, 0) + bytes(56)
+    FIEMAP_EXTENT_UNKNOWN = 0x2
+    
+    def physical_offset(self, path) -> Optional[int]:
+        """
+        Disk offset of a file's first data extent.
+        
+        Returns:
+            Byte offset from FIEMAP, or None where it is unsupported (non-Linux
+            systems, filesystems without extent maps) or the file has no data
+            on disk yet (such as freshly written, delayed-allocation data)
+        """
+        try:
+            import fcntl
+        except ImportError:
+            return None
+        
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                result = fcntl.ioctl(fd, self.FIEMAP_IOCTL, self.FIEMAP_REQUEST)
+            finally:
+                os.close(fd)
+        except OSError:
+            return None
+        
+        mapped_extents = struct.unpack_from("=I", result, 20)[0]
+        if not mapped_extents or struct.unpack_from("=I", result, 72)[0] & self.FIEMAP_EXTENT_UNKNOWN:
+            return None
+        return struct.unpack_from("=Q", result, 40)[0]
+
+
+class FileHasher:
+    """
+    Whole-file digests at disk speed.
+    
+    Files are read in large chunks into one preallocated buffer per
+    thread, and hashlib releases the GIL while it hashes big buffers, so
+    hash_files() scales across a thread pool. Digests are memoized per
+    (path, size, mtime), so a file is read at most once until it changes
+    or clear() is called.
+    """
+    
+    ALGORITHMS = ("blake2b", "sha256", "md5")
+    
+    def __init__(self, algorithm: str = "blake2b", workers: int = 4, chunk_size: int = 1024 * 1024,
+                 filesystem: OSFileSystem = None):
+        """
+        Initialize the hasher.
         
         Args:
-            filepath: Path to the file to classify
+            algorithm: One of ALGORITHMS
+            workers: Threads used by hash_files()
+            chunk_size: Read size for buffered hashing
+            filesystem: Backend to read through (defaults to OSFileSystem)
+        """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {algorithm}")
+        self.algorithm = algorithm
+        self.workers = max(1, workers)
+        self.chunk_size = max(4096, chunk_size)
+        self.fs = filesystem or OSFileSystem()
+        self.bytes_read = 0
+        
+        self._lock = threading.Lock()
+        self._memo = {}
+        self._local = threading.local()
+    
+    def new(self):
+        """A fresh hashlib object for the algorithm."""
+        import hashlib
+        return hashlib.new(self.algorithm)
+    
+    def clear(self):
+        """Forget memoized digests (e.g. at the start of a run)."""
+        with self._lock:
+            self._memo.clear()
+    
+    def remember(self, path, st: os.stat_result, digest: str):
+        """Memoize a digest computed elsewhere, such as while copying the file."""
+        with self._lock:
+            self._memo[(str(path), st.st_size, st.st_mtime_ns)] = digest
+    
+    def hash_file(self, path, st: os.stat_result = None) -> str:
+        """
+        Hex digest of a file's contents.
+        
+        Args:
+            path: File to hash
+            st: The file's stat result, if already known
             
+        Raises:
+            OSError: If the file cannot be read
+        """
+        st = st or self.fs.stat(path)
+        key = (str(path), st.st_size, st.st_mtime_ns)
+        digest = self._memo.get(key)
+        if digest is not None:
+            return digest
+        
+        # Plain reads rather than mmap: a file truncated while it is hashed
+        # (a download still being written) then reads short instead of
+        # killing the process with SIGBUS
+        hasher = self.new()
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = self._local.buffer = bytearray(self.chunk_size)
+        view = memoryview(buffer)
+        read = 0
+        with self.fs.open(path, 'rb') as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                hasher.update(view[:count])
+                read += count
+        
+        digest = hasher.hexdigest()
+        with self._lock:
+            self.bytes_read += read
+            self._memo[key] = digest
+        return digest
+    
+    def hash_files(self, paths: List) -> Dict:
+        """
+        Hash files on the thread pool.
+        
         Returns:
-            Category name or 'Others' if no match found
+            {path: hex digest}; unreadable files are left out
         """
-        filename = os.path.basename(filepath).lower()
-        file_ext = os.path.splitext(filename)[1].lower()
-        
-        # Check each category
-        for category, rules in self.rules.items():
-            # Check extensions
-            if file_ext in [ext.lower() for ext in rules.get("extensions", [])]:
-                # Double-check with patterns if available
-                patterns = rules.get("patterns", [])
-                if patterns:
-                    for pattern in patterns:
-                        if re.search(pattern, filename, re.IGNORECASE):
-                            return category
-                return category
-            
-            # Check naming patterns
-            patterns = rules.get("patterns", [])
-            for pattern in patterns:
-                if re.search(pattern, filename, re.IGNORECASE):
-                    return category
+        from concurrent.futures import ThreadPoolExecutor
         
-        return "Others"
+        def safe_hash(path):
+            try:
+                return self.hash_file(path)
+            except OSError:
+                return None
+        
+        with ThreadPoolExecutor(self.workers) as pool:
+            digests = list(pool.map(safe_hash, paths))
+        return {path: digest for path, digest in zip(paths, digests) if digest is not None}
 
 
 class FileOrganizer:
     """Main file organization logic and operations."""
     
-    def __init__(self, source_dir: str, target_dir: str, config_path: str = None):
+    # Columns of the operations_*.csv log
+    LOG_FIELDS = ['timestamp', 'source', 'target', 'category', 'status', 'attempts', 'digest']
+    
+    COPY_BUFFER_SIZE = 1024 * 1024
+    
+    VERIFY_MODES = ("none", "inline", "readback")
+    
+    def __init__(self, source_dir: str, target_dir: str, config_path: str = None,
+                 settings: Dict = None, filesystem: OSFileSystem = None):
         """
         Initialize the file organizer.
         
@@ -150,13 +2139,88 @@ class FileOrganizer:
             source_dir: Directory to organize files from
             target_dir: Base directory to organize files into
             config_path: Path to configuration file
+            settings: Settings dictionary as loaded by load_settings()
+            filesystem: Backend for scanning, hashing and moving (defaults to the OS)
         """
         self.source_dir = Path(source_dir)
         self.target_dir = Path(target_dir)
-        self.classifier = FileClassifier(config_path)
+        self.fs = filesystem or OSFileSystem()
+        self.settings = settings or {}
+        self.classifier = get_shared_classifier(config_path,
+                                                self.settings.get("performance", {}).get("cache_directory") or None)
         self.logger = self._setup_logging()
         self.moved_files = []
         self.failed_files = []
+        self.skip_counts = {}
+        
+        # Target paths chosen but not yet moved into, so concurrent moves
+        # never pick the same name; and directories known to exist
+        self._claim_lock = threading.Lock()
+        self._claimed_targets = set()
+        self._created_dirs = set()
+        
+        behavior = self.settings.get("behavior", {})
+        
+        # Cross-device copies: "none", "inline" (size and unchanged-source
+        # checks; the digest computed while streaming is only recorded) or
+        # "readback" (the written file is re-read and its digest compared)
+        self.verify_copies = behavior.get("verify_copies", "inline")
+        self.copy_digest = behavior.get("copy_digest", "blake2b")
+        if self.verify_copies not in self.VERIFY_MODES:
+            raise ValueError(f"Unknown copy verification mode: {self.verify_copies}")
+        if self.copy_digest not in FileHasher.ALGORITHMS:
+            raise ValueError(f"Unsupported copy digest: {self.copy_digest}")
+        self.durability = SyncBatcher(
+            self.fs, behavior.get("durability", "none"),
+            int(behavior.get("durability_batch_files", 100)),
+            int(float(behavior.get("durability_batch_mb", 256)) * 1024 * 1024),
+        )
+        
+        # Backoff and quiet-hours waits end early when the run is cancelled
+        self.control = RunControl()
+        self.retry_attempts = int(behavior.get("retry_attempts", 1) or 1)
+        self.retry_queue = RetryQueue(
+            float(behavior.get("retry_base_delay_seconds", 1.0)),
+            float(behavior.get("retry_max_delay_seconds", 30.0)),
+            sleep=self.control.wait,
+        )
+        
+        self.governor = IOGovernor(self.settings, sleep=self.control.wait, control=self.control)
+        self.checkpoint = None
+        self._resume_skip = set()
+        
+        # Set when several processes share the source directory
+        coordination = self.settings.get("coordination", {})
+        self.coordinator = (WorkCoordinator(self.source_dir, self.settings, filesystem=self.fs)
+                            if coordination.get("enabled") else None)
+        
+        # Called as progress_callback(source_path, bytes_copied, total_bytes)
+        # while large files are copied across devices
+        performance = self.settings.get("performance", {})
+        self.progress_callback = None
+        self.progress_threshold = int(float(performance.get("large_file_threshold_mb", 64)) * 1024 * 1024)
+        
+        # Whole-file digests for duplicate checks, memoized per run
+        self.hasher = FileHasher(performance.get("hash_algorithm", "blake2b"),
+                                 int(performance.get("hash_workers", 4)), filesystem=self.fs)
+        
+        general = self.settings.get("general", {})
+        self.date_extractor = (DateExtractor(general.get("date_folder_format") or "%Y/%m", self.fs)
+                               if general.get("create_date_folders") else None)
+        
+        # Oversized category folders are split into subfolders
+        self.shard_policy = None
+        if self.settings.get("sharding", {}).get("enabled"):
+            from sharding import ShardPolicy
+            self.shard_policy = ShardPolicy(self.settings, self.date_extractor, self.fs)
+        self.sniffer = ContentSniffer(self.classifier.rules, self.fs) if general.get("sniff_file_content") else None
+        self.rules = self.classifier.compiled
+        self.cache = self._open_cache()
+        
+        # Trained filename model consulted for files the rules leave in Others
+        learning = self.settings.get("learning", {})
+        self.name_model = self._load_name_model(learning) if learning.get("enabled") else None
+        self.learned_confidence = float(learning.get("min_confidence", 0.8))
         
     def _setup_logging(self) -> logging.Logger:
         """Set up logging configuration."""
@@ -166,6 +2230,11 @@ class FileOrganizer:
         logger = logging.getLogger("SmartFileSort")
         logger.setLevel(logging.INFO)
         
+        # The logger is process-wide; organizers created later (batch jobs,
+        # the GUI) share the handlers of the first one
+        if logger.handlers:
+            return logger
+        
         # File handler
         log_file = log_dir / f"file_sort_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
         file_handler = logging.FileHandler(log_file)
@@ -188,13 +2257,9 @@ class FileOrganizer:
         return logger
     
     def _get_file_hash(self, filepath: str) -> str:
-        """Calculate MD5 hash of a file for duplicate detection."""
-        hash_md5 = hashlib.md5()
+        """Calculate the hash of a file for duplicate detection."""
         try:
-            with open(filepath, "rb") as f:
-                for chunk in iter(lambda: f.read(4096), b""):
-                    hash_md5.update(chunk)
-            return hash_md5.hexdigest()
+            return self.hasher.hash_file(filepath)
         except Exception as e:
             self.logger.warning(f"Could not calculate hash for {filepath}: {e}")
             return ""
@@ -208,91 +2273,354 @@ class FileOrganizer:
             target_file: Target file path that already exists
             
         Returns:
-            New target path with unique name
+            New target path with unique name, or None if an identical file
+            already exists
+        """
+        new_target, existing = self._free_name(target_file)
+        if self._is_duplicate(source_file, existing):
+            self.logger.info(f"Identical file found, skipping: {source_file}")
+            return None
+        return new_target
+    
+    def _free_name(self, target_file: Path) -> Tuple[Path, List[Path]]:
+        """
+        Find the first free "name(n)" slot next to a taken target name.
+        
+        Returns:
+            Tuple of (free path, the taken "name(n)" files passed on the way)
         """
         counter = 1
         file_stem = target_file.stem
         file_suffix = target_file.suffix
         parent_dir = target_file.parent
+        existing = []
         
         while True:
             new_name = f"{file_stem}({counter}){file_suffix}"
             new_target = parent_dir / new_name
             
-            if not new_target.exists():
-                return new_target
-            
-            # Check if files are actually identical
-            if self._get_file_hash(str(source_file)) == self._get_file_hash(str(new_target)):
-                self.logger.info(f"Identical file found, skipping: {source_file}")
-                return None
+            if new_target not in self._claimed_targets and not self.fs.exists(new_target):
+                return new_target, existing
+            # Names claimed but not yet written are still in flight
+            if new_target not in self._claimed_targets:
+                existing.append(new_target)
             
             counter += 1
             if counter > 100:  # Safety limit
-                raise Exception(f"Too many duplicates for {source_file}")
+                raise Exception(f"Too many duplicates for {target_file}")
+    
+    def _is_duplicate(self, source_file: Path, existing: List[Path]) -> bool:
+        """Check whether any of the existing files has the source's content."""
+        if not existing:
+            return False
+        
+        digests = self.hasher.hash_files([source_file] + existing)
+        source_digest = digests.get(source_file)
+        if source_digest is None:
+            self.logger.warning(f"Could not calculate hash for {source_file}")
+            return False
+        return any(digests.get(path) == source_digest for path in existing)
     
-    def _move_file(self, source_path: Path, category: str) -> bool:
+    def _move_file(self, source_path: Path, category: str, attempt: int = 1) -> bool:
         """
         Move a file to the appropriate category folder.
         
+        Transient failures (locked or busy files) are deferred to the retry
+        queue until retry_attempts is reached, then logged as failures.
+        
         Args:
             source_path: Path to the source file
             category: Target category folder name
+            attempt: Number of this attempt, starting at 1
             
         Returns:
             True if successful, False otherwise
         """
+        original_path = source_path
+        target_path = None
         try:
-            # Create target directory
-            target_dir = self.target_dir / category
-            target_dir.mkdir(parents=True, exist_ok=True)
-            
-            # Determine target file path
-            target_path = target_dir / source_path.name
-            
-            # Handle duplicates
-            if target_path.exists():
-                target_path = self._handle_duplicate(source_path, target_path)
-                if target_path is None:  # File is identical, skip
+            self.governor.before_operation()
+            if self.coordinator is not None:
+                source_path = self.coordinator.claim(source_path)
+                if source_path is None:  # Another node is handling it
                     return True
             
-            # Move the file
-            shutil.move(str(source_path), str(target_path))
+            target_path = self._claim_target(source_path, category)
+            if target_path is None:  # File is identical, skip
+                if source_path != original_path:
+                    self.coordinator.release(source_path)
+                return True
             
-            self.moved_files.append({
-                'timestamp': datetime.now().isoformat(),
-                'source': str(source_path),
-                'target': str(target_path),
-                'category': category,
-                'status': 'Success'
-            })
+            claimed_path, moved_path = source_path, target_path
             
-            self.logger.info(f"Moved: {source_path} → {target_path}")
+            def settle(digest: Optional[str], error: Optional[Exception]):
+                # Cross-device moves settle once their durability batch commits;
+                # until then the reservation lets a recovering node undo the copy
+                if error is not None:
+                    self._undo_copy(claimed_path, moved_path)
+                    self._settle_reservation(moved_path)
+                    if claimed_path != original_path:
+                        self.coordinator.release(claimed_path)
+                    self._record_failure(original_path, category, error, attempt)
+                    return
+                
+                self._settle_reservation(moved_path)
+                self._record_operation({
+                    'timestamp': datetime.now().isoformat(),
+                    'source': str(original_path),
+                    'target': str(moved_path),
+                    'category': category,
+                    'status': 'Success',
+                    'attempts': attempt,
+                    'digest': digest or ''
+                })
+                self.logger.info(f"Moved: {original_path} → {moved_path}")
+            
+            # Move the file
+            self._transfer(source_path, target_path, settle)
             return True
             
         except Exception as e:
-            self.failed_files.append({
-                'timestamp': datetime.now().isoformat(),
-                'source': str(source_path),
-                'target': '',
-                'category': category,
-                'status': f'Failed: {str(e)}'
-            })
-            
-            self.logger.error(f"Failed to move {source_path}: {e}")
+            if target_path is not None:
+                self._undo_copy(source_path, target_path)
+                self._settle_reservation(target_path)
+            
+            if attempt < self.retry_attempts and is_transient_error(e):
+                self.retry_queue.schedule((original_path, category), attempt)
+                self.logger.warning(f"Deferred {original_path} after attempt {attempt}: {e}")
+            else:
+                if source_path != original_path:
+                    self.coordinator.release(source_path)
+                self._record_failure(original_path, category, e, attempt)
             return False
+        
+        finally:
+            if target_path is not None:
+                with self._claim_lock:
+                    self._claimed_targets.discard(target_path)
+    
+    def _settle_reservation(self, target_path: Path):
+        """Drop the coordinator's note of a target once its move is committed or undone."""
+        if self.coordinator is not None:
+            with self._claim_lock:
+                self.coordinator.settle(target_path)
+    
+    def _undo_copy(self, source_path: Path, target_path: Path):
+        """Remove what a failed move left at its target while the source is still in place."""
+        # The target path was free when claimed, so anything there now is
+        # a partial or unconfirmed copy from this attempt
+        if self.fs.exists(source_path) and self.fs.exists(target_path):
+            try:
+                self.fs.unlink(target_path)
+            except OSError:
+                pass
+    
+    def _transfer(self, source_path: Path, target_path: Path,
+                  settle: Callable[[Optional[str], Optional[Exception]], None] = None):
+        """
+        Move a file, streaming the data when it has to cross devices.
+        
+        Args:
+            source_path: Path to the source file
+            target_path: Claimed, non-existing target path
+            settle: Called with (digest, None) once the move is complete,
+                which for a cross-device copy is after its durability batch
+                commits, or with (digest, error) if committing failed. The
+                digest is that of the verified copy, None for a rename.
+        """
+        settle = settle or (lambda digest, error: None)
+        try:
+            if self.coordinator is not None:
+                # Replaces the placeholder that reserved the name
+                self.fs.replace(source_path, target_path)
+            else:
+                self.fs.rename(source_path, target_path)
+            self.durability.after_rename(source_path, target_path)
+            settle(None, None)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        
+        # The source is only removed once the copy has been verified and,
+        # depending on the durability mode, fsynced
+        copied, digest = self._copy_file(source_path, target_path)
+        self.durability.after_copy(source_path, target_path, copied, lambda: self.fs.unlink(source_path),
+                                   lambda error: settle(digest, error))
+    
+    def _copy_file(self, source_path: Path, target_path: Path) -> Tuple[int, Optional[str]]:
+        """
+        Copy data and metadata through a reusable buffer, reporting progress.
+        
+        Unless verify_copies is "none", the data is hashed as it streams
+        through the buffer and the copy is checked before returning.
+        
+        Returns:
+            Tuple of (bytes copied, hex digest of the data or None without
+            verification)
+            
+        Raises:
+            OSError: If verification fails
+        """
+        source_stat = self.fs.stat(source_path)
+        total = source_stat.st_size
+        report = self.progress_callback if total >= self.progress_threshold else None
+        buffer = bytearray(self.COPY_BUFFER_SIZE)
+        view = memoryview(buffer)
+        copied = 0
+        
+        digest = None
+        if self.verify_copies != "none":
+            import hashlib
+            digest = hashlib.new(self.copy_digest)
+        
+        # A coordinated target already exists as the reservation placeholder
+        target_mode = 'wb' if self.coordinator is not None else 'xb'
+        with self.fs.open(source_path, 'rb') as src, self.fs.open(target_path, target_mode) as dst:
+            while True:
+                count = src.readinto(buffer)
+                if not count:
+                    break
+                self.governor.consume_bytes(count)
+                dst.write(view[:count])
+                if digest is not None:
+                    digest.update(view[:count])
+                copied += count
+                if report is not None:
+                    report(source_path, copied, total)
+        
+        self.fs.copystat(source_path, target_path)
+        
+        if digest is None:
+            return copied, None
+        self._verify_copy(source_path, target_path, source_stat, copied, digest, buffer)
+        
+        # Later duplicate checks against the new file need not read it again
+        if self.copy_digest == self.hasher.algorithm:
+            self.hasher.remember(target_path, self.fs.stat(target_path), digest.hexdigest())
+        return copied, digest.hexdigest()
+    
+    def _verify_copy(self, source_path: Path, target_path: Path, source_stat: os.stat_result,
+                     copied: int, digest, buffer: bytearray):
+        """
+        Check a finished copy against what was read from the source.
+        
+        The source must be unchanged since the copy started and the target
+        must hold exactly the bytes written; in "readback" mode the target
+        is also re-read (from disk, not the page cache, where the backend
+        supports it) and its digest compared.
+        
+        Raises:
+            OSError: With errno EIO if the copy does not match
+        """
+        current = self.fs.stat(source_path)
+        if (current.st_size, current.st_mtime_ns) != (source_stat.st_size, source_stat.st_mtime_ns):
+            raise OSError(errno.EIO, "Source changed while it was copied", str(source_path))
+        if copied != source_stat.st_size or self.fs.stat(target_path).st_size != copied:
+            raise OSError(errno.EIO, "Copy size does not match the source", str(target_path))
+        
+        if self.verify_copies != "readback":
+            return
+        
+        drop_cache = getattr(self.fs, "drop_cache", None)
+        if drop_cache is not None:
+            drop_cache(target_path)
+        
+        import hashlib
+        
+        check = hashlib.new(self.copy_digest)
+        view = memoryview(buffer)
+        with self.fs.open(target_path, 'rb') as f:
+            while True:
+                count = f.readinto(buffer)
+                if not count:
+                    break
+                self.governor.consume_bytes(count)
+                check.update(view[:count])
+        
+        if check.digest() != digest.digest():
+            raise OSError(errno.EIO, "Copy does not match the source checksum", str(target_path))
+    
+    def _category_dir(self, source_path: Path, category: str, file_stat: os.stat_result = None) -> Path:
+        """Target folder of a file: its category, plus date and shard folders if enabled."""
+        folder = self.target_dir / category
+        if self.date_extractor is not None:
+            folder = folder / self.date_extractor.folder(source_path, file_stat)
+        if self.shard_policy is not None:
+            folder = self.shard_policy.place(folder, source_path, file_stat)
+        return folder
+    
+    def _claim_target(self, source_path: Path, category: str) -> Optional[Path]:
+        """
+        Choose and reserve the target path for a file.
+        
+        Args:
+            source_path: Path to the source file
+            category: Target category folder name
+            
+        Returns:
+            Reserved target path, or None if an identical file already exists
+        """
+        # Create target directory (once per run)
+        target_dir = self._category_dir(source_path, category)
+        if target_dir not in self._created_dirs:
+            self.fs.makedirs(target_dir)
+            self._created_dirs.add(target_dir)
+        
+        # Determine target file path
+        base_path = target_dir / source_path.name
+        checked = set()
+        
+        while True:
+            with self._claim_lock:
+                if base_path in self._claimed_targets or self.fs.exists(base_path):
+                    target_path, existing = self._free_name(base_path)
+                else:
+                    target_path, existing = base_path, []
+            
+            # Content comparisons hash whole files, so they run outside the
+            # lock while other workers go on claiming names
+            unchecked = [path for path in existing if path not in checked]
+            if self._is_duplicate(source_path, unchecked):
+                self.logger.info(f"Identical file found, skipping: {source_path}")
+                return None
+            checked.update(unchecked)
+            
+            with self._claim_lock:
+                # The name may have been taken while hashing, or by another
+                # node at the same moment; pick again if so
+                if target_path in self._claimed_targets or self.fs.exists(target_path):
+                    continue
+                if self.coordinator is not None and not self.coordinator.reserve(target_path, source_path):
+                    continue
+                self._claimed_targets.add(target_path)
+                return target_path
+    
+    def _record_failure(self, source_path: Path, category: str, error: Exception, attempt: int = 1):
+        """Record a file that could not be organized."""
+        self._record_operation({
+            'timestamp': datetime.now().isoformat(),
+            'source': str(source_path),
+            'target': '',
+            'category': category,
+            'status': f'Failed: {str(error)}',
+            'attempts': attempt
+        })
+        
+        self.logger.error(f"Failed to move {source_path}: {error}")
     
-    def organize_files(self, dry_run: bool = False) -> Tuple[int, int]:
+    def organize_files(self, dry_run: bool = False, save_log: bool = True) -> Tuple[int, int]:
         """
         Organize all files in the source directory.
         
         Args:
             dry_run: If True, only log what would be done without actually moving files
+            save_log: If False, leave writing the operation log to the caller
             
         Returns:
             Tuple of (successful_moves, failed_moves)
         """
-        if not self.source_dir.exists():
+        if not self.fs.exists(self.source_dir):
             self.logger.error(f"Source directory does not exist: {self.source_dir}")
             return 0, 0
         
@@ -300,70 +2628,486 @@ class FileOrganizer:
         if dry_run:
             self.logger.info("DRY RUN MODE - No files will be moved")
         
-        files_to_process = []
+        # Counters are per run; rules, caches and indexes stay warm when the
+        # same organizer is reused (e.g. by the serve command or the GUI)
+        self.control.reset()
+        self.moved_files = []
+        self.failed_files = []
+        self._created_dirs.clear()
+        self.hasher.clear()
+        if self.shard_policy is not None:
+            self.shard_policy.reset(dry_run)
         
-        # Collect all files to process
-        for item in self.source_dir.iterdir():
-            if item.is_file():
-                files_to_process.append(item)
+        self._refresh_rules()
+        performance = self.settings.get("performance", {})
+        
+        if not dry_run:
+            self._open_checkpoint()
         
-        self.logger.info(f"Found {len(files_to_process)} files to process")
+        if self.coordinator is not None and not dry_run:
+            self.coordinator.start()
         
-        # Process each file
-        for file_path in files_to_process:
-            category = self.classifier.classify_file(str(file_path))
-            self.logger.info(f"Classified {file_path.name} as {category}")
+        if performance.get("execution_mode", "sequential") == "async":
+            from asyncengine import AsyncPipeline
+            AsyncPipeline(self, performance).run(dry_run)
+        else:
+            files_to_process = self._scan_source()
             
-            if not dry_run:
-                self._move_file(file_path, category)
+            self.logger.info(f"Found {len(files_to_process)} files to process")
+            
+            # The learned model scores the whole scan at once, so with it
+            # enabled every mode classifies up front
+            categories = None
+            if performance.get("execution_mode") == "processes":
+                categories = ShardedClassifier(self, performance).classify(files_to_process)
+            elif self.name_model is not None:
+                categories = [self._classify_entry(entry) for entry in files_to_process]
+            if categories is not None:
+                categories = self._apply_learned(files_to_process, categories)
+            
+            if performance.get("execution_mode") == "lanes":
+                LaneScheduler(self, performance).run(files_to_process, dry_run, categories)
+            elif categories is not None:
+                for entry, category in zip(files_to_process, categories):
+                    if not self._proceed():
+                        break
+                    self._process_entry(entry, category, dry_run)
             else:
-                # Just log what would happen
-                target_dir = self.target_dir / category
-                target_path = target_dir / file_path.name
-                self.logger.info(f"Would move: {file_path} → {target_path}")
+                # Process each file
+                for entry in files_to_process:
+                    if not self._proceed():
+                        break
+                    self._process_entry(entry, self._classify_entry(entry), dry_run)
+        
+        self._drain_retries()
+        self.durability.flush()
+        
+        if self.coordinator is not None and not dry_run:
+            self.coordinator.finish()
+            if self.coordinator.lost:
+                self.logger.info(f"{self.coordinator.lost} files were claimed by other nodes")
         
         successful = len(self.moved_files)
         failed = len(self.failed_files)
         
-        # Save operation log
-        if not dry_run:
+        if self.checkpoint is not None:
+            self.checkpoint.close(completed=not self.control.cancelled)
+            self.checkpoint = None
+        if self.control.cancelled and not dry_run:
+            self.logger.warning("Run cancelled; the next run will resume from the checkpoint "
+                                "and write the operation log")
+        
+        if self.cache is not None:
+            self.cache.save()
+            self.logger.info(f"Classification cache: {self.cache.hits} hits, {self.cache.misses} misses")
+        
+        # Save operation log; a cancelled run's operations stay in the journal
+        # and are logged once, by the run that resumes it
+        if not dry_run and save_log and not self.control.cancelled:
             self._save_operation_log()
         
         self.logger.info(f"Organization complete. Success: {successful}, Failed: {failed}")
         return successful, failed
     
-    def _save_operation_log(self):
-        """Save operation log to CSV file."""
-        log_dir = Path(__file__).parent.parent / "logs"
-        log_file = log_dir / f"operations_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    def _process_entry(self, entry: os.DirEntry, category: str, dry_run: bool = False):
+        """
+        Move (or, in dry-run mode, report) one classified file.
+        
+        Args:
+            entry: Directory entry of the file
+            category: Category the file was classified as
+            dry_run: If True, only log what would be done
+        """
+        file_path = Path(entry.path)
+        self.logger.info(f"Classified {file_path.name} as {category}")
+        
+        if not dry_run:
+            self._move_file(file_path, category)
+        else:
+            # Just log what would happen
+            target_dir = self._category_dir(file_path, category, entry.stat())
+            target_path = target_dir / file_path.name
+            self.logger.info(f"Would move: {file_path} → {target_path}")
+    
+    def _proceed(self) -> bool:
+        """Honor pause and cancel requests between files."""
+        if self.control.paused and self.checkpoint is not None:
+            self.checkpoint.flush()
+        return self.control.proceed()
+    
+    def _open_checkpoint(self):
+        """Start the run's journal, resuming an interrupted run if one was left."""
+        performance = self.settings.get("performance", {})
+        cache_dir = Path(performance.get("cache_directory") or Path(__file__).parent.parent / "cache")
+        key = zlib.crc32(f"{self.source_dir.absolute()}|{self.target_dir.absolute()}".encode('utf-8'))
+        self.checkpoint = RunCheckpoint(cache_dir / "checkpoints" / f"run_{key:08x}.jsonl",
+                                        int(performance.get("checkpoint_interval_files", 50)))
+        
+        self._resume_skip = set()
+        previous = self.checkpoint.load()
+        if not previous:
+            return
+        
+        for record in previous:
+            if record.get("status") == "Success":
+                self.moved_files.append(record)
+            else:
+                self.failed_files.append(record)
+                self._resume_skip.add(record.get("source"))
+        self.logger.info(f"Resuming interrupted run: {len(previous)} operations already done")
+    
+    def _record_operation(self, operation: Dict):
+        """Add an operation to the run's results and checkpoint."""
+        (self.moved_files if operation['status'] == 'Success' else self.failed_files).append(operation)
+        if self.checkpoint is not None:
+            self.checkpoint.record(operation)
+    
+    def _drain_retries(self):
+        """Retry deferred moves once the main pass is done, in due order."""
+        if self.retry_queue:
+            self.logger.info(f"Retrying {len(self.retry_queue)} deferred files")
+        
+        while self.retry_queue and self._proceed():
+            (source_path, category), attempt = self.retry_queue.pop()
+            if self.control.cancelled:  # Woken early; the file waits for the next run
+                break
+            self._move_file(source_path, category, attempt + 1)
+        self.retry_queue.clear()
+    
+    def _iter_source(self, file_filter: FileFilter):
+        """Yield the source directory entries that pass the filter stage."""
+        with self.fs.scandir(self.source_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and file_filter.accepts(entry):
+                    if self._resume_skip and str(Path(entry.path)) in self._resume_skip:
+                        continue
+                    yield entry
+    
+    def _report_skips(self, file_filter: FileFilter):
+        """Record and log the per-filter skip counts of a scan."""
+        self.skip_counts = {name: count for name, count in file_filter.skip_counts.items() if count}
+        for name, count in self.skip_counts.items():
+            self.logger.info(f"Skipped {count} files ({name})")
+    
+    def _scan_source(self) -> List[os.DirEntry]:
+        """
+        Scan the source directory and apply the filter stage.
+        
+        Returns:
+            Directory entries of the files that passed every filter
+        """
+        file_filter = FileFilter(self.settings)
+        files = list(self._iter_source(file_filter))
+        self._report_skips(file_filter)
+        
+        # Cooperating nodes start at different points of the listing so
+        # they rarely race for the same file
+        if self.coordinator is not None:
+            import random
+            random.shuffle(files)
+        elif self.settings.get("performance", {}).get("locality_order", "none") != "none":
+            files = self._locality_order(files)
+        return files
+    
+    def _locality_order(self, entries: List[os.DirEntry]) -> List[os.DirEntry]:
+        """
+        Sort entries by where their data lies on disk.
+        
+        On spinning disks this turns the reads of cross-device copies into
+        one sweep instead of a seek per file. "extent" orders by the offset
+        of each file's first extent, falling back to inode numbers (which
+        most filesystems allocate near their data) when the backend or
+        filesystem cannot report extents; "inode" uses inode numbers only.
+        
+        Args:
+            entries: Scanned directory entries
+            
+        Returns:
+            The entries in locality order
+        """
+        method = self.settings.get("performance", {}).get("locality_order")
+        offsets = None
         
-        all_operations = self.moved_files + self.failed_files
+        locate = getattr(self.fs, "physical_offset", None)
+        if method == "extent" and locate is not None:
+            offsets = []
+            for entry in entries:
+                # Empty files have no extents and cost no reads
+                offset = locate(entry.path) if entry.stat().st_size else 0
+                if offset is None:
+                    self.logger.info("Extent offsets unavailable; ordering by inode number")
+                    offsets = None
+                    break
+                offsets.append(offset)
         
-        if all_operations:
-            with open(log_file, 'w', newline='', encoding='utf-8') as csvfile:
-                fieldnames = ['timestamp', 'source', 'target', 'category', 'status']
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(all_operations)
+        if offsets is None:
+            offsets = [entry.inode() for entry in entries]
+        
+        order = sorted(range(len(entries)), key=offsets.__getitem__)
+        return [entries[index] for index in order]
+    
+    def _target_device(self) -> Optional[int]:
+        """Device id of the target directory (or its nearest existing parent)."""
+        path = self.target_dir.absolute()
+        while True:
+            try:
+                return self.fs.stat(path).st_dev
+            except OSError:
+                if path.parent == path:
+                    return None
+                path = path.parent
+    
+    def _refresh_rules(self):
+        """Pick up rule edits and pin one rule set for the coming batch."""
+        rules = self.classifier.current_rules(force=True)
+        if rules is self.rules:
+            return
+        
+        self.rules = rules
+        if self.sniffer is not None:
+            self.sniffer.categories = set(rules.rules)
+        self.cache = self._open_cache()
+    
+    def _open_cache(self) -> Optional[ClassificationCache]:
+        """Open the persistent classification cache if enabled in settings."""
+        performance = self.settings.get("performance", {})
+        max_entries = int(performance.get("classification_cache_entries", 0) or 0)
+        if max_entries <= 0:
+            return None
+        
+        cache_dir = Path(performance.get("cache_directory") or Path(__file__).parent.parent / "cache")
+        
+        # One file per rules file (like the rules snapshot), so organizers
+        # using different rules do not keep invalidating each other's results
+        key = zlib.crc32(os.path.abspath(self.classifier.config_path).encode('utf-8'))
+        
+        # Sniffed results are only valid while sniffing stays enabled
+        fingerprint = f"{self.rules.fingerprint}:{int(self.sniffer is not None)}"
+        return ClassificationCache(cache_dir / f"classification_cache_{key:08x}.json", fingerprint, max_entries)
+    
+    def _classify_entry(self, entry: os.DirEntry) -> str:
+        """
+        Classify a scanned entry, using the cache and content sniffing.
+        
+        Args:
+            entry: Directory entry of the file to classify
+            
+        Returns:
+            Category name or 'Others' if no match found
+        """
+        if self.cache is not None:
+            st = entry.stat()
+            category = self.cache.get(entry.name, st)
+            if category is not None:
+                return category
+        
+        category = self.rules.classify(entry.name)
+        
+        if category == "Others" and self.sniffer is not None:
+            category = self.sniffer.sniff(entry.path, entry.stat()) or category
+        
+        if self.cache is not None:
+            self.cache.put(entry.name, st, category)
+        
+        return category
+    
+    def _load_name_model(self, learning: Dict):
+        """Load the trained filename model, or return None if there is none yet."""
+        from learned import NameModel, default_model_path
+        
+        model_path = Path(learning.get("model_path") or default_model_path(self.settings))
+        model = NameModel.load(model_path)
+        if model is None:
+            self.logger.warning(f"Learning is enabled but no model was found at {model_path}; "
+                                f"train one with 'smartfilesort.py learn'")
+        return model
+    
+    def _apply_learned(self, entries: List[os.DirEntry], categories: List[str]) -> List[str]:
+        """
+        Replace "Others" with the learned model's prediction where it is confident.
+        
+        Args:
+            entries: Scanned directory entries
+            categories: Their rule-based categories, in the same order
             
+        Returns:
+            Categories with confident predictions filled in
+        """
+        if self.name_model is None:
+            return categories
+        
+        unmatched = [index for index, category in enumerate(categories) if category == "Others"]
+        if not unmatched:
+            return categories
+        
+        categories = list(categories)
+        predictions = self.name_model.predict([entries[index].name for index in unmatched])
+        accepted = 0
+        for index, (label, confidence) in zip(unmatched, predictions):
+            # Categories removed from the rules since training are ignored
+            if confidence >= self.learned_confidence and label in self.rules.rules:
+                categories[index] = label
+                accepted += 1
+        
+        if len(entries) > 1:
+            self.logger.info(f"Learned model classified {accepted} of {len(unmatched)} unmatched files")
+        return categories
+    
+    def _save_operation_log(self):
+        """Save operation log to CSV file."""
+        log_file = save_operation_log(self.moved_files + self.failed_files)
+        if log_file:
             self.logger.info(f"Operation log saved to: {log_file}")
 
 
-def main():
+def save_operation_log(operations: List[Dict], log_dir: Path = None, prefix: str = "operations") -> Optional[Path]:
+    """
+    Write operation records to a timestamped CSV log.
+    
+    Args:
+        operations: Rows with the FileOrganizer.LOG_FIELDS columns
+        log_dir: Directory for the log (defaults to logs/)
+        prefix: File name prefix
+        
+    Returns:
+        Path of the written log, or None if there was nothing to write
+    """
+    if not operations:
+        return None
+    
+    import csv
+    
+    log_dir = Path(log_dir) if log_dir else Path(__file__).parent.parent / "logs"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    log_file = log_dir / f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+    
+    with open(log_file, 'w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.DictWriter(csvfile, fieldnames=FileOrganizer.LOG_FIELDS, restval='')
+        writer.writeheader()
+        writer.writerows(operations)
+    
+    return log_file
+
+
+_progress_shown = {}
+
+
+def _print_progress(source_path: Path, copied: int, total: int):
+    """Print progress of large transfers in 10% steps."""
+    step = copied * 10 // total if total else 10
+    if _progress_shown.get(source_path) == step:
+        return
+    
+    _progress_shown[source_path] = step
+    print(f"  {source_path.name}: {step * 10}% ({copied // (1024 * 1024)}/{total // (1024 * 1024)} MB)",
+          file=sys.stderr)
+    if step >= 10:
+        _progress_shown.pop(source_path, None)
+
+
+class _GracefulStop:
+    """
+    Turn SIGINT/SIGTERM into a cooperative cancel for the duration of a run.
+    
+    The first signal lets the file in progress finish and the logs and
+    checkpoint be written; a second one interrupts immediately.
+    """
+    
+    def __init__(self, control: RunControl):
+        self.control = control
+        self.previous = {}
+    
+    def _handle(self, signum, frame):
+        if self.control.cancelled:
+            raise KeyboardInterrupt
+        print("\nStopping after the current file (press Ctrl+C again to abort)...", file=sys.stderr)
+        self.control.cancel()
+    
+    def __enter__(self):
+        import signal
+        
+        # Handlers can only be installed from the main thread
+        if threading.current_thread() is threading.main_thread():
+            for name in ("SIGINT", "SIGTERM"):
+                signum = getattr(signal, name, None)
+                if signum is not None:
+                    self.previous[signum] = signal.signal(signum, self._handle)
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        import signal
+        
+        for signum, handler in self.previous.items():
+            signal.signal(signum, handler)
+
+
+def main(argv: List[str] = None) -> int:
     """Main execution function."""
     import argparse
     
-    parser = argparse.ArgumentParser(description="SmartFileSort - Automated File Organizer")
+    argv = sys.argv[1:] if argv is None else argv
+    
+    # Maintenance commands live in their own modules and are imported on demand
+    if argv and argv[0] == "rules":
+        from ruletools import main as rules_main
+        return rules_main(argv[1:])
+    if argv and argv[0] == "serve":
+        from scheduler import main as serve_main
+        return serve_main(argv[1:])
+    if argv and argv[0] == "batch":
+        from batch import main as batch_main
+        return batch_main(argv[1:])
+    if argv and argv[0] == "reshard":
+        from sharding import main as reshard_main
+        return reshard_main(argv[1:])
+    if argv and argv[0] == "learn":
+        from learned import main as learn_main
+        return learn_main(argv[1:])
+    if argv and argv[0] == "dedupe":
+        from dedupe import main as dedupe_main
+        return dedupe_main(argv[1:])
+    if argv and argv[0] == "benchmark":
+        from benchmark import main as benchmark_main
+        return benchmark_main(argv[1:])
+    
+    parser = argparse.ArgumentParser(
+        description="SmartFileSort - Automated File Organizer",
+        epilog="Commands: 'rules profile', 'rules simulate' (see 'smartfilesort.py rules --help'), "
+               "'serve' (see 'smartfilesort.py serve --help'), "
+               "'batch' (see 'smartfilesort.py batch --help'), "
+               "'reshard' (see 'smartfilesort.py reshard --help'), "
+               "'learn' (see 'smartfilesort.py learn --help'), "
+               "'dedupe' (see 'smartfilesort.py dedupe --help'), "
+               "'benchmark' (see 'smartfilesort.py benchmark --help')"
+    )
     parser.add_argument("source", help="Source directory to organize")
     parser.add_argument("target", help="Target directory for organized files")
     parser.add_argument("--dry-run", action="store_true", help="Preview actions without moving files")
     parser.add_argument("--config", help="Path to configuration file")
+    parser.add_argument("--settings", help="Path to settings file")
+    parser.add_argument("--engine", choices=["sequential", "lanes", "async", "processes"],
+                        help="Execution mode (overrides performance.execution_mode)")
+    parser.add_argument("--order", choices=["none", "inode", "extent"],
+                        help="Process files in on-disk order (overrides performance.locality_order)")
+    parser.add_argument("--durability", choices=SyncBatcher.MODES,
+                        help="When moved files are fsynced (overrides behavior.durability)")
     
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
+    
+    settings = load_settings(args.settings)
+    if args.engine:
+        settings.setdefault("performance", {})["execution_mode"] = args.engine
+    if args.order:
+        settings.setdefault("performance", {})["locality_order"] = args.order
+    if args.durability:
+        settings.setdefault("behavior", {})["durability"] = args.durability
     
     # Create organizer and run
-    organizer = FileOrganizer(args.source, args.target, args.config)
-    success_count, fail_count = organizer.organize_files(dry_run=args.dry_run)
+    organizer = FileOrganizer(args.source, args.target, args.config, settings)
+    organizer.progress_callback = _print_progress
+    
+    with _GracefulStop(organizer.control):
+        success_count, fail_count = organizer.organize_files(dry_run=args.dry_run)
     
     print(f"\n=== SmartFileSort Complete ===")
     print(f"Successfully processed: {success_count} files")
@@ -371,7 +3115,13 @@ def main():
     
     if fail_count > 0:
         print(f"Check logs for details on failed operations")
+    
+    if organizer.control.cancelled:
+        print("Run was stopped early; run the same command again to resume")
+        return 130
+    
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Async Engine Tests
+================================
+
+Unit tests for the asyncio execution mode.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import shutil
+import asyncio
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smartfilesort import FileOrganizer, OSFileSystem
+
+
+class ZeroDeviceEntry:
+    """Directory entry whose stat() lacks the device, as on Windows."""
+    
+    def __init__(self, entry):
+        self.entry = entry
+        
+    def __getattr__(self, name):
+        return getattr(self.entry, name)
+        
+    def stat(self, **kwargs):
+        st = self.entry.stat(**kwargs)
+        return os.stat_result(tuple(st)[:2] + (0,) + tuple(st)[3:])
+
+
+class ZeroDeviceFileSystem(OSFileSystem):
+    """OS backend whose directory entries report st_dev 0."""
+    
+    class _Listing:
+        def __init__(self, path):
+            self.iterator = os.scandir(path)
+        def __enter__(self):
+            return (ZeroDeviceEntry(entry) for entry in self.iterator)
+        def __exit__(self, *exc):
+            self.iterator.close()
+            
+    def scandir(self, path):
+        return self._Listing(path)
+
+
+class TestAsyncPipeline(unittest.TestCase):
+    """Test cases for the async engine."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(self.source_dir)
+        
+        self.extensions = [".pdf", ".jpg", ".py", ".zip", ".mp3", ".xyz"]
+        for i in range(60):
+            with open(os.path.join(self.source_dir, f"file_{i}{self.extensions[i % 6]}"), 'w') as f:
+                f.write(f"content {i}")
+        
+        # Force the duplicate-renaming path for one file
+        os.makedirs(os.path.join(self.target_dir, "Documents"))
+        with open(os.path.join(self.target_dir, "Documents", "file_0.pdf"), 'w') as f:
+            f.write("existing")
+        
+        self.settings = {"performance": {
+            "execution_mode": "async", "metadata_concurrency": 4,
+            "data_concurrency": 2, "queue_size": 1,
+            "cache_directory": os.path.join(self.temp_dir, "cache"),
+        }}
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def test_async_organization(self):
+        """Test that the async engine moves every file to its category."""
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        success_count, fail_count = organizer.organize_files(dry_run=False)
+        
+        self.assertEqual((success_count, fail_count), (60, 0))
+        self.assertEqual(os.listdir(self.source_dir), [])
+        self.assertEqual(len(os.listdir(os.path.join(self.target_dir, "Documents"))), 11)
+        self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Documents", "file_0(1).pdf")))
+        self.assertEqual(len(os.listdir(os.path.join(self.target_dir, "Others"))), 10)
+    
+    def test_same_device_moves_use_metadata_limit(self):
+        """Test that moves on the target's device avoid the data limit even without st_dev in entries."""
+        acquired = []
+        
+        class CountingSemaphore(asyncio.Semaphore):
+            async def __aenter__(self):
+                acquired.append(self)
+                return await super().__aenter__()
+                
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings,
+                                  filesystem=ZeroDeviceFileSystem())
+        with mock.patch("asyncengine.asyncio.Semaphore", CountingSemaphore):
+            self.assertEqual(organizer.organize_files(dry_run=False, save_log=False), (60, 0))
+        
+        # Only the metadata limit, taken first for the stat, was ever used
+        limits = list(dict.fromkeys(acquired))
+        self.assertEqual(len(limits), 1)
+        
+    def test_async_dry_run(self):
+        """Test that an async dry run leaves the source untouched."""
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        organizer.organize_files(dry_run=True)
+        
+        self.assertEqual(len(os.listdir(self.source_dir)), 60)
+        self.assertEqual(os.listdir(self.target_dir), ["Documents"])
+
+
+if __name__ == "__main__":
+    unittest.main()
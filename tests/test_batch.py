@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Batch Runner Tests
+================================
+
+Unit tests for multi-source batch runs.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import logging
+import threading
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smartfilesort import FileOrganizer, save_operation_log
+from batch import BatchRunner, load_manifest
+
+
+class TestBatchRunner(unittest.TestCase):
+    """Test cases for batch runs."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.manifest = []
+        for i in range(4):
+            source = os.path.join(self.temp_dir, f"user{i}", "Downloads")
+            os.makedirs(source)
+            for name in ("report.pdf", "photo.jpg"):
+                with open(os.path.join(source, name), 'w') as f:
+                    f.write(f"{i} {name}")
+            self.manifest.append({"source": source, "target": os.path.join(self.temp_dir, f"user{i}", "Sorted")})
+            
+        self.manifest_path = os.path.join(self.temp_dir, "manifest.json")
+        with open(self.manifest_path, 'w') as f:
+            json.dump({"jobs": self.manifest}, f)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+        
+    def run_tracked(self, devices, device_concurrency=1):
+        """Run the batch with fake devices, recording the peak concurrency per device."""
+        runner = BatchRunner(load_manifest(self.manifest_path),
+                             {"performance": {"device_concurrency": device_concurrency,
+                                              "cache_directory": os.path.join(self.temp_dir, "cache")}})
+        runner._job_devices = lambda job: (devices[job.name],)
+        
+        lock = threading.Lock()
+        running = {}
+        self.peak = {}
+        original = runner._run_job
+        
+        def tracked(job):
+            device = job.devices[0]
+            with lock:
+                running[device] = running.get(device, 0) + 1
+                self.peak[device] = max(self.peak.get(device, 0), running[device])
+            time.sleep(0.05)
+            original(job)
+            with lock:
+                running[device] -= 1
+        
+        runner._run_job = tracked
+        return runner, runner.run()
+        
+    def test_batch_moves_every_job(self):
+        """Test that all jobs run and feed one aggregate log."""
+        devices = {job["source"]: 1 for job in self.manifest}
+        runner, totals = self.run_tracked(devices)
+        
+        self.assertEqual(totals, (8, 0))
+        for job in self.manifest:
+            self.assertEqual(os.listdir(job["source"]), [])
+            self.assertTrue(os.path.exists(os.path.join(job["target"], "Documents", "report.pdf")))
+        self.assertIn("Total: 8 moved, 0 failed across 4 jobs", runner.summary())
+        
+        log_file = save_operation_log(runner.operations(), self.temp_dir, "operations_batch")
+        with open(log_file, newline='', encoding='utf-8') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(len(rows), 8)
+        self.assertEqual({row["status"] for row in rows}, {"Success"})
+        
+    def test_same_device_jobs_serialized(self):
+        """Test that jobs on one device never overlap."""
+        devices = {job["source"]: 1 for job in self.manifest}
+        self.run_tracked(devices)
+        self.assertEqual(self.peak, {1: 1})
+        
+    def test_different_devices_run_in_parallel(self):
+        """Test that jobs on different devices overlap while each device stays serialized."""
+        devices = {job["source"]: i % 2 for i, job in enumerate(self.manifest)}
+        self.run_tracked(devices)
+        self.assertEqual(self.peak, {0: 1, 1: 1})
+        
+        devices = {job["source"]: 1 for job in self.manifest}
+        self.run_tracked(devices, device_concurrency=2)
+        self.assertEqual(self.peak, {1: 2})
+        
+    def test_organizers_share_log_handlers(self):
+        """Test that creating many organizers does not stack log handlers."""
+        FileOrganizer(self.temp_dir, self.temp_dir)
+        count = len(logging.getLogger("SmartFileSort").handlers)
+        for _ in range(3):
+            FileOrganizer(self.temp_dir, self.temp_dir)
+        self.assertEqual(len(logging.getLogger("SmartFileSort").handlers), count)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Benchmark Tests
+=============================
+
+Smoke tests for the benchmark harness.
+"""
+
+import unittest
+import os
+import sys
+import io
+from contextlib import redirect_stdout
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from benchmark import SCENARIOS, format_results, main as benchmark_main
+
+
+class TestBenchmark(unittest.TestCase):
+    """Test cases for the benchmark scenarios."""
+    
+    def test_locality_scenario(self):
+        """Test that on-disk order needs a single seek, and that inode order only approximates it."""
+        results = SCENARIOS["locality"](files=12, file_size=1024, seek_ms=0)
+        
+        seeks = {row["label"]: row["counts"]["seek"] for row in results}
+        self.assertEqual(seeks["order=extent (bound)"], 1)
+        self.assertGreater(seeks["order=inode"], 1)
+        self.assertGreater(seeks["order=none"], 6)
+        self.assertTrue(all(row["files"] == 12 and row["failed"] == 0 for row in results))
+        self.assertIn("order=inode", format_results("locality", results))
+        
+    def test_durability_scenario(self):
+        """Test that each durability mode is measured and batching saves fsyncs."""
+        results = SCENARIOS["durability"](files=10, file_size=1024, seek_ms=0)
+        
+        fsyncs = {row["label"]: row["counts"].get("fsync", 0) for row in results}
+        self.assertEqual(fsyncs["durability=none"], 0)
+        self.assertLess(fsyncs["durability=batched"], fsyncs["durability=strict"])
+        
+    def test_hashing_scenario(self):
+        """Test that every algorithm and worker count is measured."""
+        results = SCENARIOS["hashing"](files=6, file_size=4096, seek_ms=0)
+        
+        labels = [row["label"] for row in results]
+        self.assertEqual(labels[0], "md5 4KiB reads")
+        self.assertIn("blake2b x4", labels)
+        self.assertTrue(all(row["bytes"] == 6 * 4096 for row in results))
+        self.assertIn("MB/s", format_results("hashing", results))
+        
+    def test_unknown_scenario(self):
+        """Test that unknown scenario names are rejected."""
+        with redirect_stdout(io.StringIO()), self.assertRaises(SystemExit):
+            benchmark_main(["no-such-scenario"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Duplicate Sweep Tests
+===================================
+
+Unit tests for finding and resolving identical files in the target tree.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import io
+import csv
+import shutil
+from contextlib import redirect_stdout
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from dedupe import DuplicateFinder, resolve_duplicates, main as dedupe_main
+
+
+class TestDuplicateSweep(unittest.TestCase):
+    """Test cases for the staged duplicate search."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(os.path.join(self.target_dir, "Documents"))
+        os.makedirs(os.path.join(self.target_dir, "Images"))
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+        
+    def write(self, relative, content):
+        path = os.path.join(self.target_dir, relative)
+        with open(path, 'wb') as f:
+            f.write(content)
+        return path
+        
+    def test_finds_identical_copies_and_keeps_original(self):
+        """Test that identical files are grouped with the original name kept."""
+        self.write("Documents/report(1).pdf", b"same content")
+        self.write("Documents/report.pdf", b"same content")
+        self.write("Images/report(2).pdf", b"same content")
+        self.write("Documents/other.pdf", b"diff content")
+        self.write("Documents/.hidden", b"same content")
+        
+        groups = DuplicateFinder(workers=2).find(self.target_dir)
+        
+        self.assertEqual(len(groups), 1)
+        self.assertEqual(groups[0].keeper.name, "report.pdf")
+        self.assertEqual(sorted(path.name for path in groups[0].duplicates), ["report(1).pdf", "report(2).pdf"])
+        self.assertEqual(groups[0].wasted_bytes, 2 * len(b"same content"))
+        
+    def test_reads_only_distinguishing_bytes(self):
+        """Test that files differing at the ends are never hashed in full."""
+        body = os.urandom(64 * 1024)
+        self.write("Documents/a.bin", b"A" + body + b"A")
+        self.write("Documents/b.bin", b"B" + body + b"B")
+        self.write("Documents/unique.bin", b"C" * 10)
+        self.write("Documents/c.bin", b"C" + body + b"C")
+        self.write("Documents/d.bin", b"C" + body + b"C")
+        
+        finder = DuplicateFinder(partial_bytes=1024)
+        with mock.patch.object(finder, "_full_digest", wraps=finder._full_digest) as full_digest:
+            groups = finder.find(self.target_dir)
+            
+        self.assertEqual([sorted(path.name for path in group.paths) for group in groups], [["c.bin", "d.bin"]])
+        self.assertEqual(full_digest.call_count, 2)
+        self.assertEqual(finder.stats, {"size_candidates": 4, "partial_candidates": 2, "full_candidates": 2})
+        
+    def test_middle_difference_needs_full_hash(self):
+        """Test that files matching at both ends but not in the middle are kept apart."""
+        self.write("Documents/a.bin", b"x" * 5000 + b"1" + b"x" * 5000)
+        self.write("Documents/b.bin", b"x" * 5000 + b"2" + b"x" * 5000)
+        
+        self.assertEqual(DuplicateFinder(partial_bytes=1024).find(self.target_dir), [])
+        
+    def test_hardlink_and_delete(self):
+        """Test that copies are replaced by hardlinks or deleted, and skipped if changed."""
+        keeper = self.write("Documents/photo.jpg", b"pixels")
+        linked = self.write("Documents/photo(1).jpg", b"pixels")
+        changed = self.write("Images/photo(2).jpg", b"pixels")
+        groups = DuplicateFinder().find(self.target_dir)
+        
+        stamp = os.stat(changed).st_mtime_ns + 10 ** 9
+        os.utime(changed, ns=(stamp, stamp))
+        operations = resolve_duplicates(groups, "hardlink")
+        
+        statuses = {os.path.basename(row['source']): row['status'] for row in operations}
+        self.assertEqual(statuses["photo(1).jpg"], "Success")
+        self.assertTrue(statuses["photo(2).jpg"].startswith("Failed"))
+        self.assertTrue(os.path.samefile(keeper, linked))
+        self.assertFalse(os.path.samefile(keeper, changed))
+        
+        # Already-linked names are one file and are not reported again
+        self.assertEqual(DuplicateFinder().find(self.target_dir)[0].duplicates, [groups[0].paths[2]])
+        operations = resolve_duplicates(DuplicateFinder().find(self.target_dir), "delete")
+        self.assertEqual([row['status'] for row in operations], ["Success"])
+        self.assertFalse(os.path.exists(changed))
+        self.assertTrue(os.path.exists(linked))
+        
+    def test_directory_entries_without_inodes(self):
+        """Test that zero st_ino/st_nlink from DirEntry.stat() (as on Windows) hide no files."""
+        self.write("Documents/a.txt", b"same")
+        self.write("Documents/b.txt", b"same")
+        real_scandir = os.scandir
+        
+        class WindowsEntry:
+            def __init__(self, entry):
+                self.entry = entry
+                self.name, self.path = entry.name, entry.path
+            def is_dir(self, **kwargs):
+                return self.entry.is_dir(**kwargs)
+            def is_file(self, **kwargs):
+                return self.entry.is_file(**kwargs)
+            def stat(self, **kwargs):
+                st = self.entry.stat(**kwargs)
+                return os.stat_result((st.st_mode, 0, 0, 0) + tuple(st)[4:])
+                
+        class WindowsScandir:
+            def __init__(self, path):
+                self.iterator = real_scandir(path)
+            def __enter__(self):
+                return (WindowsEntry(entry) for entry in self.iterator)
+            def __exit__(self, *exc):
+                self.iterator.close()
+                
+        with mock.patch("dedupe.os.scandir", WindowsScandir):
+            groups = DuplicateFinder().find(self.target_dir)
+        self.assertEqual([len(group.paths) for group in groups], [2])
+        
+    def test_command_logs_actions(self):
+        """Test that the dedupe command reports groups and logs every action."""
+        self.write("Documents/a.txt", b"text")
+        self.write("Documents/a(1).txt", b"text")
+        logs_dir = os.path.join(self.temp_dir, "logs")
+        
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(dedupe_main([self.target_dir, "--logs-dir", logs_dir]), 0)
+            self.assertFalse(os.path.exists(logs_dir))
+            self.assertEqual(dedupe_main([self.target_dir, "--delete", "--logs-dir", logs_dir]), 0)
+            
+        self.assertIn("Found 1 duplicate groups", output.getvalue())
+        self.assertFalse(os.path.exists(os.path.join(self.target_dir, "Documents", "a(1).txt")))
+        [log_file] = os.listdir(logs_dir)
+        self.assertTrue(log_file.startswith("dedupe_"))
+        with open(os.path.join(logs_dir, log_file), newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual([(row['category'], row['status']) for row in rows], [("delete", "Success")])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Learned Classifier Tests
+======================================
+
+Unit tests for the filename model trained on organized folders and logs.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import io
+import csv
+import shutil
+from pathlib import Path
+from contextlib import redirect_stdout
+from unittest import mock
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import learned
+from learned import NameModel, collect_samples, name_features, main as learn_main
+from smartfilesort import FileOrganizer
+
+
+def training_samples():
+    samples = [(f"scan_invoice_{i:04d}.q1", "Documents") for i in range(40)]
+    samples += [(f"clip_trip_{i:04d}.q2", "Videos") for i in range(40)]
+    return samples
+
+
+class TestNameModel(unittest.TestCase):
+    """Test cases for training and scoring the model."""
+    
+    def test_features_are_bounded_buckets(self):
+        """Test that features hash into the fixed dimension."""
+        features = name_features("Scan_Invoice_2024.PDF")
+        self.assertTrue(features)
+        self.assertTrue(all(0 <= bucket < learned.DIMENSIONS for bucket in features))
+        self.assertEqual(features, name_features("scan_invoice_2024.pdf"))
+        
+    def test_predicts_trained_categories(self):
+        """Test that similar names get the category they were trained with."""
+        model = NameModel.train(training_samples())
+        predictions = model.predict(["scan_invoice_9999.q1", "clip_trip_9999.q2"])
+        
+        self.assertEqual([label for label, _ in predictions], ["Documents", "Videos"])
+        for _, confidence in predictions:
+            self.assertGreater(confidence, 0.9)
+            self.assertLessEqual(confidence, 1.0)
+    
+    def test_save_and_load_round_trip(self):
+        """Test that a reloaded model makes the same predictions."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        path = os.path.join(temp_dir, "model.json")
+        
+        model = NameModel.train(training_samples())
+        model.save(path)
+        loaded = NameModel.load(path)
+        
+        names = ["scan_invoice_1.q1", "clip_trip_2.q2", "unrelated"]
+        self.assertEqual(loaded.predict(names), model.predict(names))
+        self.assertIsNone(NameModel.load(os.path.join(temp_dir, "missing.json")))
+        
+    @unittest.skipIf(learned.np is None, "NumPy is not installed")
+    def test_vectorized_matches_pure_python(self):
+        """Test that the NumPy path agrees with the plain Python path."""
+        model = NameModel.train(training_samples())
+        names = ["scan_invoice_77.q1", "clip_trip_77.q2", "something_else.bin"]
+        
+        vectorized = model.predict(names)
+        plain = [model._predict_one(name) for name in names]
+        for (label, confidence), (plain_label, plain_confidence) in zip(vectorized, plain):
+            self.assertEqual(label, plain_label)
+            self.assertAlmostEqual(confidence, plain_confidence, places=3)
+    
+    def test_vectorized_scoring_is_chunked(self):
+        """Test that large batches are scored in bounded chunks with the same results."""
+        model = NameModel.train(training_samples())
+        names = [f"scan_invoice_{i}.q1" for i in range(5)] + ["clip_trip_1.q2", "other.bin"]
+        expected = model.predict(names)
+        
+        chunks = []
+        score = model._predict_vectorized if model._log_likelihood is not None else None
+        
+        def vectorized(batch):
+            chunks.append(len(batch))
+            return score(batch) if score else [model._predict_one(name) for name in batch]
+            
+        if model._log_likelihood is None:  # Without NumPy, pretend the table exists
+            model._log_likelihood = object()
+        with mock.patch.object(learned, "PREDICT_CHUNK", 3), mock.patch.object(model, "_predict_vectorized", vectorized):
+            self.assertEqual(model.predict(names), expected)
+        self.assertEqual(chunks, [3, 3, 1])
+    
+    def test_default_model_path_follows_cache_directory(self):
+        """Test that the model lives in the configured cache directory."""
+        settings = {"performance": {"cache_directory": os.path.join("somewhere", "cache")}}
+        self.assertEqual(learned.default_model_path(settings), Path("somewhere", "cache", "learned_model.json"))
+        self.assertEqual(learned.default_model_path().name, "learned_model.json")
+    
+    def test_pure_python_fallback(self):
+        """Test that the model works without NumPy."""
+        with mock.patch.object(learned, "np", None):
+            model = NameModel.train(training_samples())
+            self.assertIsNone(model._log_likelihood)
+            self.assertEqual(model.predict(["scan_invoice_5.q1"])[0][0], "Documents")
+
+
+class TestLearnedStage(unittest.TestCase):
+    """Test cases for the learned fallback in the organizer and the learn command."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        self.logs_dir = os.path.join(self.temp_dir, "logs")
+        self.model_path = os.path.join(self.temp_dir, "model.json")
+        for folder in (self.source_dir, self.logs_dir):
+            os.makedirs(folder)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+        
+    def write(self, folder, name):
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, name), 'w') as f:
+            f.write("data")
+    
+    def settings(self, mode="sequential", min_confidence=0.8):
+        return {
+            "learning": {"enabled": True, "model_path": self.model_path, "min_confidence": min_confidence},
+            "performance": {"execution_mode": mode, "cache_directory": os.path.join(self.temp_dir, "cache")},
+        }
+        
+    def test_collect_samples_from_folders_and_logs(self):
+        """Test that samples come from category folders and successful log rows."""
+        self.write(os.path.join(self.target_dir, "Documents", "2024", "03"), "a.q1")
+        self.write(os.path.join(self.target_dir, "Others"), "b.q1")
+        with open(os.path.join(self.logs_dir, "operations_20240101_000000.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['timestamp', 'source', 'target', 'category', 'status'])
+            writer.writeheader()
+            writer.writerow({'source': '/in/c.q2', 'category': 'Videos', 'status': 'Success'})
+            writer.writerow({'source': '/in/d.q2', 'category': 'Videos', 'status': 'Failed: busy'})
+            
+        samples = collect_samples([self.target_dir], self.logs_dir)
+        
+        self.assertEqual(sorted(samples), [("a.q1", "Documents"), ("c.q2", "Videos")])
+        
+    def test_learn_command_and_fallback_stage(self):
+        """Test that a trained model files unmatched names in every scan mode."""
+        for name, category in training_samples():
+            self.write(os.path.join(self.target_dir, category), name)
+        with redirect_stdout(io.StringIO()) as output:
+            code = learn_main([self.target_dir, "--no-logs", "--model", self.model_path])
+        self.assertEqual(code, 0)
+        self.assertIn("Held-out accuracy: 100.0%", output.getvalue())
+        
+        for mode in ("sequential", "lanes", "async", "processes"):
+            with self.subTest(mode=mode):
+                self.write(self.source_dir, "scan_invoice_8888.q1")
+                self.write(self.source_dir, "mystery.zz9")
+                
+                organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings(mode))
+                organizer.organize_files(dry_run=False, save_log=False)
+                
+                self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Documents", "scan_invoice_8888.q1")))
+                os.remove(os.path.join(self.target_dir, "Documents", "scan_invoice_8888.q1"))
+                self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Others", "mystery.zz9")))
+                os.remove(os.path.join(self.target_dir, "Others", "mystery.zz9"))
+    
+    def test_learn_command_with_few_or_no_files(self):
+        """Test that a single labeled file trains without a hold-out and a missing target is reported."""
+        self.write(os.path.join(self.target_dir, "Documents"), "only.q1")
+        with redirect_stdout(io.StringIO()) as output:
+            code = learn_main([self.target_dir, "--no-logs", "--model", self.model_path])
+        self.assertEqual(code, 0)
+        self.assertNotIn("Held-out", output.getvalue())
+        self.assertTrue(os.path.exists(self.model_path))
+        
+        with redirect_stdout(io.StringIO()) as output:
+            code = learn_main([os.path.join(self.temp_dir, "missing"), "--no-logs", "--model", self.model_path])
+        self.assertEqual(code, 2)
+        self.assertIn("Not a directory", output.getvalue())
+        
+    def test_low_confidence_stays_in_others(self):
+        """Test that predictions below the threshold are not used."""
+        NameModel.train(training_samples()).save(self.model_path)
+        self.write(self.source_dir, "scan_invoice_8888.q1")
+        
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings(min_confidence=1.01))
+        organizer.organize_files(dry_run=False, save_log=False)
+        
+        self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Others", "scan_invoice_8888.q1")))
+        
+    def test_missing_model_is_ignored(self):
+        """Test that enabling learning without a model leaves rules unchanged."""
+        self.write(self.source_dir, "report.pdf")
+        
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings())
+        self.assertIsNone(organizer.name_model)
+        organizer.organize_files(dry_run=False, save_log=False)
+        
+        self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Documents", "report.pdf")))
+
+
+if __name__ == "__main__":
+    unittest.main()
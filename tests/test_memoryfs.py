@@ -0,0 +1,327 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort In-Memory Filesystem Tests
+========================================
+
+Unit tests for the filesystem backend abstraction, run entirely in memory
+with injected latency and faults.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import errno
+import shutil
+import hashlib
+import time
+from pathlib import Path
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smartfilesort import FileOrganizer, SyncBatcher
+from memoryfs import MemoryFileSystem
+
+
+class TestMemoryFileSystem(unittest.TestCase):
+    """Test cases for organizing files on the in-memory backend."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.cache_dir = tempfile.mkdtemp()
+        self.settings = {
+            "behavior": {"retry_attempts": 4, "retry_base_delay_seconds": 0.001, "retry_max_delay_seconds": 0.01},
+            "performance": {"cache_directory": self.cache_dir},
+        }
+        self.fs = MemoryFileSystem()
+        for name in ("report.pdf", "photo.jpg", "song.mp3", "unknown.xyz"):
+            self.fs.add_file(f"/inbox/{name}", name.encode() * 100)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.cache_dir)
+        
+    def organize(self, **performance):
+        self.settings["performance"].update(performance)
+        organizer = FileOrganizer("/inbox", "/sorted", settings=self.settings, filesystem=self.fs)
+        return organizer, organizer.organize_files(dry_run=False, save_log=False)
+        
+    def test_organize_in_memory(self):
+        """Test a full run without touching the disk."""
+        _, result = self.organize()
+        
+        self.assertEqual(result, (4, 0))
+        self.assertEqual(self.fs.listdir("/inbox"), [])
+        self.assertEqual(self.fs.listdir("/sorted"), ["Audio", "Documents", "Images", "Others"])
+        self.assertEqual(self.fs.read_file("/sorted/Documents/report.pdf"), b"report.pdf" * 100)
+        self.assertFalse(os.path.exists("/sorted"))
+        
+    def test_cross_device_copy(self):
+        """Test that a target on another device is copied and the source removed."""
+        self.fs.mount("/sorted", 2)
+        _, result = self.organize()
+        
+        self.assertEqual(result, (4, 0))
+        self.assertEqual(self.fs.read_file("/sorted/Images/photo.jpg"), b"photo.jpg" * 100)
+        self.assertEqual(self.fs.listdir("/inbox"), [])
+        
+    def test_copy_digest_logged(self):
+        """Test that cross-device copies record the digest computed while streaming."""
+        self.fs.mount("/sorted", 2)
+        organizer, result = self.organize()
+        
+        self.assertEqual(result, (4, 0))
+        digests = {os.path.basename(row["source"]): row["digest"] for row in organizer.moved_files}
+        self.assertEqual(digests["report.pdf"], hashlib.blake2b(b"report.pdf" * 100).hexdigest())
+        
+        self.fs.add_file("/inbox/notes.txt", b"same device")
+        self.fs.mount("/sorted", 0)
+        organizer, _ = self.organize()
+        self.assertEqual(organizer.moved_files[0]["digest"], "")
+        
+    def test_invalid_copy_settings_rejected(self):
+        """Test that a misspelled copy digest or verification mode fails at startup."""
+        for key, value in (("copy_digest", "blake2"), ("verify_copies", "readbak")):
+            with self.subTest(key=key):
+                settings = dict(self.settings, behavior={key: value})
+                with self.assertRaises(ValueError):
+                    FileOrganizer("/inbox", "/sorted", settings=settings, filesystem=self.fs)
+        
+    def test_readback_mismatch_keeps_source(self):
+        """Test that a copy failing read-back verification is removed and the source kept."""
+        self.fs.mount("/sorted", 2)
+        # Simulates the disk returning other bytes than were written
+        self.fs.drop_cache = lambda path: self.fs.add_file(path, b"corrupted")
+        self.settings["behavior"]["verify_copies"] = "readback"
+        organizer, result = self.organize()
+        
+        self.assertEqual(result, (0, 4))
+        self.assertIn("checksum", organizer.failed_files[0]["status"])
+        self.assertEqual(len(self.fs.listdir("/inbox")), 4)
+        self.assertEqual(self.fs.listdir("/sorted/Documents"), [])
+        
+        del self.fs.drop_cache
+        _, result = self.organize()
+        self.assertEqual(result, (4, 0))
+        
+    def test_source_changed_during_copy(self):
+        """Test that a source modified mid-copy is not deleted."""
+        self.fs.mount("/sorted", 2)
+        copystat = self.fs.copystat
+        
+        def copystat_after_change(source, target):
+            if os.path.basename(source) == "report.pdf":
+                self.fs.add_file(source, b"edited while copying")
+            copystat(source, target)
+            
+        self.fs.copystat = copystat_after_change
+        organizer, result = self.organize()
+        
+        self.assertEqual(result, (3, 1))
+        self.assertIn("changed while it was copied", organizer.failed_files[0]["status"])
+        self.assertEqual(self.fs.read_file("/inbox/report.pdf"), b"edited while copying")
+        
+    def test_strict_durability(self):
+        """Test that strict mode fsyncs each copy and its folder before deleting the source."""
+        self.fs.mount("/sorted", 2)
+        self.settings["behavior"]["durability"] = "strict"
+        _, result = self.organize()
+        
+        self.assertEqual(result, (4, 0))
+        self.assertEqual(self.fs.counts["fsync"], 8)
+        self.assertEqual(self.fs.listdir("/inbox"), [])
+        
+    def test_batched_durability_defers_source_deletion(self):
+        """Test that copied sources are removed only once their batch is synced."""
+        self.fs.mount("/sorted", 2)
+        for name in ("a.txt", "b.txt", "c.txt"):
+            self.fs.add_file(f"/sorted/{name}", b"copy")
+        deleted = []
+        batcher = SyncBatcher(self.fs, "batched", batch_files=2)
+        
+        batcher.after_copy("/inbox/report.pdf", "/sorted/a.txt", 4, lambda: deleted.append("a"))
+        self.assertEqual((deleted, self.fs.counts["fsync"]), ([], 0))
+        batcher.after_copy("/inbox/photo.jpg", "/sorted/b.txt", 4, lambda: deleted.append("b"))
+        self.assertEqual((deleted, self.fs.counts["fsync"]), (["a", "b"], 1))
+        
+        # Without a filesystem-wide sync, files and folders are fsynced one by one
+        self.fs.sync_filesystem = None
+        batcher.after_copy("/inbox/song.mp3", "/sorted/c.txt", 4, lambda: deleted.append("c"))
+        batcher.flush()
+        self.assertEqual((deleted[-1], self.fs.counts["fsync"]), ("c", 3))
+        
+    def test_failed_fsync_keeps_source(self):
+        """Test that a copy that could not be fsynced does not cost the source and is not logged as moved."""
+        self.fs.mount("/sorted", 2)
+        self.fs.inject("fsync", "/sorted/Documents/report.pdf")
+        self.settings["behavior"]["durability"] = "strict"
+        organizer, result = self.organize()
+        
+        self.assertEqual(result, (3, 1))
+        self.assertEqual(organizer.failed_files[0]["source"], "/inbox/report.pdf")
+        self.assertEqual(self.fs.listdir("/inbox"), ["report.pdf"])
+        self.assertFalse(self.fs.exists("/sorted/Documents/report.pdf"))
+        
+    def test_moves_recorded_when_batch_commits(self):
+        """Test that deferred copies are recorded only once their source is deleted."""
+        self.fs.mount("/sorted", 2)
+        self.fs.inject("unlink", "/inbox/photo.jpg", PermissionError(errno.EACCES, "read-only"))
+        self.settings["behavior"].update(durability="batched", durability_batch_files=100)
+        organizer = FileOrganizer("/inbox", "/sorted", settings=self.settings, filesystem=self.fs)
+        
+        for name in ("report.pdf", "photo.jpg"):
+            organizer._move_file(Path(f"/inbox/{name}"), "Documents")
+        self.assertEqual((organizer.moved_files, organizer.failed_files), ([], []))
+        
+        organizer.durability.flush()
+        self.assertEqual([op["source"] for op in organizer.moved_files], ["/inbox/report.pdf"])
+        self.assertEqual([op["source"] for op in organizer.failed_files], ["/inbox/photo.jpg"])
+        self.assertNotIn("report.pdf", self.fs.listdir("/inbox"))
+        self.assertIn("photo.jpg", self.fs.listdir("/inbox"))
+        self.assertEqual(self.fs.listdir("/sorted/Documents"), ["report.pdf"])
+        
+    def test_locked_file_retried(self):
+        """Test that a file locked for two attempts is moved on the third."""
+        self.fs.inject("rename", "*/report.pdf", PermissionError(errno.EACCES, "locked"), times=2)
+        organizer, result = self.organize()
+        
+        self.assertEqual(result, (4, 0))
+        attempts = {row["source"]: row["attempts"] for row in organizer.moved_files}
+        self.assertEqual(attempts[os.path.normpath("/inbox/report.pdf")], 3)
+        
+    def test_full_disk_leaves_no_partial_copy(self):
+        """Test that a write failure keeps the source and removes the partial target."""
+        self.fs.mount("/sorted", 2)
+        self.fs.inject("write", "/sorted/Documents/*", OSError(errno.ENOSPC, "No space left on device"))
+        _, result = self.organize()
+        
+        self.assertEqual(result, (3, 1))
+        self.assertEqual(self.fs.listdir("/inbox"), ["report.pdf"])
+        self.assertEqual(self.fs.listdir("/sorted/Documents"), [])
+        
+    def test_latency_overlaps_only_with_concurrency(self):
+        """Test that a slow share serializes sequential runs but not the lanes mode."""
+        for i in range(16):
+            self.fs.add_file(f"/inbox/file_{i}.txt", b"x")
+        self.fs.latency = {"rename": 0.01, "exists": 0.002}
+        
+        self.organize(execution_mode="sequential")
+        self.assertEqual(self.fs.peak_in_flight, 1)
+        
+        for i in range(16):
+            self.fs.add_file(f"/inbox/again_{i}.txt", b"x")
+        self.fs.peak_in_flight = 0
+        self.organize(execution_mode="lanes", small_lane_workers=8)
+        self.assertGreater(self.fs.peak_in_flight, 1)
+        
+    def test_throughput_cap(self):
+        """Test that reads and writes are throttled to the configured rate."""
+        slept = []
+        fs = MemoryFileSystem(bytes_per_second=1000, sleep=slept.append, clock=lambda: sum(slept))
+        fs.add_file("/data/blob.bin", b"\0" * 5000)
+        
+        with fs.open("/data/blob.bin", 'rb') as f:
+            self.assertEqual(len(f.read()), 5000)
+            
+        self.assertEqual(sum(slept), 5.0)
+        
+    def test_throughput_cap_shared_per_device(self):
+        """Test that concurrent transfers on one device share its bandwidth."""
+        slept = []
+        # The clock stands still: every read starts at the same moment
+        fs = MemoryFileSystem(bytes_per_second=1000, sleep=slept.append, clock=lambda: 0.0)
+        fs.mount("/other", 2)
+        for path in ("/data/a.bin", "/data/b.bin", "/data/c.bin", "/other/d.bin"):
+            fs.add_file(path, b"\0" * 1000)
+            
+        for path in ("/data/a.bin", "/data/b.bin", "/data/c.bin", "/other/d.bin"):
+            with fs.open(path, 'rb') as f:
+                f.read()
+                
+        self.assertEqual(slept, [1.0, 2.0, 3.0, 1.0])
+        
+    def test_seeks_follow_locality_order(self):
+        """Test that on-disk order turns per-file seeks into one sweep."""
+        fs = MemoryFileSystem(seek_seconds=0.5, sleep=lambda seconds: None)
+        fs.mount("/sorted", 2)
+        for name in ("c.txt", "a.txt", "d.txt", "b.txt"):
+            fs.add_file(f"/inbox/{name}", b"data")
+        self.assertIsNone(fs.physical_offset("/inbox/missing.txt"))
+        self.assertLess(fs.physical_offset("/inbox/c.txt"), fs.physical_offset("/inbox/a.txt"))
+        
+        self.fs = fs
+        self.organize(locality_order="extent")
+        self.assertEqual(fs.counts["seek"], 1)
+        
+        for name in ("c.txt", "a.txt", "d.txt", "b.txt"):
+            fs.add_file(f"/inbox/again_{name}", b"data")
+        fs.counts.clear()
+        self.organize(locality_order="none")
+        self.assertEqual(fs.counts["seek"], 4)
+    
+    def test_layout_follows_write_order(self):
+        """Test that data is placed when written, not by inode number."""
+        fs = MemoryFileSystem()
+        fs.add_file("/inbox/first.txt")
+        fs.add_file("/inbox/second.txt", b"data")
+        with fs.open("/inbox/first.txt", 'wb') as f:
+            f.write(b"data")
+            
+        self.assertLess(fs.stat("/inbox/first.txt").st_ino, fs.stat("/inbox/second.txt").st_ino)
+        self.assertLess(fs.physical_offset("/inbox/second.txt"), fs.physical_offset("/inbox/first.txt"))
+    
+    def test_coordination_in_memory(self):
+        """Test that claims, reservations and leases live on the backend."""
+        self.settings["coordination"] = {"enabled": True}
+        organizer, result = self.organize()
+        
+        self.assertEqual(result, (4, 0))
+        self.assertEqual(self.fs.listdir("/inbox"), [".smartfilesort-claims"])
+        self.assertEqual(self.fs.listdir("/inbox/.smartfilesort-claims"), [])
+        self.assertEqual(self.fs.read_file("/sorted/Audio/song.mp3"), b"song.mp3" * 100)
+        self.assertGreater(self.fs.counts["rmdir"], 0)
+    
+    def test_unsynced_copy_removed_after_crash(self):
+        """Test that a node dying before its durability batch commits leaves no stray copy."""
+        from smartfilesort import WorkCoordinator
+        
+        self.fs.mount("/sorted", 2)
+        self.settings["coordination"] = {"enabled": True}
+        self.settings["behavior"]["durability"] = "batched"
+        crashed = FileOrganizer("/inbox", "/sorted", settings=self.settings, filesystem=self.fs)
+        crashed.coordinator.start()
+        self.addCleanup(crashed.coordinator._stop_renewal.set)
+        
+        self.assertTrue(crashed._move_file(Path("/inbox/report.pdf"), "Documents"))
+        self.assertTrue(self.fs.exists("/sorted/Documents/report.pdf"))
+        
+        time.sleep(0.01)
+        recovering = WorkCoordinator(Path("/inbox"), {"coordination": {"lease_seconds": 0}}, node_id="b",
+                                     filesystem=self.fs)
+        recovering.start()
+        recovering.finish()
+        self.assertFalse(self.fs.exists("/sorted/Documents/report.pdf"))
+        self.assertIn("report.pdf", self.fs.listdir("/inbox"))
+        
+    def test_sharding_in_memory(self):
+        """Test that an oversized folder is sharded on the backend."""
+        from sharding import MARKER_FILE, ShardPolicy
+        
+        self.settings["sharding"] = {"enabled": True, "max_entries": 4, "method": "hash", "hash_width": 1}
+        for i in range(6):
+            self.fs.add_file(f"/sorted/Documents/old_{i}.pdf", b"old %d" % i)
+        organizer, result = self.organize()
+        
+        self.assertEqual(result, (4, 0))
+        policy = ShardPolicy(self.settings, filesystem=self.fs)
+        documents = self.fs.listdir("/sorted/Documents")
+        self.assertIn(MARKER_FILE, documents)
+        for name in ["report.pdf"] + [f"old_{i}.pdf" for i in range(6)]:
+            bucket = policy.bucket(Path(name))
+            self.assertIn(name, self.fs.listdir(f"/sorted/Documents/{bucket}"))
+        self.assertFalse(os.path.exists("/sorted"))
+
+
+if __name__ == "__main__":
+    unittest.main()
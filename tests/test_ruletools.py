@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Rule Tools Tests
+==============================
+
+Unit tests for the rule profiler and pattern linter.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import shutil
+import csv
+import io
+import json
+from contextlib import redirect_stdout
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smartfilesort import CompiledRules
+from ruletools import lint_pattern, profile_rules, load_corpus, BatchClassifier, simulate_rules, main as rules_main
+
+
+class TestPatternLint(unittest.TestCase):
+    """Test cases for the backtracking linter."""
+    
+    def test_nested_quantifier(self):
+        """Test that nested unbounded quantifiers are high risk."""
+        self.assertIn("high", [level for level, _ in lint_pattern(r"(a+)+\.pdf")])
+        
+    def test_adjacent_quantifiers(self):
+        """Test that overlapping adjacent quantifiers are flagged."""
+        self.assertIn("medium", [level for level, _ in lint_pattern(r"report.*.*\.pdf")])
+        self.assertNotIn("medium", [level for level, _ in lint_pattern(r"a*b*\.pdf")])
+        
+    def test_leading_wildcard(self):
+        """Test that a leading .* is reported as redundant."""
+        self.assertEqual([level for level, _ in lint_pattern(r".*_code\.py")], ["low"])
+        
+    def test_clean_and_invalid_patterns(self):
+        """Test that typical rules are clean and broken ones are reported."""
+        self.assertEqual(lint_pattern(r"invoice.*\.(pdf|doc|docx)"), [])
+        self.assertEqual(lint_pattern(r"invoice(")[0][0], "high")
+
+
+class TestRuleProfile(unittest.TestCase):
+    """Test cases for replaying names through the rules."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.rules = CompiledRules({
+            "Documents": {"extensions": [".pdf"], "patterns": [r"invoice.*\.(pdf|png)", r"unused\.pdf"]},
+            "Images": {"extensions": [".png", ".pdf"], "patterns": [r"scan.*\.pdf"]},
+        }, "test")
+        self.names = ["invoice_1.pdf", "invoice_2.png", "scan_3.pdf", "photo.png", "notes.xyz"]
+        
+    def test_hits_and_dead_rules(self):
+        """Test hit counts, dead and shadowed rules."""
+        profile = profile_rules(self.rules, self.names)
+        
+        self.assertEqual(profile.total_names, 5)
+        self.assertEqual(profile.category_hits, {"Documents": 3, "Images": 1, "Others": 1})
+        self.assertEqual(profile.pattern_hits[("Documents", r"invoice.*\.(pdf|png)")], 1)
+        self.assertIn(("Documents", r"unused\.pdf"), profile.dead_patterns())
+        self.assertIn(("Images", r"scan.*\.pdf"), profile.shadowed_patterns())
+        self.assertEqual(profile.shadowed_extensions(), [("Images", ".pdf", "Documents")])
+        
+    def test_profile_matches_classifier(self):
+        """Test that the profiler decides exactly like CompiledRules."""
+        profile = profile_rules(self.rules, self.names)
+        expected = {}
+        for name in self.names:
+            category = self.rules.classify(name)
+            expected[category] = expected.get(category, 0) + 1
+        self.assertEqual({k: v for k, v in profile.category_hits.items() if v}, expected)
+    
+    def test_invalid_patterns_reported(self):
+        """Test that patterns that do not compile are skipped and reported by the profile command."""
+        rules = dict(self.rules.rules)
+        rules["Documents"] = dict(rules["Documents"], patterns=[r"invoice(", r"(?<=a+)b", r"invoice.*\.(pdf|png)"])
+        profile = profile_rules(CompiledRules(rules, "broken"), self.names)
+        
+        self.assertEqual(profile.category_hits["Documents"], 3)
+        self.assertEqual(profile.invalid, {("Documents", r"invoice("), ("Documents", r"(?<=a+)b")})
+        for key in profile.invalid:
+            self.assertEqual(profile.lint[key][0][0], "high")
+            self.assertNotIn(key, profile.dead_patterns())
+        
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        rules_path = os.path.join(temp_dir, "rules.json")
+        corpus = os.path.join(temp_dir, "names.txt")
+        settings = os.path.join(temp_dir, "settings.json")
+        with open(rules_path, 'w') as f:
+            json.dump(rules, f)
+        with open(corpus, 'w') as f:
+            f.write("\n".join(self.names))
+        with open(settings, 'w') as f:
+            json.dump({"performance": {"cache_directory": temp_dir}}, f)
+        
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(rules_main(["profile", "--config", rules_path, "--corpus", corpus,
+                                         "--settings", settings]), 1)
+        self.assertIn("[high] Documents: invoice( - invalid regex", output.getvalue())
+
+
+class TestCorpusLoading(unittest.TestCase):
+    """Test cases for collecting names to replay."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+        
+    def test_names_from_operation_logs(self):
+        """Test that names are read from operations_*.csv logs."""
+        with open(os.path.join(self.temp_dir, "operations_20250921_120000.csv"), 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=['timestamp', 'source', 'target', 'category', 'status'])
+            writer.writeheader()
+            writer.writerow({'source': 'C:\\Users\\me\\Downloads\\invoice.pdf', 'status': 'Success'})
+            
+        self.assertEqual(load_corpus(logs_dir=self.temp_dir), ["invoice.pdf"])
+
+
+class TestRuleSimulation(unittest.TestCase):
+    """Test cases for the rules what-if simulator."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.old = CompiledRules({
+            "Documents": {"extensions": [".pdf", ".txt"], "patterns": [r"invoice.*\.(pdf|png)"]},
+            "Images": {"extensions": [".png"], "patterns": []},
+        }, "old")
+        self.new = CompiledRules({
+            "Invoices": {"extensions": [], "patterns": [r"invoice", r"(\d)\1x"]},
+            "Documents": {"extensions": [".pdf"], "patterns": []},
+            "Images": {"extensions": [".png", ".txt"], "patterns": []},
+        }, "new")
+        self.names = ["invoice_1.pdf", "Invoice_1.PDF", "invoice_2.png", "notes.txt",
+                      "photo.png", "a_22x.bin", "other.bin"]
+    
+    def test_batch_classifier_matches_compiled_rules(self):
+        """Test that combined patterns decide exactly like CompiledRules."""
+        for rules in (self.old, self.new):
+            classifier = BatchClassifier(rules)
+            for name in self.names:
+                self.assertEqual(classifier.classify(name.lower()), rules.classify(name), name)
+    
+    def test_transition_matrix(self):
+        """Test that transitions are counted per occurrence with samples."""
+        simulation = simulate_rules(self.old, self.new, self.names, samples=1)
+        
+        self.assertEqual(simulation.total_names, 7)
+        self.assertEqual(simulation.unique_names, 6)
+        self.assertEqual(simulation.transitions[("Documents", "Invoices")], 3)
+        self.assertEqual(simulation.transitions[("Documents", "Images")], 1)
+        self.assertEqual(simulation.transitions[("Others", "Invoices")], 1)
+        self.assertEqual(simulation.transitions[("Images", "Images")], 1)
+        self.assertEqual(simulation.changed, 5)
+        self.assertEqual(simulation.samples[("Documents", "Invoices")], ["invoice_1.pdf"])
+        
+    def test_simulate_command_gate(self):
+        """Test that --max-changed turns the simulation into a gate."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        old_path = os.path.join(temp_dir, "rules.json")
+        new_path = os.path.join(temp_dir, "new_rules.json")
+        corpus = os.path.join(temp_dir, "names.txt")
+        with open(old_path, 'w') as f:
+            json.dump(self.old.rules, f)
+        with open(new_path, 'w') as f:
+            json.dump(self.new.rules, f)
+        with open(corpus, 'w') as f:
+            f.write("\n".join(self.names))
+        settings = os.path.join(temp_dir, "settings.json")
+        with open(settings, 'w') as f:
+            json.dump({"performance": {"cache_directory": os.path.join(temp_dir, "cache")}}, f)
+            
+        args = ["simulate", new_path, "--config", old_path, "--corpus", corpus, "--settings", settings]
+        with redirect_stdout(io.StringIO()) as output:
+            self.assertEqual(rules_main(args), 0)
+            self.assertEqual(rules_main(args + ["--max-changed", "50"]), 1)
+            self.assertEqual(rules_main(["simulate", old_path, "--config", old_path, "--corpus", corpus,
+                                         "--settings", settings, "--max-changed", "0"]), 0)
+            self.assertEqual(rules_main(["simulate", corpus, "--corpus", corpus, "--settings", settings]), 2)
+        self.assertIn("Documents -> Invoices: 3", output.getvalue())
+        self.assertIn("5 would change category", output.getvalue())
+        self.assertEqual(len(os.listdir(os.path.join(temp_dir, "cache"))), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
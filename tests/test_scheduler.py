@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Scheduler Tests
+=============================
+
+Unit tests for the in-process serve scheduler.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import shutil
+import io
+import json
+from contextlib import redirect_stdout
+from datetime import datetime
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smartfilesort import FileOrganizer
+from scheduler import ProcessLock, Scheduler, main as serve_main
+
+
+class FakeClock:
+    """Monotonic clock advanced only by sleeping."""
+    
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+        
+    def __call__(self):
+        return self.now
+        
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class TestScheduler(unittest.TestCase):
+    """Test cases for the serve scheduler."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(self.source_dir)
+        self.clock = FakeClock()
+        self.settings = {"scheduling": {"auto_run_interval_minutes": 10,
+                                        "quiet_hours_start": "22:00",
+                                        "quiet_hours_end": "08:00"}}
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+        
+    def make_scheduler(self, hour=12):
+        organizer = FileOrganizer(self.source_dir, self.target_dir,
+                                  settings={"performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}})
+        return Scheduler(organizer, self.settings, clock=self.clock, sleep=self.clock.sleep,
+                         now=lambda: datetime(2024, 1, 1, hour, 0))
+    
+    def test_runs_on_interval_with_warm_organizer(self):
+        """Test that runs happen every interval and reuse one organizer."""
+        scheduler = self.make_scheduler()
+        
+        for i in range(3):
+            with open(os.path.join(self.source_dir, f"report_{i}.pdf"), 'w') as f:
+                f.write("data")
+            scheduler.serve(max_iterations=1)
+            
+        self.assertEqual(scheduler.runs, 3)
+        self.assertEqual(len(os.listdir(os.path.join(self.target_dir, "Documents"))), 3)
+        # Each run only reports its own moves
+        self.assertEqual(len(scheduler.organizer.moved_files), 1)
+        
+        scheduler = self.make_scheduler()
+        scheduler.serve(max_iterations=3)
+        self.assertEqual(self.clock.sleeps[-2:], [600.0, 600.0])
+        
+    def test_missed_intervals_are_skipped(self):
+        """Test that a long run does not cause back-to-back catch-up runs."""
+        scheduler = self.make_scheduler()
+        scheduler.organizer.organize_files = lambda dry_run=False: self.clock.sleep(1500)
+        
+        scheduler.serve(max_iterations=2)
+        
+        self.assertEqual(scheduler.runs, 2)
+        self.assertEqual(self.clock.sleeps, [1500, 600.0, 1500])
+        
+    def test_quiet_hours_skip_runs(self):
+        """Test that no organization happens during quiet hours."""
+        with open(os.path.join(self.source_dir, "report.pdf"), 'w') as f:
+            f.write("data")
+            
+        scheduler = self.make_scheduler(hour=23)
+        scheduler.serve(max_iterations=2)
+        
+        self.assertEqual((scheduler.runs, scheduler.skipped), (0, 2))
+        self.assertTrue(os.path.exists(os.path.join(self.source_dir, "report.pdf")))
+        
+    def test_cancel_stops_serving(self):
+        """Test that cancelling the organizer's run ends the loop after that run."""
+        scheduler = self.make_scheduler()
+        organize = scheduler.organizer.organize_files
+        
+        def organize_then_stop(dry_run=False):
+            result = organize(dry_run=dry_run)
+            scheduler.organizer.control.cancel()
+            return result
+            
+        scheduler.organizer.organize_files = organize_then_stop
+        scheduler.serve(max_iterations=3)
+        self.assertEqual(scheduler.runs, 1)
+        
+    def test_lock_prevents_overlap(self):
+        """Test that a second scheduler cannot take the lock."""
+        lock_path = os.path.join(self.temp_dir, "serve.lock")
+        first = ProcessLock(lock_path)
+        second = ProcessLock(lock_path)
+        
+        self.assertTrue(first.acquire())
+        self.assertFalse(second.acquire())
+        
+        first.release()
+        self.assertTrue(second.acquire())
+        second.release()
+    
+    def test_lock_lives_in_cache_directory(self):
+        """Test that the serve lock is taken in the configured cache directory."""
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        settings_path = os.path.join(self.temp_dir, "settings.json")
+        with open(settings_path, 'w') as f:
+            json.dump({"performance": {"cache_directory": cache_dir}}, f)
+        held = ProcessLock(os.path.join(cache_dir, "serve.lock"))
+        self.assertTrue(held.acquire())
+        self.addCleanup(held.release)
+        
+        with redirect_stdout(io.StringIO()) as output:
+            code = serve_main([self.source_dir, self.target_dir, "--settings", settings_path])
+        self.assertEqual(code, 1)
+        self.assertIn(cache_dir, output.getvalue())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+SmartFileSort Sharding Tests
+============================
+
+Unit tests for fan-out sharding of oversized category folders.
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+import io
+import shutil
+import json
+from datetime import datetime
+from contextlib import redirect_stdout
+
+# Add the src directory to the path
+sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from smartfilesort import FileOrganizer
+from sharding import MARKER_FILE, ShardPolicy, main as reshard_main
+
+
+class TestSharding(unittest.TestCase):
+    """Test cases for sharded category folders."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        self.documents = os.path.join(self.target_dir, "Documents")
+        os.makedirs(self.source_dir)
+        os.makedirs(self.documents)
+        
+        self.settings = {"sharding": {"enabled": True, "max_entries": 8, "method": "hash", "hash_width": 1},
+                         "performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}}
+        
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir)
+        
+    def write(self, folder, name, content="data"):
+        with open(os.path.join(folder, name), 'w') as f:
+            f.write(content)
+    
+    def all_files(self, folder):
+        found = {}
+        for root, _, files in os.walk(folder):
+            for name in files:
+                if name != MARKER_FILE:
+                    found[name] = os.path.relpath(root, folder)
+        return found
+        
+    def test_small_folder_stays_flat(self):
+        """Test that folders below the threshold are not sharded."""
+        self.write(self.source_dir, "report.pdf")
+        
+        FileOrganizer(self.source_dir, self.target_dir, settings=self.settings).organize_files(dry_run=False)
+        
+        self.assertEqual(os.listdir(self.documents), ["report.pdf"])
+        
+    def test_oversized_folder_sharded_on_run(self):
+        """Test that a folder past the threshold is split and new files go to their buckets."""
+        for i in range(10):
+            self.write(self.documents, f"old_{i}.pdf")
+        for i in range(5):
+            self.write(self.source_dir, f"new_{i}.pdf")
+            
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        self.assertEqual(organizer.organize_files(dry_run=False), (5, 0))
+        
+        policy = ShardPolicy(self.settings)
+        files = self.all_files(self.documents)
+        self.assertEqual(len(files), 15)
+        for name, bucket in files.items():
+            self.assertEqual(bucket, policy.bucket(organizer.target_dir / name))
+        self.assertTrue(os.path.exists(os.path.join(self.documents, MARKER_FILE)))
+        
+    def test_duplicates_detected_within_bucket(self):
+        """Test that a repeated name lands in the same bucket and gets renamed."""
+        for i in range(10):
+            self.write(self.documents, f"old_{i}.pdf")
+        self.write(self.source_dir, "old_3.pdf", "different content")
+        
+        FileOrganizer(self.source_dir, self.target_dir, settings=self.settings).organize_files(dry_run=False)
+        
+        files = self.all_files(self.documents)
+        self.assertEqual(files["old_3.pdf"], files["old_3(1).pdf"])
+        
+    def test_dry_run_does_not_reshard(self):
+        """Test that a dry run leaves an oversized folder alone."""
+        for i in range(10):
+            self.write(self.documents, f"old_{i}.pdf")
+        self.write(self.source_dir, "new.pdf")
+        
+        FileOrganizer(self.source_dir, self.target_dir, settings=self.settings).organize_files(dry_run=True)
+        
+        self.assertEqual(len(os.listdir(self.documents)), 10)
+        
+    def test_reshard_command_changes_layout(self):
+        """Test migrating a hash-sharded folder to date placement in place."""
+        stamp = datetime(2024, 3, 10).timestamp()
+        for i in range(10):
+            self.write(self.documents, f"old_{i}.txt")
+            os.utime(os.path.join(self.documents, f"old_{i}.txt"), (stamp, stamp))
+            
+        settings_path = os.path.join(self.temp_dir, "settings.json")
+        with open(settings_path, 'w') as f:
+            f.write('{"sharding": {"max_entries": 8}}')
+            
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(reshard_main([self.target_dir, "--settings", settings_path]), 0)
+        for bucket in self.all_files(self.documents).values():
+            self.assertRegex(bucket, r"^[0-9a-f]{2}$")
+            
+        with redirect_stdout(io.StringIO()):
+            reshard_main([self.target_dir, "--settings", settings_path, "--method", "date"])
+            
+        self.assertEqual(set(self.all_files(self.documents).values()), {"2024-03"})
+        self.assertEqual(sorted(os.listdir(self.documents)), sorted(["2024-03", MARKER_FILE]))
+    
+    def test_reshard_command_only_touches_category_folders(self):
+        """Test that unsorted files in the target root and non-category folders stay put."""
+        projects = os.path.join(self.target_dir, "Projects")
+        dated = os.path.join(self.documents, "2024", "03")
+        for folder in (self.target_dir, projects, dated):
+            os.makedirs(folder, exist_ok=True)
+            for i in range(10):
+                self.write(folder, f"loose_{i}.pdf")
+                
+        settings_path = os.path.join(self.temp_dir, "settings.json")
+        with open(settings_path, 'w') as f:
+            json.dump({"sharding": {"max_entries": 8},
+                       "performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}}, f)
+            
+        with redirect_stdout(io.StringIO()):
+            self.assertEqual(reshard_main([self.target_dir, "--settings", settings_path]), 0)
+            
+        self.assertEqual(len([name for name in os.listdir(self.target_dir) if name.startswith("loose_")]), 10)
+        self.assertEqual(len(os.listdir(projects)), 10)
+        self.assertTrue(os.path.exists(os.path.join(dated, MARKER_FILE)))
+        self.assertFalse(any(name.startswith("loose_") for name in os.listdir(dated)))
+
+
+if __name__ == "__main__":
+    unittest.main()
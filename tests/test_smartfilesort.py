@@ -14,18 +14,28 @@ import tempfile
 import os
 import sys
 import shutil
+import subprocess
+import time
+import threading
 from pathlib import Path
+from datetime import datetime, timedelta
 import json
+from unittest import mock
 
 # Add the src directory to the path
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 try:
-    from smartfilesort import FileClassifier, FileOrganizer
+    from smartfilesort import (FileClassifier, FileOrganizer, FileFilter, ContentSniffer,
+                               ClassificationCache, get_shared_classifier, RetryQueue, is_transient_error)
 except ImportError:
     print("Warning: Could not import smartfilesort modules. Make sure to run tests from the project root.")
     FileClassifier = None
     FileOrganizer = None
+    FileFilter = None
+    ContentSniffer = None
+    ClassificationCache = None
+    RetryQueue = None
 
 
 class TestFileClassifier(unittest.TestCase):
@@ -141,6 +151,9 @@ class TestFileOrganizer(unittest.TestCase):
         os.makedirs(self.source_dir, exist_ok=True)
         os.makedirs(self.target_dir, exist_ok=True)
         
+        # Keep the run checkpoints out of the source tree
+        self.settings = {"performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}}
+        
         # Create test files
         self.test_files = [
             "document.pdf",
@@ -162,7 +175,7 @@ class TestFileOrganizer(unittest.TestCase):
     
     def test_dry_run_organization(self):
         """Test dry run mode."""
-        organizer = FileOrganizer(self.source_dir, self.target_dir)
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
         success_count, fail_count = organizer.organize_files(dry_run=True)
         
         # In dry run, files should still exist in source
@@ -178,7 +191,7 @@ class TestFileOrganizer(unittest.TestCase):
     
     def test_actual_organization(self):
         """Test actual file organization."""
-        organizer = FileOrganizer(self.source_dir, self.target_dir)
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
         success_count, fail_count = organizer.organize_files(dry_run=False)
         
         # Files should be moved from source
@@ -209,7 +222,7 @@ class TestFileOrganizer(unittest.TestCase):
             f.write("existing content")
         
         # Run organizer
-        organizer = FileOrganizer(self.source_dir, self.target_dir)
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
         success_count, fail_count = organizer.organize_files(dry_run=False)
         
         # Should have both original and renamed file
@@ -219,6 +232,692 @@ class TestFileOrganizer(unittest.TestCase):
         self.assertTrue(os.path.exists(renamed_file), "Renamed file should exist")
 
 
+class TestFileFilter(unittest.TestCase):
+    """Test cases for the settings-driven filter stage."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if FileFilter is None:
+            self.skipTest("FileFilter not available")
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.settings = {
+            "general": {"ignore_hidden_files": True, "minimum_file_size_bytes": 1},
+            "filters": {
+                "excluded_extensions": [".tmp", ".crdownload"],
+                "excluded_patterns": ["~*", "Thumbs.db"],
+                "included_extensions": [],
+                "min_file_age_minutes": 5
+            },
+            "performance": {"cache_directory": os.path.join(self.temp_dir, "cache")},
+        }
+        
+        for filename in ["report.pdf", "movie.mp4.crdownload", "data.TMP", "~lock.docx",
+                         "thumbs.db", ".hidden.txt", "empty.txt", "fresh.jpg"]:
+            with open(os.path.join(self.temp_dir, filename), 'w') as f:
+                f.write("" if filename == "empty.txt" else "content")
+        
+        # Everything except fresh.jpg is older than the age threshold
+        old = time.time() - 3600
+        for filename in os.listdir(self.temp_dir):
+            if filename != "fresh.jpg":
+                os.utime(os.path.join(self.temp_dir, filename), (old, old))
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def _accepted(self, file_filter):
+        with os.scandir(self.temp_dir) as entries:
+            return sorted(e.name for e in entries if file_filter.accepts(e))
+    
+    def test_filters_and_skip_counts(self):
+        """Test that each filter rejects its files and is counted."""
+        file_filter = FileFilter(self.settings)
+        
+        self.assertEqual(self._accepted(file_filter), ["report.pdf"])
+        self.assertEqual(file_filter.skip_counts["excluded_extension"], 2)
+        self.assertEqual(file_filter.skip_counts["excluded_pattern"], 2)
+        self.assertEqual(file_filter.skip_counts["hidden"], 1)
+        self.assertEqual(file_filter.skip_counts["too_small"], 1)
+        self.assertEqual(file_filter.skip_counts["too_recent"], 1)
+    
+    def test_included_extensions(self):
+        """Test that a non-empty include list restricts extensions."""
+        settings = {"filters": {"included_extensions": [".jpg"]}}
+        self.assertEqual(self._accepted(FileFilter(settings)), ["fresh.jpg"])
+    
+    def test_empty_settings_accept_everything(self):
+        """Test that no settings means no filtering."""
+        self.assertEqual(len(self._accepted(FileFilter())), 8)
+    
+    def test_organizer_leaves_filtered_files(self):
+        """Test that filtered files stay in the source directory."""
+        target_dir = os.path.join(self.temp_dir, "target")
+        organizer = FileOrganizer(self.temp_dir, target_dir, settings=self.settings)
+        success_count, fail_count = organizer.organize_files(dry_run=False)
+        
+        self.assertEqual((success_count, fail_count), (1, 0))
+        self.assertTrue(os.path.exists(os.path.join(target_dir, "Documents", "report.pdf")))
+        self.assertTrue(os.path.exists(os.path.join(self.temp_dir, "movie.mp4.crdownload")))
+        self.assertEqual(organizer.skip_counts["too_recent"], 1)
+
+
+class TestContentSniffer(unittest.TestCase):
+    """Test cases for magic-byte content sniffing."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if ContentSniffer is None:
+            self.skipTest("ContentSniffer not available")
+        
+        self.sniffer = ContentSniffer()
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def test_signatures(self):
+        """Test header signature matching."""
+        zip_member = b"PK\x03\x04" + b"\x00" * 26
+        test_cases = [
+            (b"%PDF-1.7\n", "Documents"),
+            (b"\x89PNG\r\n\x1a\n\x00", "Images"),
+            (b"\xff\xd8\xff\xe0\x00\x10JFIF", "Images"),
+            (b"\x00\x00\x00\x20ftypisom", "Videos"),
+            (b"\x00\x00\x00\x20ftypM4A ", "Audio"),
+            (zip_member + b"[Content_Types].xml", "Documents"),
+            (zip_member + b"mimetypeapplication/epub+zip", "Books"),
+            (zip_member + b"notes.txt", "Archives"),
+            (b"\x7fELF\x02\x01\x01", "Executables"),
+            (b"plain text", None),
+        ]
+        
+        for header, expected_category in test_cases:
+            with self.subTest(header=header):
+                self.assertEqual(self.sniffer.sniff_header(header), expected_category)
+    
+    def test_unknown_categories_ignored(self):
+        """Test that sniffed categories must exist in the rules."""
+        sniffer = ContentSniffer(categories=["Images"])
+        self.assertIsNone(sniffer.sniff_header(b"%PDF-1.7"))
+    
+    def test_sniff_is_cached(self):
+        """Test that results are cached by path, inode, size and mtime."""
+        file_path = os.path.join(self.temp_dir, "download")
+        with open(file_path, 'wb') as f:
+            f.write(b"%PDF-1.4\n" + b"0" * 4096)
+        
+        self.assertEqual(self.sniffer.sniff(file_path), "Documents")
+        self.assertEqual(len(self.sniffer.cache), 1)
+        self.assertEqual(self.sniffer.sniff(file_path), "Documents")
+        self.assertEqual(len(self.sniffer.cache), 1)
+        
+    def test_cache_without_inodes(self):
+        """Test that files with equal size and mtime stay apart when st_ino is 0 (Windows entries)."""
+        stats = []
+        for name, header in (("a", b"%PDF-1.4\n"), ("b", b"\x89PNG\r\n\x1a\n")):
+            path = os.path.join(self.temp_dir, name)
+            with open(path, 'wb') as f:
+                f.write(header.ljust(64, b"0"))
+            os.utime(path, ns=(10 ** 18, 10 ** 18))
+            st = os.stat(path)
+            stats.append((path, os.stat_result((st.st_mode, 0) + tuple(st)[2:])))
+        
+        self.assertEqual([self.sniffer.sniff(path, st) for path, st in stats], ["Documents", "Images"])
+    
+    def test_organizer_sniffs_extensionless_files(self):
+        """Test that the organizer sniffs files the name rules miss."""
+        source_dir = os.path.join(self.temp_dir, "source")
+        target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(source_dir)
+        with open(os.path.join(source_dir, "download"), 'wb') as f:
+            f.write(b"\x89PNG\r\n\x1a\n")
+        
+        settings = {"general": {"sniff_file_content": True},
+                    "performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}}
+        organizer = FileOrganizer(source_dir, target_dir, settings=settings)
+        organizer.organize_files(dry_run=False)
+        
+        self.assertTrue(os.path.exists(os.path.join(target_dir, "Images", "download")))
+
+
+class CountingReader:
+    """Binary file wrapper that counts the bytes read."""
+    
+    def __init__(self, f):
+        self.f = f
+        self.bytes_read = 0
+    
+    def seek(self, offset):
+        self.f.seek(offset)
+    
+    def read(self, count):
+        data = self.f.read(count)
+        self.bytes_read += len(data)
+        return data
+
+
+class TestDateExtractor(unittest.TestCase):
+    """Test cases for embedded-date extraction and date folders."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        try:
+            from smartfilesort import DateExtractor
+        except ImportError:
+            self.skipTest("DateExtractor not available")
+        
+        self.extractor = DateExtractor()
+        self.temp_dir = tempfile.mkdtemp()
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def write(self, name, data):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+    
+    def make_jpeg(self, date):
+        """Minimal JPEG whose EXIF IFD holds DateTimeOriginal."""
+        import struct
+        
+        ifd0 = struct.pack('<HHHII I', 1, 0x8769, 4, 1, 26, 0)
+        exif = struct.pack('<HHHII I', 1, 0x9003, 2, 20, 44, 0)
+        tiff = b'II*\x00' + struct.pack('<I', 8) + ifd0 + exif + date.encode() + b'\x00'
+        app1 = b'Exif\x00\x00' + tiff
+        app0 = b'JFIF\x00' + b'\x00' * 9
+        return (b'\xff\xd8' + b'\xff\xe0' + struct.pack('>H', len(app0) + 2) + app0
+                + b'\xff\xe1' + struct.pack('>H', len(app1) + 2) + app1 + b'\xff\xda' + os.urandom(200000))
+    
+    def make_mp4(self, unix_seconds, mdat_size):
+        """MP4 with a large mdat box before the moov box."""
+        import struct
+        
+        mvhd_payload = struct.pack('>I I I', 0, unix_seconds + 2082844800, 0) + b'\x00' * 88
+        mvhd = struct.pack('>I4s', 8 + len(mvhd_payload), b'mvhd') + mvhd_payload
+        moov = struct.pack('>I4s', 8 + len(mvhd), b'moov') + mvhd
+        ftyp = struct.pack('>I4s', 16, b'ftyp') + b'isom\x00\x00\x02\x00'
+        mdat = struct.pack('>I4s', 8 + mdat_size, b'mdat') + b'\x00' * mdat_size
+        return ftyp + mdat + moov
+    
+    def test_jpeg_exif_date(self):
+        """Test EXIF DateTimeOriginal with bounded reads."""
+        path = self.write("photo.jpg", self.make_jpeg("2021:07:04 10:30:00"))
+        with open(path, 'rb') as f:
+            reader = CountingReader(f)
+            date = self.extractor.embedded_date(reader, os.path.getsize(path))
+        
+        self.assertEqual(date, datetime(2021, 7, 4, 10, 30))
+        self.assertLess(reader.bytes_read, 1024)
+    
+    def test_malformed_jpeg_segment_length(self):
+        """Test that APP1 lengths below 2 end the search without reading the file."""
+        for length in (0, 1):
+            with self.subTest(length=length):
+                path = self.write("bad.jpg", b'\xff\xd8\xff\xe1' + bytes([0, length]) + os.urandom(1024 * 1024))
+                with open(path, 'rb') as f:
+                    reader = CountingReader(f)
+                    date = self.extractor.embedded_date(reader, os.path.getsize(path))
+                
+                self.assertIsNone(date)
+                self.assertLess(reader.bytes_read, 1024)
+    
+    def test_mp4_creation_time(self):
+        """Test the mvhd creation time is found by seeking past mdat."""
+        path = self.write("clip.mp4", self.make_mp4(1600000000, 4 * 1024 * 1024))
+        with open(path, 'rb') as f:
+            reader = CountingReader(f)
+            date = self.extractor.embedded_date(reader, os.path.getsize(path))
+        
+        self.assertEqual(date, datetime(2020, 9, 13, 12, 26, 40))
+        self.assertLess(reader.bytes_read, 1024)
+    
+    def test_pdf_creation_date(self):
+        """Test CreationDate in the trailer of a large PDF."""
+        data = b"%PDF-1.4\n" + b"0" * (1024 * 1024) + b"<< /CreationDate (D:20190315120000Z) >>\n%%EOF"
+        path = self.write("paper.pdf", data)
+        with open(path, 'rb') as f:
+            reader = CountingReader(f)
+            date = self.extractor.embedded_date(reader, len(data))
+        
+        self.assertEqual(date, datetime(2019, 3, 15))
+        self.assertLessEqual(reader.bytes_read, 2 * self.extractor.PDF_WINDOW + 16)
+    
+    def test_mtime_fallback_and_cache(self):
+        """Test files without an embedded date use mtime, and results are cached."""
+        path = self.write("notes.txt", b"plain text")
+        stamp = datetime(2018, 5, 20, 8, 0).timestamp()
+        os.utime(path, (stamp, stamp))
+        
+        self.assertEqual(self.extractor.folder(path), Path("2018", "05"))
+        with mock.patch("builtins.open", side_effect=AssertionError("file reopened")):
+            self.assertEqual(self.extractor.folder(path), Path("2018", "05"))
+    
+    def test_organizer_date_folders(self):
+        """Test that create_date_folders files under category/year/month."""
+        source_dir = os.path.join(self.temp_dir, "source")
+        target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(source_dir)
+        with open(os.path.join(source_dir, "photo.jpg"), 'wb') as f:
+            f.write(self.make_jpeg("2021:07:04 10:30:00"))
+        
+        organizer = FileOrganizer(source_dir, target_dir,
+                                  settings={"general": {"create_date_folders": True},
+                                            "performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}})
+        organizer.organize_files(dry_run=False)
+        
+        self.assertTrue(os.path.exists(os.path.join(target_dir, "Images", "2021", "07", "photo.jpg")))
+
+
+class TestClassificationCache(unittest.TestCase):
+    """Test cases for the persistent classification cache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if ClassificationCache is None:
+            self.skipTest("ClassificationCache not available")
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_path = os.path.join(self.temp_dir, "cache.json")
+        self.file_path = os.path.join(self.temp_dir, "photo.jpg")
+        with open(self.file_path, 'w') as f:
+            f.write("test content")
+        self.stat = os.stat(self.file_path)
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def test_persisted_between_runs(self):
+        """Test that saved results are loaded by the next run."""
+        cache = ClassificationCache(self.cache_path, "rules-a")
+        cache.put("photo.jpg", self.stat, "Images")
+        cache.save()
+        
+        cache = ClassificationCache(self.cache_path, "rules-a")
+        self.assertEqual(cache.get("photo.jpg", self.stat), "Images")
+    
+    def test_rules_change_invalidates(self):
+        """Test that a different rules fingerprint discards the cache."""
+        cache = ClassificationCache(self.cache_path, "rules-a")
+        cache.put("photo.jpg", self.stat, "Images")
+        cache.save()
+        
+        cache = ClassificationCache(self.cache_path, "rules-b")
+        self.assertIsNone(cache.get("photo.jpg", self.stat))
+    
+    def test_lru_eviction(self):
+        """Test that the least recently used entry is evicted."""
+        cache = ClassificationCache(self.cache_path, "rules-a", max_entries=2)
+        cache.put("a.jpg", self.stat, "Images")
+        cache.put("b.jpg", self.stat, "Images")
+        cache.get("a.jpg", self.stat)
+        cache.put("c.jpg", self.stat, "Images")
+        
+        self.assertIsNone(cache.get("b.jpg", self.stat))
+        self.assertEqual(cache.get("a.jpg", self.stat), "Images")
+    
+    def test_organizer_reuses_results(self):
+        """Test that a repeated run skips the classifier."""
+        cache_dir = os.path.join(self.temp_dir, "cache")
+        settings = {"performance": {"classification_cache_entries": 100, "cache_directory": cache_dir}}
+        FileOrganizer(self.temp_dir, self.temp_dir, settings=settings).organize_files(dry_run=True)
+        
+        organizer = FileOrganizer(self.temp_dir, self.temp_dir, settings=settings)
+        organizer.organize_files(dry_run=True)
+        
+        self.assertEqual((organizer.cache.hits, organizer.cache.misses), (1, 0))
+    
+    def test_rules_files_keep_separate_caches(self):
+        """Test that runs alternating between rules files both reuse their results."""
+        config_dir = os.path.join(self.temp_dir, "config")
+        os.makedirs(config_dir)
+        configs = []
+        for name, category in (("a.json", "Images"), ("b.json", "Pictures")):
+            configs.append(os.path.join(config_dir, name))
+            with open(configs[-1], 'w') as f:
+                json.dump({category: {"extensions": [".jpg"], "patterns": []}}, f)
+        settings = {"performance": {"classification_cache_entries": 100,
+                                    "cache_directory": os.path.join(self.temp_dir, "cache")}}
+        
+        for config in configs + configs:
+            organizer = FileOrganizer(self.temp_dir, self.temp_dir, config, settings)
+            organizer.organize_files(dry_run=True)
+        
+        self.assertEqual((organizer.cache.hits, organizer.cache.misses), (1, 0))
+        self.assertEqual(organizer.cache.get("photo.jpg", self.stat), "Pictures")
+
+
+class TestRetryQueue(unittest.TestCase):
+    """Test cases for deferred retries of locked files."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if RetryQueue is None:
+            self.skipTest("RetryQueue not available")
+        
+        self.now = 0.0
+        self.slept = []
+        self.queue = RetryQueue(1.0, 5.0, clock=lambda: self.now, sleep=self.slept.append)
+    
+    def test_backoff_order(self):
+        """Test exponential backoff and due-time ordering."""
+        self.queue.schedule("third", 3)  # due at 4
+        self.queue.schedule("first", 1)  # due at 1
+        self.queue.schedule("capped", 9)  # due at 5
+        
+        self.assertEqual(self.queue.pop(), ("first", 1))
+        self.assertEqual(self.queue.pop(), ("third", 3))
+        self.assertEqual(self.queue.pop(), ("capped", 9))
+        self.assertEqual(self.slept, [1.0, 4.0, 5.0])
+        self.assertEqual(len(self.queue), 0)
+    
+    def test_cancel_ends_backoff(self):
+        """Test that a run cancelled during a retry backoff stops without waiting it out."""
+        from memoryfs import MemoryFileSystem
+        
+        fs = MemoryFileSystem()
+        fs.add_file("/inbox/locked.pdf", b"content")
+        fs.inject("rename", "*/locked.pdf", PermissionError(13, "locked"), times=1)
+        cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, cache_dir)
+        settings = {"behavior": {"retry_attempts": 3, "retry_base_delay_seconds": 3600},
+                    "performance": {"cache_directory": cache_dir}}
+        organizer = FileOrganizer("/inbox", "/sorted", settings=settings, filesystem=fs)
+        
+        timer = threading.Timer(0.1, organizer.control.cancel)
+        timer.start()
+        started = time.monotonic()
+        organizer.organize_files(dry_run=False, save_log=False)
+        timer.join()
+        
+        self.assertLess(time.monotonic() - started, 10)
+        self.assertEqual(fs.listdir("/inbox"), ["locked.pdf"])
+        self.assertEqual(len(organizer.retry_queue), 0)
+    
+    def test_transient_errors(self):
+        """Test which errors are considered worth retrying."""
+        self.assertTrue(is_transient_error(PermissionError(13, "locked")))
+        self.assertTrue(is_transient_error(OSError(16, "busy")))
+        self.assertFalse(is_transient_error(FileNotFoundError(2, "gone")))
+        self.assertFalse(is_transient_error(ValueError("bad")))
+    
+    def test_locked_file_retried_in_run(self):
+        """Test that a locked file is moved by a later attempt in the same run."""
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        source_dir = os.path.join(temp_dir, "source")
+        target_dir = os.path.join(temp_dir, "target")
+        os.makedirs(source_dir)
+        with open(os.path.join(source_dir, "locked.pdf"), 'w') as f:
+            f.write("content")
+        
+        real_rename = os.rename
+        failures = [PermissionError(13, "locked"), PermissionError(13, "locked")]
+        
+        def flaky_rename(src, dst):
+            if failures:
+                raise failures.pop()
+            return real_rename(src, dst)
+        
+        settings = {"behavior": {"retry_attempts": 3, "retry_base_delay_seconds": 0},
+                    "performance": {"cache_directory": os.path.join(temp_dir, "cache")}}
+        organizer = FileOrganizer(source_dir, target_dir, settings=settings)
+        with mock.patch("os.rename", side_effect=flaky_rename):
+            success_count, fail_count = organizer.organize_files(dry_run=False)
+        
+        self.assertEqual((success_count, fail_count), (1, 0))
+        self.assertEqual(organizer.moved_files[0]['attempts'], 3)
+        self.assertTrue(os.path.exists(os.path.join(target_dir, "Documents", "locked.pdf")))
+
+
+class TestSizeLanes(unittest.TestCase):
+    """Test cases for size-aware scheduling and streaming copies."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if FileOrganizer is None:
+            self.skipTest("FileOrganizer not available")
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(self.source_dir)
+        
+        for i in range(10):
+            with open(os.path.join(self.source_dir, f"small_{i}.txt"), 'w') as f:
+                f.write("small")
+        with open(os.path.join(self.source_dir, "large.mp4"), 'wb') as f:
+            f.write(os.urandom(3 * 1024 * 1024))
+        
+        self.settings = {"performance": {"execution_mode": "lanes", "large_file_threshold_mb": 1,
+                                         "cache_directory": os.path.join(self.temp_dir, "cache")}}
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def test_lanes_move_everything(self):
+        """Test that both lanes complete their files."""
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        success_count, fail_count = organizer.organize_files(dry_run=False)
+        
+        self.assertEqual((success_count, fail_count), (11, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Videos", "large.mp4")))
+    
+    def test_split_by_size(self):
+        """Test that entries are split at the size threshold."""
+        from smartfilesort import LaneScheduler
+        
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        with os.scandir(self.source_dir) as entries:
+            small, large = LaneScheduler(organizer, self.settings["performance"]).split(list(entries))
+        
+        self.assertEqual((len(small), [e.name for e in large]), (10, ["large.mp4"]))
+    
+    def test_readback_verification(self):
+        """Test that a read-back verified copy logs the digest of the data."""
+        import hashlib
+        
+        settings = dict(self.settings, behavior={"verify_copies": "readback"})
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=settings)
+        with open(os.path.join(self.source_dir, "large.mp4"), 'rb') as f:
+            expected = hashlib.blake2b(f.read()).hexdigest()
+        
+        with mock.patch("os.rename", side_effect=OSError(18, "Invalid cross-device link")):
+            self.assertEqual(organizer.organize_files(dry_run=False), (11, 0))
+        
+        digests = {os.path.basename(row['source']): row['digest'] for row in organizer.moved_files}
+        self.assertEqual(digests["large.mp4"], expected)
+        self.assertFalse(os.path.exists(os.path.join(self.source_dir, "large.mp4")))
+    
+    def test_durable_cross_device_moves(self):
+        """Test that synced copies still remove their sources by the end of the run."""
+        for mode in ("batched", "strict"):
+            with self.subTest(mode=mode):
+                target_dir = os.path.join(self.temp_dir, mode)
+                settings = dict(self.settings, behavior={"durability": mode, "durability_batch_files": 4})
+                organizer = FileOrganizer(self.source_dir, target_dir, settings=settings)
+                
+                with mock.patch("os.rename", side_effect=OSError(18, "Invalid cross-device link")):
+                    self.assertEqual(organizer.organize_files(dry_run=False), (11, 0))
+                
+                self.assertEqual(os.listdir(self.source_dir), [])
+                self.assertGreaterEqual(organizer.durability.batches, 3 if mode == "batched" else 11)
+                
+                # Refill the source for the next mode
+                for name in os.listdir(os.path.join(target_dir, "Documents")):
+                    shutil.copy(os.path.join(target_dir, "Documents", name), self.source_dir)
+                shutil.copy(os.path.join(target_dir, "Videos", "large.mp4"), self.source_dir)
+    
+    def test_locality_order(self):
+        """Test that inode ordering is used when extent offsets are unavailable."""
+        settings = {"performance": {"locality_order": "extent"}}
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=settings)
+        
+        with mock.patch("smartfilesort.OSFileSystem.physical_offset", return_value=None):
+            entries = organizer._scan_source()
+        self.assertEqual([entry.inode() for entry in entries], sorted(entry.inode() for entry in entries))
+        
+        offsets = {entry.name: -index for index, entry in enumerate(entries)}
+        with mock.patch("smartfilesort.OSFileSystem.physical_offset",
+                        side_effect=lambda path: offsets[os.path.basename(path)]):
+            reordered = organizer._scan_source()
+        self.assertEqual([entry.name for entry in reordered], [entry.name for entry in reversed(entries)])
+    
+    def test_cross_device_copy_reports_progress(self):
+        """Test the streaming copy path used when rename crosses devices."""
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        progress = []
+        organizer.progress_callback = lambda path, copied, total: progress.append((copied, total))
+        
+        with mock.patch("os.rename", side_effect=OSError(18, "Invalid cross-device link")):
+            organizer.organize_files(dry_run=False)
+        
+        target_file = os.path.join(self.target_dir, "Videos", "large.mp4")
+        self.assertEqual(os.path.getsize(target_file), 3 * 1024 * 1024)
+        self.assertFalse(os.path.exists(os.path.join(self.source_dir, "large.mp4")))
+        self.assertEqual(progress[-1], (3 * 1024 * 1024, 3 * 1024 * 1024))
+        self.assertEqual(len(progress), 3)
+
+
+class TestShardedClassifier(unittest.TestCase):
+    """Test cases for process-pool classification."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if FileOrganizer is None:
+            self.skipTest("FileOrganizer not available")
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(self.source_dir)
+        
+        self.settings = {"performance": {"execution_mode": "processes", "process_workers": 2,
+                                         "process_min_files": 1,
+                                         "cache_directory": os.path.join(self.temp_dir, "cache")}}
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def test_matches_in_process_classification(self):
+        """Test that sharded results come back in order and agree with classify()."""
+        from smartfilesort import ShardedClassifier
+        
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        names = [f"{prefix}_{i}{ext}" for i in range(50)
+                 for prefix in ("report", "music", "setup", "notes")
+                 for ext in (".pdf", ".mp3", ".exe", ".xyz", "")]
+        
+        categories = ShardedClassifier(organizer, self.settings["performance"]).classify_names(names)
+        
+        self.assertEqual(categories, [organizer.rules.classify(name) for name in names])
+    
+    def test_process_mode_moves_files(self):
+        """Test a full run with the processes execution mode."""
+        for name in ("report.pdf", "photo.jpg", "unknown.xyz"):
+            with open(os.path.join(self.source_dir, name), 'w') as f:
+                f.write("data")
+        
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        self.assertEqual(organizer.organize_files(dry_run=False), (3, 0))
+        self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Images", "photo.jpg")))
+        self.assertTrue(os.path.exists(os.path.join(self.target_dir, "Others", "unknown.xyz")))
+
+
+class TestIOGovernor(unittest.TestCase):
+    """Test cases for I/O throttling and quiet hours, using a fake clock."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        try:
+            from smartfilesort import IOGovernor, TokenBucket
+        except ImportError:
+            self.skipTest("IOGovernor not available")
+        
+        self.IOGovernor = IOGovernor
+        self.TokenBucket = TokenBucket
+        self.elapsed = 0.0
+        self.start = datetime(2025, 9, 22, 23, 30)
+    
+    def clock(self):
+        return self.elapsed
+    
+    def sleep(self, seconds):
+        self.elapsed += seconds
+    
+    def now(self):
+        return self.start + timedelta(seconds=self.elapsed)
+    
+    def test_token_bucket(self):
+        """Test that the bucket allows a burst and then paces callers."""
+        bucket = self.TokenBucket(10, clock=self.clock, sleep=self.sleep)
+        bucket.acquire(10)
+        self.assertEqual(self.elapsed, 0)
+        bucket.acquire(5)
+        self.assertAlmostEqual(self.elapsed, 0.5)
+    
+    def test_quiet_hours_pause(self):
+        """Test that operations wait until quiet hours end."""
+        settings = {"scheduling": {"quiet_hours_start": "22:00", "quiet_hours_end": "08:00",
+                                   "pause_during_quiet_hours": True}}
+        governor = self.IOGovernor(settings, clock=self.clock, sleep=self.sleep, now=self.now)
+        governor.before_operation()
+        
+        self.assertEqual(self.now().strftime("%H:%M"), "08:00")
+        self.assertEqual(governor.paused_seconds, 8.5 * 3600)
+    
+    def test_cancel_ends_quiet_hours_pause(self):
+        """Test that cancelling the run ends a quiet-hours pause."""
+        from smartfilesort import RunControl
+        
+        settings = {"scheduling": {"quiet_hours_start": "22:00", "quiet_hours_end": "08:00",
+                                   "pause_during_quiet_hours": True}}
+        control = RunControl()
+        
+        def sleep(seconds):
+            self.sleep(seconds)
+            if self.elapsed >= 120:
+                control.cancel()
+        
+        governor = self.IOGovernor(settings, clock=self.clock, sleep=sleep, now=self.now, control=control)
+        governor.before_operation()
+        
+        self.assertEqual(self.elapsed, 120)
+    
+    def test_schedule_limits(self):
+        """Test that the active window's byte rate is applied."""
+        settings = {"throttle": {"max_bytes_per_second": 0, "schedule": [
+            {"start": "23:00", "end": "23:59", "max_bytes_per_second": 1000}
+        ]}}
+        governor = self.IOGovernor(settings, clock=self.clock, sleep=self.sleep, now=self.now)
+        governor.consume_bytes(1000)
+        governor.consume_bytes(3000)
+        
+        self.assertAlmostEqual(self.elapsed, 3.0)
+    
+    def test_disabled_by_default(self):
+        """Test that an unconfigured governor never waits."""
+        governor = self.IOGovernor({}, clock=self.clock, sleep=self.sleep, now=self.now)
+        governor.before_operation()
+        governor.consume_bytes(10 ** 9)
+        self.assertFalse(governor.enabled)
+        self.assertEqual(self.elapsed, 0)
+
+
 class TestConfigurationLoading(unittest.TestCase):
     """Test configuration file loading."""
     
@@ -249,12 +948,84 @@ class TestConfigurationLoading(unittest.TestCase):
             json.dump(custom_rules, f)
         
         # Load classifier with custom config
-        classifier = FileClassifier(self.config_file)
+        classifier = FileClassifier(self.config_file, snapshot_dir=self.temp_dir)
         
         # Test custom classification
         result = classifier.classify_file("test_file.test")
         self.assertEqual(result, "TestCategory")
     
+    def test_rules_snapshot(self):
+        """Test that the compiled rules snapshot follows rules file edits."""
+        snapshot_dir = os.path.join(self.temp_dir, "cache")
+        with open(self.config_file, 'w') as f:
+            json.dump({"First": {"extensions": [".test"]}}, f)
+        
+        classifier = FileClassifier(self.config_file, snapshot_dir=snapshot_dir)
+        self.assertEqual(classifier.classify_file("a.test"), "First")
+        self.assertEqual(len(os.listdir(snapshot_dir)), 1)
+        
+        # Same content again: served from the snapshot with the same fingerprint
+        self.assertEqual(FileClassifier(self.config_file, snapshot_dir=snapshot_dir).fingerprint,
+                         classifier.fingerprint)
+        
+        with open(self.config_file, 'w') as f:
+            json.dump({"Second": {"extensions": [".test"]}}, f)
+        stamp = time.time() + 10
+        os.utime(self.config_file, (stamp, stamp))
+        
+        classifier = FileClassifier(self.config_file, snapshot_dir=snapshot_dir)
+        self.assertEqual(classifier.classify_file("a.test"), "Second")
+    
+    def test_hot_reload(self):
+        """Test that rule edits are swapped in without disturbing old snapshots."""
+        with open(self.config_file, 'w') as f:
+            json.dump({"First": {"extensions": [".test"]}}, f)
+        
+        classifier = FileClassifier(self.config_file, snapshot_dir=self.temp_dir)
+        old_rules = classifier.current_rules()
+        
+        with open(self.config_file, 'w') as f:
+            json.dump({"Second": {"extensions": [".test"]}}, f)
+        stamp = time.time() + 10
+        os.utime(self.config_file, (stamp, stamp))
+        
+        # Checks are throttled unless forced
+        self.assertIs(classifier.current_rules(), old_rules)
+        new_rules = classifier.current_rules(force=True)
+        
+        self.assertEqual(new_rules.classify("a.test"), "Second")
+        self.assertEqual(old_rules.classify("a.test"), "First")
+        self.assertIs(classifier.current_rules(force=True), new_rules)
+    
+    def test_shared_classifier(self):
+        """Test that organizers share one classifier per rules file."""
+        self.assertIs(get_shared_classifier(self.config_file, self.temp_dir),
+                      get_shared_classifier(self.config_file, self.temp_dir))
+    
+    def test_snapshots_of_deleted_rules_pruned(self):
+        """Test that writing a snapshot removes those of rules files that are gone."""
+        snapshot_dir = os.path.join(self.temp_dir, "cache")
+        other_config = os.path.join(self.temp_dir, "other_rules.json")
+        for path in (self.config_file, other_config):
+            with open(path, 'w') as f:
+                json.dump({"First": {"extensions": [".test"]}}, f)
+            FileClassifier(path, snapshot_dir=snapshot_dir)
+        self.assertEqual(len(os.listdir(snapshot_dir)), 2)
+        
+        os.remove(other_config)
+        with open(self.config_file, 'w') as f:
+            json.dump({"Second": {"extensions": [".test"]}}, f)
+        stamp = time.time() + 10
+        os.utime(self.config_file, (stamp, stamp))
+        FileClassifier(self.config_file, snapshot_dir=snapshot_dir)
+        
+        self.assertEqual(len(os.listdir(snapshot_dir)), 1)
+    
+    def test_missing_config_not_created(self):
+        """Test that a missing rules file is not written with defaults."""
+        FileClassifier(self.config_file)
+        self.assertFalse(os.path.exists(self.config_file))
+    
     def test_default_config_fallback(self):
         """Test fallback to default configuration."""
         # Use non-existent config file
@@ -265,6 +1036,359 @@ class TestConfigurationLoading(unittest.TestCase):
         self.assertEqual(result, "Documents")
 
 
+class TestRunControl(unittest.TestCase):
+    """Test cases for cancellation, pausing and checkpointed resume."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if FileOrganizer is None:
+            self.skipTest("FileOrganizer not available")
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(self.source_dir)
+        for i in range(10):
+            with open(os.path.join(self.source_dir, f"file_{i}.pdf"), 'w') as f:
+                f.write(f"content {i}")
+        
+        self.settings = {"performance": {"cache_directory": os.path.join(self.temp_dir, "cache"),
+                                         "checkpoint_interval_files": 1}}
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def test_cancel_and_resume(self):
+        """Test that a cancelled run stops between files and the next run resumes."""
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        transfer = organizer._transfer
+        
+        def cancel_after_three(source_path, target_path, settle):
+            transfer(source_path, target_path, settle)
+            if len(organizer.moved_files) == 3:
+                organizer.control.cancel()
+        
+        organizer._transfer = cancel_after_three
+        with mock.patch("smartfilesort.save_operation_log") as save_log:
+            self.assertEqual(organizer.organize_files(dry_run=False), (3, 0))
+            self.assertEqual(len(os.listdir(self.source_dir)), 7)
+            
+            checkpoints = os.listdir(os.path.join(self.temp_dir, "cache", "checkpoints"))
+            self.assertEqual(len(checkpoints), 1)
+            
+            resumed = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+            self.assertEqual(resumed.organize_files(dry_run=False), (10, 0))
+            self.assertEqual(os.listdir(os.path.join(self.temp_dir, "cache", "checkpoints")), [])
+        
+        # Every operation is logged once, by the run that completed
+        logged = [row['source'] for call in save_log.call_args_list for row in call.args[0]]
+        self.assertEqual(len(logged), 10)
+        self.assertEqual(len(set(logged)), 10)
+    
+    def test_reused_organizer_runs_after_cancel(self):
+        """Test that a stop does not leave a reused organizer cancelled."""
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        organizer.control.cancel()
+        organizer.control.pause()
+        
+        self.assertEqual(organizer.organize_files(dry_run=False), (10, 0))
+        self.assertFalse(organizer.control.cancelled)
+    
+    def test_resume_skips_failed_files(self):
+        """Test that files that failed before an interruption are not retried on resume."""
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        organizer._open_checkpoint()
+        organizer._record_failure(Path(self.source_dir) / "file_0.pdf", "Documents", OSError("disk error"))
+        organizer.checkpoint.close(completed=False)
+        
+        resumed = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        self.assertEqual(resumed.organize_files(dry_run=False), (9, 1))
+        self.assertEqual(os.listdir(self.source_dir), ["file_0.pdf"])
+    
+    def test_pause_blocks_until_resumed(self):
+        """Test that a paused run waits and a cancel ends the pause."""
+        from smartfilesort import RunControl
+        import threading
+        
+        control = RunControl()
+        control.pause()
+        results = []
+        worker = threading.Thread(target=lambda: results.append(control.proceed()))
+        worker.start()
+        
+        worker.join(0.05)
+        self.assertTrue(worker.is_alive())
+        
+        control.resume()
+        worker.join(1)
+        self.assertEqual(results, [True])
+        
+        control.pause()
+        control.cancel()
+        self.assertFalse(control.proceed())
+
+
+class TestCoordination(unittest.TestCase):
+    """Test cases for several organizers sharing one source directory."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        if FileOrganizer is None:
+            self.skipTest("FileOrganizer not available")
+        
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        self.target_dir = os.path.join(self.temp_dir, "target")
+        os.makedirs(self.source_dir)
+        self.settings = {"coordination": {"enabled": True, "lease_seconds": 60},
+                         "performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}}
+        self.nodes = []
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        for node in self.nodes:
+            node.coordinator.finish()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def make_node(self, node_id):
+        organizer = FileOrganizer(self.source_dir, self.target_dir, settings=self.settings)
+        organizer.coordinator.node_id = node_id
+        organizer.coordinator.node_dir = organizer.coordinator.claims_root / node_id
+        organizer.coordinator.start()
+        self.nodes.append(organizer)
+        return organizer
+    
+    def crash(self, node):
+        """Stop a node's lease renewal and let its lease expire."""
+        node.coordinator._stop_renewal.set()
+        node.coordinator._renewer.join()
+        stale = time.time() - 120
+        os.utime(node.coordinator.node_dir / ".lease", (stale, stale))
+    
+    def test_each_file_claimed_once(self):
+        """Test that a file claimed by one node is skipped by another."""
+        source_file = Path(self.source_dir) / "report.pdf"
+        source_file.write_text("data")
+        first, second = self.make_node("a"), self.make_node("b")
+        
+        self.assertIsNotNone(first.coordinator.claim(source_file))
+        self.assertIsNone(second.coordinator.claim(source_file))
+        self.assertEqual(second.coordinator.lost, 1)
+    
+    def test_target_names_reserved_across_nodes(self):
+        """Test that two nodes never pick the same free target name."""
+        first, second = self.make_node("a"), self.make_node("b")
+        
+        first_target = first._claim_target(Path(self.source_dir) / "report.pdf", "Documents")
+        second_target = second._claim_target(Path(self.source_dir) / "report.pdf", "Documents")
+        
+        self.assertEqual((first_target.name, second_target.name), ("report.pdf", "report(1).pdf"))
+    
+    def test_expired_claims_recovered(self):
+        """Test that files held by a node with an expired lease go back to the source."""
+        crashed = self.make_node("crashed")
+        source_file = Path(self.source_dir) / "report.pdf"
+        source_file.write_text("data")
+        crashed.coordinator.claim(source_file)
+        
+        self.crash(crashed)
+        self.make_node("b")
+        self.assertTrue(source_file.exists())
+        self.assertFalse(crashed.coordinator.node_dir.exists())
+    
+    def test_recovery_removes_unfinished_targets(self):
+        """Test that a crashed node's reservation placeholders are removed, and finished moves kept."""
+        crashed = self.make_node("crashed")
+        for name in ("report.pdf", "notes.pdf"):
+            (Path(self.source_dir) / name).write_text("data")
+        
+        claimed = crashed.coordinator.claim(Path(self.source_dir) / "report.pdf")
+        placeholder = crashed._claim_target(claimed, "Documents")
+        self.assertTrue(crashed._move_file(Path(self.source_dir) / "notes.pdf", "Documents"))
+        
+        self.crash(crashed)
+        self.make_node("b")
+        self.assertFalse(placeholder.exists())
+        self.assertEqual(os.listdir(os.path.join(self.target_dir, "Documents")), ["notes.pdf"])
+        self.assertTrue((Path(self.source_dir) / "report.pdf").exists())
+    
+    def test_lease_renewed_while_busy(self):
+        """Test that the lease stays fresh while a node is busy with one file."""
+        self.settings["coordination"]["lease_seconds"] = 0.3
+        node = self.make_node("busy")
+        lease = node.coordinator.node_dir / ".lease"
+        stale = time.time() - 120
+        os.utime(lease, (stale, stale))
+        
+        time.sleep(0.5)
+        self.assertGreater(lease.stat().st_mtime, time.time() - 1)
+    
+    def test_processes_partition_work(self):
+        """Test several organizer processes draining one source directory."""
+        for i in range(300):
+            with open(os.path.join(self.source_dir, f"file_{i}.pdf"), 'w') as f:
+                f.write(f"content {i}")
+        
+        settings_path = os.path.join(self.temp_dir, "settings.json")
+        with open(settings_path, 'w') as f:
+            json.dump(self.settings, f)
+        
+        script = os.path.join(os.path.dirname(__file__), '..', 'src', 'smartfilesort.py')
+        nodes = [subprocess.Popen([sys.executable, script, self.source_dir, self.target_dir,
+                                   "--settings", settings_path],
+                                  stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+                 for _ in range(3)]
+        for node in nodes:
+            self.assertEqual(node.wait(timeout=60), 0)
+        
+        moved = os.listdir(os.path.join(self.target_dir, "Documents"))
+        self.assertEqual(sorted(moved), sorted(f"file_{i}.pdf" for i in range(300)))
+        self.assertEqual(os.listdir(self.source_dir), [".smartfilesort-claims"])
+        self.assertEqual(os.listdir(os.path.join(self.source_dir, ".smartfilesort-claims")), [])
+
+
+class TestFileHasher(unittest.TestCase):
+    """Test cases for the parallel, memoized file hasher."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(5):
+            path = os.path.join(self.temp_dir, f"file_{i}.bin")
+            with open(path, 'wb') as f:
+                f.write(os.urandom(3000 + i * 70000))
+            self.paths.append(path)
+        self.settings = {"performance": {"cache_directory": os.path.join(self.temp_dir, "cache")}}
+    
+    def tearDown(self):
+        """Clean up test fixtures."""
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+    
+    def _expected(self, algorithm, path):
+        import hashlib
+        with open(path, 'rb') as f:
+            return hashlib.new(algorithm, f.read()).hexdigest()
+    
+    def test_digests_match_hashlib(self):
+        """Test each algorithm against hashlib, with chunks smaller than the files."""
+        from smartfilesort import FileHasher
+        
+        for algorithm in FileHasher.ALGORITHMS:
+            with self.subTest(algorithm=algorithm):
+                hasher = FileHasher(algorithm, workers=3, chunk_size=4096)
+                digests = hasher.hash_files(self.paths)
+                self.assertEqual(digests, {path: self._expected(algorithm, path) for path in self.paths})
+    
+    def test_memo_skips_rereads(self):
+        """Test that unchanged files are read once and modified files again."""
+        from smartfilesort import FileHasher
+        
+        hasher = FileHasher()
+        first = hasher.hash_file(self.paths[1])
+        read = hasher.bytes_read
+        self.assertEqual(hasher.hash_file(self.paths[1]), first)
+        self.assertEqual(hasher.bytes_read, read)
+        
+        with open(self.paths[1], 'ab') as f:
+            f.write(b"more")
+        self.assertNotEqual(hasher.hash_file(self.paths[1]), first)
+        self.assertGreater(hasher.bytes_read, read)
+        
+        hasher.clear()
+        read = hasher.bytes_read
+        hasher.hash_file(self.paths[1])
+        self.assertGreater(hasher.bytes_read, read)
+        
+    def test_unreadable_files_skipped(self):
+        """Test that hash_files leaves out files that cannot be read."""
+        from smartfilesort import FileHasher
+        
+        missing = os.path.join(self.temp_dir, "missing.bin")
+        digests = FileHasher().hash_files([self.paths[0], missing])
+        self.assertEqual(list(digests), [self.paths[0]])
+        
+    def test_unknown_algorithm(self):
+        """Test that unsupported algorithms are rejected."""
+        from smartfilesort import FileHasher
+        
+        with self.assertRaises(ValueError):
+            FileHasher("crc32")
+    
+    def test_duplicate_checks_reuse_digests(self):
+        """Test that renaming around several existing copies hashes the source once."""
+        if FileOrganizer is None:
+            self.skipTest("FileOrganizer not available")
+            
+        target = Path(self.temp_dir) / "target"
+        target.mkdir()
+        source = Path(self.paths[0])
+        for name in ("file_0.bin", "file_0(1).bin", "file_0(2).bin"):
+            with open(target / name, 'wb') as f:
+                f.write(b"different")
+        
+        organizer = FileOrganizer(self.temp_dir, str(target), settings=self.settings)
+        self.assertEqual(organizer._handle_duplicate(source, target / "file_0.bin"), target / "file_0(3).bin")
+        self.assertEqual(organizer.hasher.bytes_read, os.path.getsize(source) + 2 * len(b"different"))
+    
+    def test_claims_hash_outside_the_lock(self):
+        """Test that choosing a target name hashes in parallel without holding the claim lock."""
+        if FileOrganizer is None:
+            self.skipTest("FileOrganizer not available")
+        
+        target = Path(self.temp_dir) / "target"
+        (target / "Others").mkdir(parents=True)
+        source = Path(self.paths[0])
+        shutil.copy(source, target / "Others" / "file_0(1).bin")
+        for name in ("file_0.bin", "file_0(2).bin"):
+            (target / "Others" / name).write_bytes(b"different")
+        
+        organizer = FileOrganizer(self.temp_dir, str(target), settings=self.settings)
+        hash_files = organizer.hasher.hash_files
+        lock_held = []
+        
+        def spy(paths):
+            lock_held.append(organizer._claim_lock.locked())
+            return hash_files(paths)
+        
+        with mock.patch.object(organizer.hasher, "hash_files", spy):
+            self.assertIsNone(organizer._claim_target(source, "Others"))
+            self.assertEqual(organizer._claim_target(Path(self.paths[1]), "Others"), target / "Others" / "file_1.bin")
+        self.assertEqual(lock_held, [False])
+
+
+class TestStartup(unittest.TestCase):
+    """Test the import-time budget of the CLI module."""
+    
+    # Cumulative microseconds for "import smartfilesort", measured with
+    # python -X importtime; generous enough for slow CI machines
+    IMPORT_BUDGET_US = 150000
+    
+    DEFERRED_MODULES = {"shutil", "csv", "hashlib"}
+    
+    def test_import_time_budget(self):
+        """Test that importing the module stays within budget."""
+        src_dir = os.path.join(os.path.dirname(__file__), '..', 'src')
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", "import smartfilesort"],
+            cwd=src_dir, capture_output=True, text=True, check=True
+        )
+        
+        timings = {}
+        for line in result.stderr.splitlines():
+            if line.startswith("import time:") and "|" in line:
+                _, cumulative, name = line[len("import time:"):].split("|")
+                if cumulative.strip().isdigit():
+                    timings[name.strip()] = int(cumulative)
+        
+        self.assertFalse(self.DEFERRED_MODULES & set(timings), "Deferred modules imported at startup")
+        self.assertLess(timings["smartfilesort"], self.IMPORT_BUDGET_US)
+
+
 def run_tests():
     """Run all unit tests."""
     # Create test suite
@@ -274,7 +1398,19 @@ def run_tests():
     # Add test cases
     suite.addTests(loader.loadTestsFromTestCase(TestFileClassifier))
     suite.addTests(loader.loadTestsFromTestCase(TestFileOrganizer))
+    suite.addTests(loader.loadTestsFromTestCase(TestFileFilter))
+    suite.addTests(loader.loadTestsFromTestCase(TestContentSniffer))
+    suite.addTests(loader.loadTestsFromTestCase(TestDateExtractor))
+    suite.addTests(loader.loadTestsFromTestCase(TestClassificationCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestRetryQueue))
+    suite.addTests(loader.loadTestsFromTestCase(TestSizeLanes))
+    suite.addTests(loader.loadTestsFromTestCase(TestShardedClassifier))
+    suite.addTests(loader.loadTestsFromTestCase(TestIOGovernor))
     suite.addTests(loader.loadTestsFromTestCase(TestConfigurationLoading))
+    suite.addTests(loader.loadTestsFromTestCase(TestRunControl))
+    suite.addTests(loader.loadTestsFromTestCase(TestCoordination))
+    suite.addTests(loader.loadTestsFromTestCase(TestFileHasher))
+    suite.addTests(loader.loadTestsFromTestCase(TestStartup))
     
     # Run tests
     runner = unittest.TextTestRunner(verbosity=2)